@@ -1,14 +1,20 @@
-from app.services.jenkins_service import JenkinsService
+from typing import Dict
+
+from app.core.config import settings
+from app.services.async_jenkins_service import AsyncJenkinsService
+from app.services.federation import JenkinsFederation
 
 # 全局 Jenkins 服务实例
 jenkins_service_instance = None
+# 多控制器联邦实例
+federation_instance = None
 
-def get_jenkins_service() -> JenkinsService:
+def get_jenkins_service() -> AsyncJenkinsService:
     """获取 Jenkins 服务单例"""
     global jenkins_service_instance
     if jenkins_service_instance is None:
         try:
-            jenkins_service_instance = JenkinsService()
+            jenkins_service_instance = AsyncJenkinsService()
         except Exception as e:
             # 如果在启动时初始化失败，这里可以处理
             # 在健康检查中会体现出来
@@ -18,4 +24,33 @@ def get_jenkins_service() -> JenkinsService:
          # 如果初始化失败，则无法提供服务
         raise ConnectionError("Jenkins 服务不可用，请检查配置和连接")
 
-    return jenkins_service_instance
\ No newline at end of file
+    return jenkins_service_instance
+
+def get_federation() -> JenkinsFederation:
+    """获取多控制器联邦单例，主控制器复用 Jenkins 服务单例（不可用时标记为 unavailable）"""
+    global federation_instance
+    if federation_instance is None:
+        try:
+            primary = get_jenkins_service()
+        except ConnectionError:
+            primary = None
+        federation_instance = JenkinsFederation(primary)
+    return federation_instance
+
+def active_jenkins_services() -> Dict[str, AsyncJenkinsService]:
+    """已创建的 Jenkins 服务（控制器名 -> 服务），不会触发创建，用于指标采集"""
+    if federation_instance is not None:
+        return dict(federation_instance.controllers)
+    if jenkins_service_instance is not None:
+        return {settings.JENKINS_CONTROLLER_NAME: jenkins_service_instance}
+    return {}
+
+async def close_jenkins_service() -> None:
+    """关闭 Jenkins 服务单例及联邦控制器持有的连接"""
+    global jenkins_service_instance, federation_instance
+    if federation_instance is not None:
+        await federation_instance.aclose()
+        federation_instance = None
+    if jenkins_service_instance is not None:
+        await jenkins_service_instance.aclose()
+        jenkins_service_instance = None
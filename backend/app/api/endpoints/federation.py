@@ -0,0 +1,118 @@
+"""
+多 Jenkins 控制器联邦查询接口
+
+所有读操作并发发往每个已注册的控制器，合并结果中每一项带 controller 字段；
+controllers 给出每个控制器的状态（ok/timeout/error/unavailable）和耗时，partial 表示结果不完整。
+"""
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from app.api.deps import get_federation
+from app.core.config import settings
+import structlog
+
+logger = structlog.get_logger("federation_api")
+router = APIRouter()
+
+_TIMEOUT_QUERY = Query(default=None, gt=0, le=60, description="单个控制器的响应期限（秒），默认 FEDERATION_TIMEOUT")
+
+
+def _merged_response(data: Dict[str, Any], what: str) -> Dict[str, Any]:
+    """所有控制器都没有返回结果时返回 503，否则返回合并结果（部分控制器失败时 partial 为 true）"""
+    if data["controllers"] and all(info["status"] != "ok" for info in data["controllers"].values()):
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "status": "error",
+                "message": f"所有 Jenkins 控制器均未返回{what}",
+                "controllers": data["controllers"],
+            }
+        )
+    return {
+        "status": "success",
+        "data": data["items"],
+        "count": len(data["items"]),
+        "controllers": data["controllers"],
+        "partial": data["partial"],
+        "timestamp": time.time(),
+    }
+
+
+@router.get("/controllers")
+async def list_controllers():
+    """已注册的 Jenkins 控制器"""
+    federation = get_federation()
+    return {
+        "status": "success",
+        "data": federation.describe(),
+        "timeout": settings.FEDERATION_TIMEOUT,
+        "stats": federation.stats(),
+    }
+
+
+@router.get("/jobs")
+async def get_federated_jobs(
+    depth: int = Query(default=1, ge=0, le=2, description="获取信息深度"),
+    timeout: Optional[float] = _TIMEOUT_QUERY,
+):
+    """所有控制器的任务列表"""
+    try:
+        data = await get_federation().jobs(depth=depth, timeout=timeout)
+        return _merged_response(data, "任务列表")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("联邦查询任务列表失败", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "联邦查询任务列表失败", "error": str(e)}
+        )
+
+
+@router.get("/queue")
+async def get_federated_queue(timeout: Optional[float] = _TIMEOUT_QUERY):
+    """所有控制器的构建队列"""
+    try:
+        data = await get_federation().queue(timeout=timeout)
+        return _merged_response(data, "构建队列")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("联邦查询构建队列失败", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "联邦查询构建队列失败", "error": str(e)}
+        )
+
+
+@router.get("/nodes")
+async def get_federated_nodes(timeout: Optional[float] = _TIMEOUT_QUERY):
+    """所有控制器的节点列表"""
+    try:
+        data = await get_federation().nodes(timeout=timeout)
+        return _merged_response(data, "节点列表")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("联邦查询节点列表失败", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "联邦查询节点列表失败", "error": str(e)}
+        )
+
+
+@router.get("/builds/running")
+async def get_federated_running_builds(timeout: Optional[float] = _TIMEOUT_QUERY):
+    """所有控制器上正在运行的构建"""
+    try:
+        data = await get_federation().running_builds(timeout=timeout)
+        return _merged_response(data, "运行中的构建")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("联邦查询运行中的构建失败", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "联邦查询运行中的构建失败", "error": str(e)}
+        )
@@ -2,6 +2,7 @@
 系统健康检查端点
 
 提供系统状态检查和 Jenkins 连接测试功能。
+Jenkins 状态来自后台健康探测的快照，探针请求不会访问 Jenkins。
 """
 
 from fastapi import APIRouter, HTTPException
@@ -10,10 +11,11 @@ import time
 import asyncio
 
 from app.core.config import settings
-from app.utils.logger import get_logger
+from app.api.deps import get_jenkins_service
+import structlog
 
 router = APIRouter()
-logger = get_logger("health")
+logger = structlog.get_logger("health")
 
 @router.get("/", summary="基础健康检查")
 async def basic_health_check() -> Dict[str, Any]:
@@ -26,7 +28,7 @@ async def basic_health_check() -> Dict[str, Any]:
         "status": "healthy",
         "timestamp": time.time(),
         "version": settings.APP_VERSION,
-        "environment": settings.ENVIRONMENT,
+        "debug": settings.DEBUG,
         "app_name": settings.APP_NAME,
     }
 
@@ -56,22 +58,24 @@ async def detailed_health_check() -> Dict[str, Any]:
     return health_status
 
 async def check_jenkins_connection() -> Dict[str, Any]:
-    """检查 Jenkins 服务器连接"""
+    """读取 Jenkins 健康探测快照（首次探测完成前状态为 starting）"""
     try:
-        # 这里可以添加实际的 Jenkins 连接测试
-        # 目前返回基于配置的状态
-        if settings.JENKINS_URL and settings.JENKINS_USERNAME:
-            return {
-                "status": "healthy",
-                "message": "Jenkins configuration available",
-                "url": settings.JENKINS_URL,
-                "username": settings.JENKINS_USERNAME,
-            }
-        else:
+        if not (settings.JENKINS_URL and settings.JENKINS_USERNAME):
             return {
                 "status": "warning",
                 "message": "Jenkins not configured",
             }
+        jenkins = get_jenkins_service()
+        jenkins.health.ensure_started()
+        snapshot = jenkins.health.snapshot()
+        status = {"connected": "healthy", "disconnected": "unhealthy"}.get(snapshot["status"], "starting")
+        return {
+            **snapshot,
+            "status": status,
+            "jenkins_status": snapshot["status"],
+            "message": snapshot["error"] or f"Jenkins {snapshot['status']}",
+            "username": settings.JENKINS_USERNAME,
+        }
     except Exception as e:
         logger.error("Jenkins health check failed", error=str(e))
         return {
@@ -95,10 +99,10 @@ async def readiness_check() -> Dict[str, Any]:
             return_exceptions=True
         )
         
-        # 检查是否有关键服务不可用
+        # 检查是否有关键服务不可用（首次探测尚未完成时同样视为未就绪）
         critical_failures = [
             check for check in checks 
-            if isinstance(check, dict) and check.get("status") == "unhealthy"
+            if isinstance(check, dict) and check.get("status") in ("unhealthy", "starting")
         ]
         
         if critical_failures:
@@ -1,9 +1,12 @@
 import time
 from typing import Dict, Any, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException
-from app.services.jenkins_service import JenkinsService
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from app.services.async_jenkins_service import AsyncJenkinsService
 from app.api.deps import get_jenkins_service
+from app.api.http_cache import cached_etag, conditional_response, console_etag, etag_matches, finished_console_etag, make_etag
+from app.api.streaming_json import json_list_response
+from app.services.job_index import parse_query
 import structlog
 
 logger = structlog.get_logger("jenkins_api")
@@ -14,7 +17,7 @@ async def test_jenkins_connection():
     """测试 Jenkins 连接"""
     try:
         jenkins = get_jenkins_service()
-        connection_info = jenkins.test_connection()
+        connection_info = await jenkins.test_connection()
         
         if connection_info["connected"]:
             return {
@@ -47,7 +50,7 @@ async def get_jenkins_info():
     """获取 Jenkins 服务器信息"""
     try:
         jenkins = get_jenkins_service()
-        info = jenkins.get_server_info()
+        info = await jenkins.get_server_info()
         return {"status": "success", "data": info}
     except ConnectionError as e:
         logger.warning("Jenkins 服务不可用", error=str(e))
@@ -72,17 +75,52 @@ async def get_jenkins_info():
 
 
 @router.get("/jobs")
-async def list_jobs(depth: int = Query(default=1, description="获取信息深度")):
-    """获取所有 Jenkins 任务"""
+async def list_jobs(
+    request: Request,
+    depth: int = Query(default=1, description="获取信息深度"),
+    search: Optional[str] = Query(default=None, description="按任务名子串搜索（不区分大小写）"),
+    status: Optional[str] = Query(default=None, description="按状态过滤，逗号分隔: running/failed/unstable/success/aborted/notbuilt/disabled"),
+    sort: Optional[str] = Query(default=None, description="排序字段: name/status/last_build/duration/health，前缀 - 表示倒序"),
+    cursor: Optional[str] = Query(default=None, description="分页游标（上一页返回的 next_cursor）"),
+    limit: Optional[int] = Query(default=None, ge=1, le=500, description="每页数量，默认 50"),
+):
+    """获取所有 Jenkins 任务
+
+    带有 search/status/sort/cursor/limit 任一参数时，从内存任务索引分页查询（不访问 Jenkins），
+    此时返回的字段固定为 depth=2；否则返回完整列表。
+    """
     try:
         jenkins = get_jenkins_service()
-        jobs = jenkins.get_jobs(depth=depth)
-        return {
+        if any(p is not None for p in (search, status, sort, cursor, limit)):
+            query = parse_query(search, status, sort, cursor, limit)
+            try:
+                page = await jenkins.job_index.page(**query)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail={"status": "error", "message": "无效的查询参数", "error": str(e)}
+                )
+            body = {
+                "status": "success",
+                "data": page["items"],
+                "count": len(page["items"]),
+                "total": page["total"],
+                "next_cursor": page["next_cursor"],
+                "status_counts": page["status_counts"],
+                "indexed_at": page["indexed_at"],
+                "timestamp": time.time(),
+            }
+            return conditional_response(request, body, make_etag(f"{page['version']}|{sorted(query.items())}"))
+        jobs = await jenkins.get_jobs(depth=depth)
+        body = {
             "status": "success",
             "data": jobs,
             "count": len(jobs),
             "timestamp": time.time(),
         }
+        return json_list_response(request, body, ("data",), cached_etag(jenkins.cache, jobs))
+    except HTTPException:
+        raise
     except ConnectionError as e:
         logger.warning("Jenkins 服务不可用", error=str(e))
         raise HTTPException(
@@ -107,14 +145,15 @@ async def list_jobs(depth: int = Query(default=1, description="获取信息深
 
 @router.get("/job/{job_name}")
 async def get_job_info(
+    request: Request,
     job_name: str, 
     depth: int = Query(default=1, description="获取信息深度")
 ):
     """获取特定任务详情"""
     try:
         jenkins = get_jenkins_service()
-        job_info = jenkins.get_job_info(job_name, depth=depth)
-        return {"status": "success", "data": job_info}
+        job_info = await jenkins.get_job_info(job_name, depth=depth)
+        return conditional_response(request, {"status": "success", "data": job_info}, make_etag(job_info))
     except ConnectionError as e:
         logger.warning("Jenkins 服务不可用", error=str(e))
         raise HTTPException(
@@ -147,7 +186,7 @@ async def build_job(
         jenkins = get_jenkins_service()
         # 只有当参数不为空时才传递参数
         # queue_id = jenkins.build_job(job_name, parameters if parameters else None)
-        queue_id = jenkins.build_job(job_name)
+        queue_id = await jenkins.build_job(job_name)
         return {
             "status": "success",
             "message": f"任务 '{job_name}' 构建已触发",
@@ -176,12 +215,17 @@ async def build_job(
         )
 
 @router.get("/build/{job_name}/{build_number}")
-async def get_build_info(job_name: str, build_number: int):
-    """获取构建详情"""
+async def get_build_info(request: Request, job_name: str, build_number: int):
+    """获取构建详情，已结束的构建标记为 immutable"""
     try:
         jenkins = get_jenkins_service()
-        build_info = jenkins.get_build_info(job_name, build_number)
-        return {"status": "success", "data": build_info}
+        build_info = await jenkins.get_build_info(job_name, build_number)
+        return conditional_response(
+            request,
+            {"status": "success", "data": build_info},
+            make_etag(build_info),
+            immutable=not build_info.get("building", False),
+        )
     except ConnectionError as e:
         logger.warning("Jenkins 服务不可用", error=str(e))
         raise HTTPException(
@@ -205,6 +249,7 @@ async def get_build_info(job_name: str, build_number: int):
 
 @router.get("/build/{job_name}/{build_number}/console")
 async def get_build_console_output(
+    request: Request,
     job_name: str, 
     build_number: int
 ):
@@ -212,12 +257,19 @@ async def get_build_console_output(
     
     根据官方文档：get_build_console_output(name, number)
     获取完整的构建控制台输出
+    已结束构建的日志标记为 immutable，本地已存储时无需读取日志即可返回 304
     """
     try:
         jenkins = get_jenkins_service()
-        console_output = jenkins.get_build_console_output(job_name, build_number)
-        
-        return {
+        stored_size = await jenkins.get_stored_console_size(job_name, build_number)
+        if stored_size is not None:
+            etag = finished_console_etag(jenkins.url, job_name, build_number, stored_size)
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return conditional_response(request, None, etag, immutable=True)
+
+        content, complete = await jenkins.get_build_console_bytes(job_name, build_number)
+        console_output = content.decode("utf-8", errors="replace")
+        body = {
             "status": "success",
             "data": {
                 "job_name": job_name,
@@ -227,6 +279,9 @@ async def get_build_console_output(
             },
             "timestamp": time.time(),
         }
+        return conditional_response(
+            request, body, console_etag(jenkins.url, job_name, build_number, content, complete), immutable=complete
+        )
     except ConnectionError as e:
         logger.warning("Jenkins 服务不可用", error=str(e))
         raise HTTPException(
@@ -248,12 +303,61 @@ async def get_build_console_output(
             }
         )
 
+@router.get("/build/{job_name}/{build_number}/console/progressive")
+async def get_build_console_progressive(
+    job_name: str,
+    build_number: int,
+    start: int = Query(default=0, ge=0, description="日志字节偏移量，首次为 0，之后使用上次返回的 offset")
+):
+    """增量获取构建控制台输出
+    
+    基于 Jenkins logText/progressiveText，只返回 start 之后新增的日志，
+    more_data 为 false 表示构建已结束、日志不会再增长
+    """
+    try:
+        jenkins = get_jenkins_service()
+        chunk = await jenkins.get_build_console_chunk(job_name, build_number, start=start)
+        
+        return {
+            "status": "success",
+            "data": {
+                "job_name": job_name,
+                "build_number": build_number,
+                "start": start,
+                "offset": chunk["offset"],
+                "more_data": chunk["more_data"],
+                "console_output": chunk["text"],
+                "output_length": len(chunk["text"])
+            },
+            "timestamp": time.time(),
+        }
+    except ConnectionError as e:
+        logger.warning("Jenkins 服务不可用", error=str(e))
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "status": "error",
+                "message": "Jenkins 服务不可用",
+                "error": str(e)
+            }
+        )
+    except Exception as e:
+        logger.error("增量获取构建控制台输出失败", job_name=job_name, build_number=build_number, error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "status": "error",
+                "message": f"增量获取任务 '{job_name}' 构建 #{build_number} 控制台输出失败",
+                "error": str(e)
+            }
+        )
+
 @router.get("/build/{job_name}/{build_number}/status")
 async def get_build_status(job_name: str, build_number: int):
     """获取构建状态"""
     try:
         jenkins = get_jenkins_service()
-        build_info = jenkins.get_build_info(job_name, build_number)
+        build_info = await jenkins.get_build_status(job_name, build_number)
         
         status = {
             "job_name": job_name,
@@ -2,15 +2,19 @@
 Jenkins Pro API 接口实现
 基于jenkins_readme文档要求，实现完整的32个API接口
 """
+import re
 import time
 import json
-import requests
+import asyncio
 from typing import Dict, Any, Optional, List
-from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, Query, HTTPException, Body
-from app.services.jenkins_service import JenkinsService
+from fastapi import APIRouter, Depends, Query, HTTPException, Body, Header, Request
+from fastapi.responses import Response, StreamingResponse
+from app.services.async_jenkins_service import AsyncJenkinsService
 from app.api.deps import get_jenkins_service
+from app.api.http_cache import cached_etag, conditional_response, console_etag, etag_matches, finished_console_etag, make_etag, IMMUTABLE, REVALIDATE
+from app.api.streaming_json import json_list_response
+from app.services.job_index import parse_query
 from app.core.config import settings
 import structlog
 
@@ -26,7 +30,7 @@ async def get_server_info():
     """获取Jenkins服务器基本信息"""
     try:
         jenkins = get_jenkins_service()
-        info = jenkins.get_server_info()
+        info = await jenkins.get_server_info()
         return {"status": "success", "data": info}
     except Exception as e:
         logger.error("获取服务器信息失败", error=str(e))
@@ -40,10 +44,7 @@ async def get_system_info():
     """获取系统详细信息"""
     try:
         jenkins = get_jenkins_service()
-        # 使用原始HTTP请求获取系统信息
-        auth = (settings.JENKINS_USERNAME, settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD)
-        response = requests.get(f"{settings.JENKINS_URL}/systemInfo", auth=auth)
-        response.raise_for_status()
+        await jenkins.get_system_info()
         
         # 解析系统信息
         system_info = {
@@ -60,20 +61,13 @@ async def get_system_info():
         )
 
 @router.get("/pluginManager/plugins")
-async def get_plugins():
+async def get_plugins(request: Request):
     """获取插件信息"""
     try:
         jenkins = get_jenkins_service()
-        # 使用原始HTTP请求获取插件信息
-        auth = (settings.JENKINS_USERNAME, settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD)
-        response = requests.get(
-            f"{settings.JENKINS_URL}/pluginManager/api/json?depth=1", 
-            auth=auth
-        )
-        response.raise_for_status()
-        plugins_data = response.json()
-        
-        return {"status": "success", "data": plugins_data}
+        plugins_data = await jenkins.get_plugins()
+        body = {"status": "success", "data": plugins_data}
+        return json_list_response(request, body, ("data", "plugins"), cached_etag(jenkins.cache, plugins_data))
     except Exception as e:
         logger.error("获取插件信息失败", error=str(e))
         raise HTTPException(
@@ -86,17 +80,53 @@ async def get_plugins():
 # =============================================================================
 
 @router.get("/jobs")
-async def get_jobs(depth: int = Query(default=1, description="获取信息深度")):
-    """获取所有任务列表"""
+async def get_jobs(
+    request: Request,
+    depth: int = Query(default=1, description="获取信息深度"),
+    search: Optional[str] = Query(default=None, description="按任务名子串搜索（不区分大小写）"),
+    status: Optional[str] = Query(default=None, description="按状态过滤，逗号分隔: running/failed/unstable/success/aborted/notbuilt/disabled"),
+    sort: Optional[str] = Query(default=None, description="排序字段: name/status/last_build/duration/health，前缀 - 表示倒序"),
+    cursor: Optional[str] = Query(default=None, description="分页游标（上一页返回的 next_cursor）"),
+    limit: Optional[int] = Query(default=None, ge=1, le=500, description="每页数量，默认 50"),
+):
+    """获取所有任务列表
+
+    带有 search/status/sort/cursor/limit 任一参数时从内存任务索引分页查询，返回字段固定为 depth=2。
+    """
     try:
         jenkins = get_jenkins_service()
-        jobs = jenkins.get_jobs(depth=depth)
-        return {
+        if any(p is not None for p in (search, status, sort, cursor, limit)):
+            query = parse_query(search, status, sort, cursor, limit)
+            try:
+                page = await jenkins.job_index.page(**query)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail={"status": "error", "message": "无效的查询参数", "error": str(e)}
+                )
+            body = {
+                "status": "success",
+                "data": {
+                    "jobs": page["items"],
+                    "total": page["total"],
+                    "next_cursor": page["next_cursor"],
+                    "status_counts": page["status_counts"],
+                    "indexed_at": page["indexed_at"],
+                },
+                "count": len(page["items"]),
+                "timestamp": time.time(),
+            }
+            return conditional_response(request, body, make_etag(f"{page['version']}|{sorted(query.items())}"))
+        jobs = await jenkins.get_jobs(depth=depth)
+        body = {
             "status": "success",
             "data": {"jobs": jobs},
             "count": len(jobs),
             "timestamp": time.time(),
         }
+        return json_list_response(request, body, ("data", "jobs"), cached_etag(jenkins.cache, jobs))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("获取任务列表失败", error=str(e))
         raise HTTPException(
@@ -104,13 +134,58 @@ async def get_jobs(depth: int = Query(default=1, description="获取信息深度
             detail={"status": "error", "message": "获取任务列表失败", "error": str(e)}
         )
 
+@router.get("/jobs/all")
+async def get_all_jobs(refresh: bool = Query(default=False, description="忽略缓存重新遍历整个任务树")):
+    """递归遍历文件夹和多分支项目，返回所有任务全名的扁平列表"""
+    try:
+        jenkins = get_jenkins_service()
+        data = await jenkins.job_crawler.list_jobs(refresh=refresh)
+        return {"status": "success", "data": data, "count": len(data["jobs"]), "timestamp": time.time()}
+    except Exception as e:
+        logger.error("遍历任务树失败", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "遍历任务树失败", "error": str(e)}
+        )
+
+@router.post("/jobs/bulk")
+async def bulk_job_action(
+    action: str = Body(..., description="操作: enable/disable/delete/stop（stop 停止任务所有正在运行的构建）"),
+    job_names: Optional[List[str]] = Body(default=None, description="任务全名列表"),
+    pattern: Optional[str] = Body(default=None, description="任务全名通配符，如 release/*，与 job_names 取并集"),
+    dry_run: bool = Body(default=False, description="只返回将要操作的目标，不执行"),
+):
+    """批量启用/禁用/删除任务或停止运行中的构建：并发执行（受限速控制），逐项返回结果或错误"""
+    try:
+        jenkins = get_jenkins_service()
+        try:
+            data = await jenkins.batch.bulk_job_action(action, job_names, pattern, dry_run=dry_run)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={"status": "error", "message": "无效的批量操作参数", "error": str(e)}
+            )
+        if dry_run:
+            message = f"预演：将对 {data['total']} 个目标执行 {action}"
+        else:
+            message = f"{action} 完成 {data['succeeded']} 个，失败 {data['failed']} 个"
+        return {"status": "success", "message": message, "data": data, "timestamp": time.time()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("批量任务操作失败", action=action, error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "批量任务操作失败", "error": str(e)}
+        )
+
 @router.get("/job/{job_name}")
-async def get_job_info(job_name: str, depth: int = Query(default=1, description="获取信息深度")):
+async def get_job_info(request: Request, job_name: str, depth: int = Query(default=1, description="获取信息深度")):
     """获取特定任务信息"""
     try:
         jenkins = get_jenkins_service()
-        job_info = jenkins.get_job_info(job_name, depth=depth)
-        return {"status": "success", "data": job_info}
+        job_info = await jenkins.get_job_info(job_name, depth=depth)
+        return conditional_response(request, {"status": "success", "data": job_info}, make_etag(job_info))
     except Exception as e:
         logger.error("获取任务详情失败", job_name=job_name, error=str(e))
         raise HTTPException(
@@ -123,16 +198,7 @@ async def get_job_parameters(job_name: str):
     """获取任务参数定义"""
     try:
         jenkins = get_jenkins_service()
-        # 获取任务配置信息，包含参数定义
-        job_info = jenkins.get_job_info(job_name, depth=2)
-        
-        # 提取参数定义
-        parameter_definitions = []
-        if 'property' in job_info:
-            for prop in job_info['property']:
-                if 'parameterDefinitions' in prop:
-                    parameter_definitions = prop['parameterDefinitions']
-                    break
+        parameter_definitions = await jenkins.get_job_parameters(job_name)
         
         return {
             "status": "success",
@@ -150,10 +216,7 @@ async def get_job_builds(job_name: str, limit: int = Query(default=10, descripti
     """获取任务构建历史"""
     try:
         jenkins = get_jenkins_service()
-        # 获取任务信息，包含构建历史
-        job_info = jenkins.get_job_info(job_name, depth=1)
-        
-        builds = job_info.get('builds', [])[:limit]
+        builds = await jenkins.get_job_builds(job_name, limit=limit)
         
         return {
             "status": "success",
@@ -172,7 +235,7 @@ async def create_job(name: str = Body(...), config_xml: str = Body(...)):
     """创建新任务"""
     try:
         jenkins = get_jenkins_service()
-        jenkins.server.create_job(name, config_xml)
+        await jenkins.create_job(name, config_xml)
         
         return {
             "status": "success",
@@ -191,7 +254,7 @@ async def delete_job(job_name: str):
     """删除任务"""
     try:
         jenkins = get_jenkins_service()
-        jenkins.delete_job(job_name)
+        await jenkins.delete_job(job_name)
         
         return {
             "status": "success",
@@ -209,7 +272,7 @@ async def enable_job(job_name: str):
     """启用任务"""
     try:
         jenkins = get_jenkins_service()
-        jenkins.server.enable_job(job_name)
+        await jenkins.enable_job(job_name)
         
         return {
             "status": "success",
@@ -227,7 +290,7 @@ async def disable_job(job_name: str):
     """禁用任务"""
     try:
         jenkins = get_jenkins_service()
-        jenkins.server.disable_job(job_name)
+        await jenkins.disable_job(job_name)
         
         return {
             "status": "success",
@@ -250,7 +313,7 @@ async def trigger_build(job_name: str, build_params: Optional[Dict[str, Any]] =
     try:
         logger.info("触发任务构建", job_name=job_name, parameters=build_params)
         jenkins = get_jenkins_service()
-        queue_id = jenkins.build_job(job_name, build_params)
+        queue_id = await jenkins.build_job(job_name, build_params)
         
         return {
             "status": "success",
@@ -269,13 +332,47 @@ async def trigger_build(job_name: str, build_params: Optional[Dict[str, Any]] =
             detail={"status": "error", "message": f"触发任务 '{job_name}' 构建失败", "error": str(e)}
         )
 
+@router.post("/builds/batch")
+async def trigger_builds_batch(
+    builds: List[Dict[str, Any]] = Body(..., description="待触发的构建: [{\"job_name\": ..., \"parameters\": {...}}]"),
+    resolve_build_numbers: bool = Body(default=False, description="是否等待队列项开始构建并返回构建号"),
+    wait_timeout: float = Body(default=30, ge=0, le=300, description="等待构建号的最长时间（秒）"),
+):
+    """批量触发构建：并发下发（受限速控制），逐项返回 queue_id 或错误"""
+    if not builds:
+        raise HTTPException(status_code=400, detail="builds 不能为空")
+    if len(builds) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"单次最多触发 {settings.BATCH_MAX_ITEMS} 个构建")
+    try:
+        jenkins = get_jenkins_service()
+        data = await jenkins.batch.trigger_builds(
+            builds, resolve_build_numbers=resolve_build_numbers, wait_timeout=wait_timeout
+        )
+        return {
+            "status": "success",
+            "message": f"已触发 {data['queued']} 个构建，失败 {data['failed']} 个",
+            "data": data,
+            "timestamp": time.time(),
+        }
+    except Exception as e:
+        logger.error("批量触发构建失败", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "批量触发构建失败", "error": str(e)}
+        )
+
 @router.get("/build/{job_name}/{build_number}")
-async def get_build_info(job_name: str, build_number: int):
-    """获取构建详情"""
+async def get_build_info(request: Request, job_name: str, build_number: int):
+    """获取构建详情，已结束的构建标记为 immutable"""
     try:
         jenkins = get_jenkins_service()
-        build_info = jenkins.get_build_info(job_name, build_number)
-        return {"status": "success", "data": build_info}
+        build_info = await jenkins.get_build_info(job_name, build_number)
+        return conditional_response(
+            request,
+            {"status": "success", "data": build_info},
+            make_etag(build_info),
+            immutable=not build_info.get("building", False),
+        )
     except Exception as e:
         logger.error("获取构建详情失败", job_name=job_name, build_number=build_number, error=str(e))
         raise HTTPException(
@@ -284,13 +381,20 @@ async def get_build_info(job_name: str, build_number: int):
         )
 
 @router.get("/build/{job_name}/{build_number}/console")
-async def get_build_console(job_name: str, build_number: int):
-    """获取构建控制台输出"""
+async def get_build_console(request: Request, job_name: str, build_number: int):
+    """获取构建控制台输出，已结束构建的日志标记为 immutable"""
     try:
         jenkins = get_jenkins_service()
-        console_output = jenkins.get_build_console_output(job_name, build_number)
-        
-        return {
+        stored_size = await jenkins.get_stored_console_size(job_name, build_number)
+        if stored_size is not None:
+            # 本地已存储的日志无需读取内容即可验证
+            etag = finished_console_etag(jenkins.url, job_name, build_number, stored_size)
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return conditional_response(request, None, etag, immutable=True)
+
+        content, complete = await jenkins.get_build_console_bytes(job_name, build_number)
+        console_output = content.decode("utf-8", errors="replace")
+        body = {
             "status": "success",
             "data": {
                 "job_name": job_name,
@@ -300,6 +404,9 @@ async def get_build_console(job_name: str, build_number: int):
             },
             "timestamp": time.time(),
         }
+        return conditional_response(
+            request, body, console_etag(jenkins.url, job_name, build_number, content, complete), immutable=complete
+        )
     except Exception as e:
         logger.error("获取构建控制台输出失败", job_name=job_name, build_number=build_number, error=str(e))
         raise HTTPException(
@@ -307,12 +414,113 @@ async def get_build_console(job_name: str, build_number: int):
             detail={"status": "error", "message": f"获取任务 '{job_name}' 构建 #{build_number} 控制台输出失败", "error": str(e)}
         )
 
+@router.get("/build/{job_name}/{build_number}/console/progressive")
+async def get_build_console_progressive(
+    job_name: str,
+    build_number: int,
+    start: int = Query(default=0, ge=0, description="日志字节偏移量，首次为 0，之后使用上次返回的 offset")
+):
+    """增量获取构建控制台输出"""
+    try:
+        jenkins = get_jenkins_service()
+        chunk = await jenkins.get_build_console_chunk(job_name, build_number, start=start)
+        
+        return {
+            "status": "success",
+            "data": {
+                "job_name": job_name,
+                "build_number": build_number,
+                "start": start,
+                "offset": chunk["offset"],
+                "more_data": chunk["more_data"],
+                "console_output": chunk["text"],
+                "output_length": len(chunk["text"])
+            },
+            "timestamp": time.time(),
+        }
+    except Exception as e:
+        logger.error("增量获取构建控制台输出失败", job_name=job_name, build_number=build_number, error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": f"增量获取任务 '{job_name}' 构建 #{build_number} 控制台输出失败", "error": str(e)}
+        )
+
+def _parse_byte_range(range_header: str) -> Optional[tuple]:
+    """解析单个 Range: bytes=... 区间，返回 (start, end)，end 为开区间，后缀区间 start 为负数
+
+    不支持多区间，无法识别时返回 None，按完整内容响应。
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            return (-int(last), None) if last else None
+        start = int(first)
+        end = int(last) + 1 if last else None
+    except ValueError:
+        return None
+    if start < 0 or (end is not None and end <= start):
+        return None
+    return start, end
+
+@router.get("/build/{job_name}/{build_number}/console/raw")
+async def get_build_console_raw(
+    request: Request,
+    job_name: str,
+    build_number: int,
+    range_header: Optional[str] = Header(default=None, alias="Range"),
+):
+    """以纯文本返回构建控制台输出，支持 HTTP Range 请求
+
+    已完成构建的日志由本地日志存储提供，Range 请求只解压所需的数据块。
+    """
+    try:
+        jenkins = get_jenkins_service()
+        stored_size = await jenkins.get_stored_console_size(job_name, build_number)
+        if stored_size is not None:
+            etag = finished_console_etag(jenkins.url, job_name, build_number, stored_size)
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return conditional_response(request, None, etag, immutable=True)
+        byte_range = _parse_byte_range(range_header) if range_header else None
+        start, end = byte_range or (0, None)
+        result = await jenkins.get_build_console_range(job_name, build_number, start=start, end=end)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("获取构建原始日志失败", job_name=job_name, build_number=build_number, error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": f"获取任务 '{job_name}' 构建 #{build_number} 原始日志失败", "error": str(e)}
+        )
+
+    total = result["total"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        # 构建结束后日志不再变化，可以长期缓存
+        "Cache-Control": IMMUTABLE if result["complete"] else REVALIDATE,
+    }
+    if result["complete"]:
+        headers["ETag"] = finished_console_etag(jenkins.url, job_name, build_number, total)
+    if byte_range is None:
+        return Response(content=result["content"], media_type="text/plain; charset=utf-8", headers=headers)
+    content = result["content"]
+    if not content:
+        # 起始位置超出日志长度（或日志为空）
+        headers["Content-Range"] = f"bytes */{total}"
+        return Response(status_code=416, headers=headers)
+    headers["Content-Range"] = f"bytes {result['start']}-{result['start'] + len(content) - 1}/{total}"
+    return Response(status_code=206, content=content, media_type="text/plain; charset=utf-8", headers=headers)
+
 @router.get("/build/{job_name}/{build_number}/status")
 async def get_build_status(job_name: str, build_number: int):
     """获取构建状态"""
     try:
         jenkins = get_jenkins_service()
-        build_info = jenkins.get_build_info(job_name, build_number)
+        build_info = await jenkins.get_build_status(job_name, build_number)
         
         status = {
             "job_name": job_name,
@@ -337,12 +545,131 @@ async def get_build_status(job_name: str, build_number: int):
             detail={"status": "error", "message": f"获取任务 '{job_name}' 构建 #{build_number} 状态失败", "error": str(e)}
         )
 
+def _format_sse(event: Dict[str, Any]) -> str:
+    """按 text/event-stream 格式编码一个事件"""
+    lines = []
+    if "id" in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['event']}")
+    lines.append(f"data: {json.dumps(event['data'], ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+@router.get("/build/{job_name}/{build_number}/stream")
+async def stream_build(
+    job_name: str,
+    build_number: int,
+    start: int = Query(default=0, ge=0, description="控制台日志起始字节偏移"),
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """以 Server-Sent Events 推送构建状态变化和新增控制台输出，构建结束后关闭
+    
+    事件类型: status（状态变化）、console（新增日志，id 为新的 offset）、offset（加入已有流时的当前 offset）、
+    end（构建结束）、overflow（客户端消费过慢被断开）、error
+    断线重连时浏览器会带上 Last-Event-ID，从该 offset 继续
+    """
+    try:
+        jenkins = get_jenkins_service()
+    except Exception as e:
+        logger.error("订阅构建事件失败", job_name=job_name, build_number=build_number, error=str(e))
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "error", "message": "Jenkins 服务不可用", "error": str(e)}
+        )
+
+    if last_event_id and last_event_id.isdigit():
+        start = int(last_event_id)
+
+    async def event_source():
+        sub = jenkins.build_streams.subscribe(job_name, build_number, start=start)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=settings.BUILD_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield _format_sse(event)
+        finally:
+            jenkins.build_streams.unsubscribe(job_name, build_number, sub)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/job/{job_name}/console/search")
+async def search_build_consoles(
+    job_name: str,
+    pattern: str = Query(..., min_length=1, max_length=settings.LOG_SEARCH_MAX_PATTERN_LENGTH, description="正则表达式"),
+    from_build: Optional[int] = Query(default=None, ge=1, description="起始构建号，默认向前覆盖最大搜索范围"),
+    to_build: Optional[int] = Query(default=None, ge=1, description="结束构建号（包含），默认最近一次构建"),
+    ignore_case: bool = Query(default=False, description="忽略大小写"),
+    context: int = Query(default=2, ge=0, le=20, description="匹配行前后附带的上下文行数"),
+):
+    """在一段构建范围内搜索控制台日志，以 Server-Sent Events 逐个构建返回匹配结果
+    
+    事件类型: match（构建号及匹配行、行号、上下文）、skipped（构建不存在、读取失败或扫描超时）、end（汇总）、error
+    """
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "error", "message": "无效的正则表达式", "error": str(e)}
+        )
+
+    try:
+        jenkins = get_jenkins_service()
+        if to_build is None:
+            to_build = await jenkins.get_last_build_number(job_name)
+            if to_build is None:
+                raise HTTPException(status_code=404, detail=f"任务 '{job_name}' 还没有构建")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("搜索构建日志失败", job_name=job_name, error=str(e))
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "error", "message": "Jenkins 服务不可用", "error": str(e)}
+        )
+
+    if from_build is None:
+        from_build = max(to_build - settings.LOG_SEARCH_MAX_BUILDS + 1, 1)
+    if from_build > to_build:
+        raise HTTPException(status_code=400, detail="from_build 不能大于 to_build")
+    if to_build - from_build + 1 > settings.LOG_SEARCH_MAX_BUILDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多搜索 {settings.LOG_SEARCH_MAX_BUILDS} 个构建"
+        )
+
+    async def event_source():
+        # 从新到旧调度，最近的构建优先返回
+        build_numbers = list(range(to_build, from_build - 1, -1))
+        try:
+            async for event in jenkins.log_search.search(
+                job_name, build_numbers, pattern, ignore_case=ignore_case, context=context
+            ):
+                yield _format_sse(event)
+        except Exception as e:
+            logger.error("搜索构建日志失败", job_name=job_name, pattern=pattern, error=str(e))
+            yield _format_sse({"event": "error", "data": {"message": str(e)}})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.post("/build/{job_name}/{build_number}/stop")
 async def stop_build(job_name: str, build_number: int):
     """停止构建"""
     try:
         jenkins = get_jenkins_service()
-        jenkins.server.stop_build(job_name, build_number)
+        await jenkins.stop_build(job_name, build_number)
 
         return {
             "status": "success",
@@ -360,11 +687,7 @@ async def get_build_queue():
     """获取构建队列"""
     try:
         jenkins = get_jenkins_service()
-        # 使用原始HTTP请求获取队列信息
-        auth = (settings.JENKINS_USERNAME, settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD)
-        response = requests.get(f"{settings.JENKINS_URL}/queue/api/json", auth=auth)
-        response.raise_for_status()
-        queue_data = response.json()
+        queue_data = await jenkins.get_queue_info()
 
         return {"status": "success", "data": queue_data}
     except Exception as e:
@@ -374,6 +697,133 @@ async def get_build_queue():
             detail={"status": "error", "message": "获取构建队列失败", "error": str(e)}
         )
 
+@router.get("/queue/item/{queue_id}/build")
+async def wait_for_queued_build(
+    queue_id: int,
+    job_name: Optional[str] = Query(default=None, description="任务名（可选，仅用于返回结果）"),
+    timeout: float = Query(default=30, ge=0, le=300, description="最长等待时间（秒）"),
+):
+    """等待队列项开始构建并返回构建号
+    
+    status: started（已开始，带 build_number）、waiting（超时仍在排队）、cancelled、expired
+    """
+    try:
+        jenkins = get_jenkins_service()
+        result = await jenkins.queue_watcher.wait_for_build(queue_id, job_name, timeout=timeout)
+        return {"status": "success", "data": result, "timestamp": time.time()}
+    except Exception as e:
+        logger.error("等待队列项开始构建失败", queue_id=queue_id, error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": f"等待队列项 {queue_id} 开始构建失败", "error": str(e)}
+        )
+
+@router.get("/queue/item/{queue_id}/build/stream")
+async def stream_queued_build(
+    queue_id: int,
+    job_name: Optional[str] = Query(default=None, description="任务名（可选，仅用于返回结果）"),
+):
+    """以 Server-Sent Events 推送队列项状态，开始构建（或取消、过期）后关闭"""
+    try:
+        jenkins = get_jenkins_service()
+    except Exception as e:
+        logger.error("订阅队列项状态失败", queue_id=queue_id, error=str(e))
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "error", "message": "Jenkins 服务不可用", "error": str(e)}
+        )
+
+    async def event_source():
+        item = jenkins.queue_watcher.watch(queue_id, job_name)
+        if item is None:
+            yield _format_sse({"event": "resolved", "data": jenkins.queue_watcher.get_state(queue_id)})
+            return
+        last_state = None
+        while True:
+            if item.state is not last_state:
+                last_state = item.state
+                yield _format_sse({"event": "state", "data": last_state})
+            if item.future.done():
+                yield _format_sse({"event": "resolved", "data": item.future.result()})
+                return
+            changed = item.changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=settings.BUILD_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/history")
+async def get_build_history(
+    job_name: Optional[str] = Query(default=None, description="按任务过滤"),
+    result: Optional[str] = Query(default=None, description="按结果过滤: SUCCESS/FAILURE/UNSTABLE/ABORTED/NOT_BUILT"),
+    building: Optional[bool] = Query(default=None, description="按是否正在构建过滤"),
+    since: Optional[int] = Query(default=None, description="起始时间（毫秒时间戳，包含）"),
+    until: Optional[int] = Query(default=None, description="结束时间（毫秒时间戳，不包含）"),
+    page: int = Query(default=1, ge=1, description="页码"),
+    page_size: int = Query(default=50, ge=1, le=500, description="每页数量"),
+):
+    """获取所有任务的构建历史（来自本地增量同步的历史库，按开始时间倒序）"""
+    try:
+        jenkins = get_jenkins_service()
+        history = jenkins.build_history
+        history.ensure_started()
+        # 历史库为空时（首次启动）等待第一次同步
+        await history.wait_ready(timeout=10)
+        data = await history.query(
+            job_name=job_name,
+            result=result,
+            building=building,
+            since=since,
+            until=until,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+        )
+        return {
+            "status": "success",
+            "data": {
+                **data,
+                "page": page,
+                "page_size": page_size,
+                "synced_at": history.last_synced_at,
+            },
+            "timestamp": time.time(),
+        }
+    except Exception as e:
+        logger.error("获取构建历史失败", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "获取构建历史失败", "error": str(e)}
+        )
+
+@router.get("/analytics")
+async def get_build_analytics(
+    window_hours: float = Query(default=24.0, gt=0, le=24 * 365, description="统计窗口（小时）"),
+    job_name: Optional[str] = Query(default=None, description="只统计指定任务"),
+    per_job: bool = Query(default=True, description="是否返回每个任务的统计"),
+):
+    """构建统计：耗时 p50/p90/p99、失败率、不稳定率、MTTR、每小时构建数（全局及按任务）
+    
+    数据来自构建历史库，统计窗口内开始的构建；MTTR 为从连续失败的第一次构建开始到随后首次成功构建结束的平均耗时。
+    """
+    try:
+        jenkins = get_jenkins_service()
+        jenkins.build_history.ensure_started()
+        await jenkins.build_history.wait_ready(timeout=10)
+        data = await jenkins.build_analytics.compute(window_hours=window_hours, job_name=job_name, per_job=per_job)
+        return {"status": "success", "data": data, "timestamp": time.time()}
+    except Exception as e:
+        logger.error("获取构建统计失败", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "获取构建统计失败", "error": str(e)}
+        )
+
 # =============================================================================
 # 4. Pipeline接口 (2个)
 # =============================================================================
@@ -382,14 +832,8 @@ async def get_build_queue():
 async def get_pipeline_run(job_name: str, build_number: int):
     """获取Pipeline运行信息"""
     try:
-        # 使用原始HTTP请求获取Pipeline信息
-        auth = (settings.JENKINS_USERNAME, settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD)
-        response = requests.get(
-            f"{settings.JENKINS_URL}/job/{quote(job_name)}/{build_number}/wfapi/describe",
-            auth=auth
-        )
-        response.raise_for_status()
-        pipeline_data = response.json()
+        jenkins = get_jenkins_service()
+        pipeline_data = await jenkins.get_pipeline_describe(job_name, build_number)
 
         return {"status": "success", "data": pipeline_data}
     except Exception as e:
@@ -403,14 +847,8 @@ async def get_pipeline_run(job_name: str, build_number: int):
 async def get_pipeline_log(job_name: str, build_number: int):
     """获取Pipeline日志"""
     try:
-        # 使用原始HTTP请求获取Pipeline日志
-        auth = (settings.JENKINS_USERNAME, settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD)
-        response = requests.get(
-            f"{settings.JENKINS_URL}/job/{quote(job_name)}/{build_number}/wfapi/log",
-            auth=auth
-        )
-        response.raise_for_status()
-        log_data = response.json()
+        jenkins = get_jenkins_service()
+        log_data = await jenkins.get_pipeline_log(job_name, build_number)
 
         return {"status": "success", "data": log_data}
     except Exception as e:
@@ -425,17 +863,13 @@ async def get_pipeline_log(job_name: str, build_number: int):
 # =============================================================================
 
 @router.get("/computer")
-async def get_nodes():
+async def get_nodes(request: Request):
     """获取所有节点信息"""
     try:
         jenkins = get_jenkins_service()
-        # 使用原始HTTP请求获取节点信息
-        auth = (settings.JENKINS_USERNAME, settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD)
-        response = requests.get(f"{settings.JENKINS_URL}/computer/api/json", auth=auth)
-        response.raise_for_status()
-        nodes_data = response.json()
-
-        return {"status": "success", "data": nodes_data}
+        nodes_data = await jenkins.get_nodes()
+        body = {"status": "success", "data": nodes_data}
+        return json_list_response(request, body, ("data", "computer"), cached_etag(jenkins.cache, nodes_data))
     except Exception as e:
         logger.error("获取节点信息失败", error=str(e))
         raise HTTPException(
@@ -447,14 +881,8 @@ async def get_nodes():
 async def get_node_info(node_name: str):
     """获取特定节点信息"""
     try:
-        # 使用原始HTTP请求获取特定节点信息
-        auth = (settings.JENKINS_USERNAME, settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD)
-        response = requests.get(
-            f"{settings.JENKINS_URL}/computer/{quote(node_name)}/api/json",
-            auth=auth
-        )
-        response.raise_for_status()
-        node_data = response.json()
+        jenkins = get_jenkins_service()
+        node_data = await jenkins.get_node_info(node_name)
 
         return {"status": "success", "data": node_data}
     except Exception as e:
@@ -468,16 +896,8 @@ async def get_node_info(node_name: str):
 async def toggle_node_offline(node_name: str, offline_message: Optional[str] = Body(default=None)):
     """切换节点在线/离线状态"""
     try:
-        # 使用原始HTTP请求切换节点状态
-        auth = (settings.JENKINS_USERNAME, settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD)
-        data = {"offlineMessage": offline_message} if offline_message else {}
-
-        response = requests.post(
-            f"{settings.JENKINS_URL}/computer/{quote(node_name)}/toggleOffline",
-            auth=auth,
-            data=data
-        )
-        response.raise_for_status()
+        jenkins = get_jenkins_service()
+        await jenkins.toggle_node_offline(node_name, offline_message)
 
         return {
             "status": "success",
@@ -499,7 +919,7 @@ async def get_current_user():
     """获取当前用户信息"""
     try:
         jenkins = get_jenkins_service()
-        user_info = jenkins.get_server_user()
+        user_info = await jenkins.get_server_user()
         return {"status": "success", "data": user_info}
     except Exception as e:
         logger.error("获取当前用户信息失败", error=str(e))
@@ -512,11 +932,8 @@ async def get_current_user():
 async def get_users():
     """获取所有用户列表"""
     try:
-        # 使用原始HTTP请求获取用户列表
-        auth = (settings.JENKINS_USERNAME, settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD)
-        response = requests.get(f"{settings.JENKINS_URL}/people/api/json", auth=auth)
-        response.raise_for_status()
-        users_data = response.json()
+        jenkins = get_jenkins_service()
+        users_data = await jenkins.get_people()
 
         return {"status": "success", "data": users_data}
     except Exception as e:
@@ -525,3 +942,20 @@ async def get_users():
             status_code=500,
             detail={"status": "error", "message": "获取用户列表失败", "error": str(e)}
         )
+
+# =============================================================================
+# 7. 运行统计接口
+# =============================================================================
+
+@router.get("/stats/upstream")
+async def get_upstream_stats():
+    """获取 Jenkins 上游访问统计（连接池等）"""
+    try:
+        jenkins = get_jenkins_service()
+        return {"status": "success", "data": jenkins.get_upstream_stats(), "timestamp": time.time()}
+    except Exception as e:
+        logger.error("获取上游统计失败", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": "获取上游统计失败", "error": str(e)}
+        )
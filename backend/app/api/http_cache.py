@@ -0,0 +1,83 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import Request, Response
+
+from app.core.tracing import TimedJSONResponse, span
+from app.services.response_cache import ResponseCache
+
+# 已结束构建的详情和日志不会再变化，允许浏览器和代理长期缓存
+IMMUTABLE = "public, max-age=31536000, immutable"
+# 可以缓存，但每次使用前必须带 If-None-Match 重新验证
+REVALIDATE = "no-cache"
+
+
+def _canonical_json(source: Any) -> bytes:
+    return json.dumps(source, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _list_digest(items: List[Any]) -> str:
+    """逐个元素编码并增量计算摘要，不生成整个列表的 JSON 文本"""
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        digest.update(_canonical_json(item))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def make_etag(source: Union[bytes, str, Any]) -> str:
+    """根据内容计算强 ETag，非字节/字符串内容按规范化 JSON 计算"""
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, bytes):
+        return f'"{hashlib.blake2b(source, digest_size=16).hexdigest()}"'
+    with span("etag"):
+        if isinstance(source, list):
+            return f'"{_list_digest(source)}"'
+        return f'"{hashlib.blake2b(_canonical_json(source), digest_size=16).hexdigest()}"'
+
+
+def cached_etag(cache: ResponseCache, source: Any) -> str:
+    """响应缓存中取出的（只读）列表/字典的 ETag：随缓存条目保存，条目刷新、失效或淘汰前重复请求无需重新序列化"""
+    return cache.etag(source, make_etag)
+
+
+def console_etag(base_url: str, job_name: str, build_number: int, content: bytes, complete: bool) -> str:
+    """控制台日志 ETag：已结束构建的日志只由长度决定（无需读取内容即可验证），运行中的按内容计算"""
+    if complete:
+        return finished_console_etag(base_url, job_name, build_number, len(content))
+    return make_etag(content)
+
+
+def finished_console_etag(base_url: str, job_name: str, build_number: int, size: int) -> str:
+    """已存储（已结束）构建日志的 ETag，与 console_etag 对完整日志的计算结果一致"""
+    return make_etag(f"{base_url}|{job_name}|{build_number}|{size}")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否命中（弱比较，支持 * 和多个 ETag）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == bare for candidate in if_none_match.split(","))
+
+
+def conditional_response(
+    request: Request,
+    body: Any,
+    etag: str,
+    immutable: bool = False,
+    response_class: type = TimedJSONResponse,
+    **response_kwargs: Any,
+) -> Response:
+    """带 ETag 的响应，请求的 If-None-Match 命中时返回 304 且不发送响应体
+
+    ETag 由调用方根据稳定内容计算（响应体中的 timestamp 等易变字段不参与计算）。
+    """
+    headers: Dict[str, str] = {"ETag": etag, "Cache-Control": IMMUTABLE if immutable else REVALIDATE}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return response_class(body, headers=headers, **response_kwargs)
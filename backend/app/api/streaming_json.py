@@ -0,0 +1,96 @@
+import json
+from functools import partial
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.api.http_cache import conditional_response
+from app.core.config import settings
+from app.core.tracing import span
+
+# 与 JSONResponse 的编码参数保持一致，流式响应与普通响应的内容完全相同
+_dumps = partial(json.dumps, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+# 占位符：外层结构编码后按它切分，大列表的位置由流式编码的元素填充
+_PLACEHOLDER = "\x00stream-json-items\x00"
+
+
+def _get_list(content: Mapping[str, Any], list_path: Sequence[str]) -> List[Any]:
+    node: Any = content
+    for key in list_path:
+        node = node[key]
+    return node
+
+
+def _split_envelope(content: Mapping[str, Any], list_path: Sequence[str]) -> Tuple[bytes, List[Any], bytes]:
+    """把响应拆成 (列表之前的 JSON, 列表, 列表之后的 JSON)
+
+    沿 list_path 浅拷贝各层字典后替换列表，不修改调用方（通常是缓存中）的数据。
+    """
+    envelope: Dict[str, Any] = dict(content)
+    node = envelope
+    for key in list_path[:-1]:
+        node[key] = dict(node[key])
+        node = node[key]
+    items = node[list_path[-1]]
+    node[list_path[-1]] = _PLACEHOLDER
+    prefix, _, suffix = _dumps(envelope).partition(_dumps(_PLACEHOLDER))
+    return prefix.encode("utf-8"), items, suffix.encode("utf-8")
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """流式编码的 JSON 响应
+
+    外层结构一次编码，list_path 指向的大列表按 batch_size 分批编码后逐块发送，不生成完整的 JSON 文本。
+    编码生成器是同步的，由 Starlette 在线程池中迭代，编码大列表时不阻塞事件循环。
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Mapping[str, Any],
+        list_path: Sequence[str],
+        batch_size: Optional[int] = None,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        prefix, items, suffix = _split_envelope(content, list_path)
+        batch_size = batch_size or settings.STREAM_JSON_BATCH_SIZE
+        super().__init__(
+            self._encode(prefix, items, suffix, batch_size),
+            status_code=status_code,
+            headers=headers,
+            media_type=self.media_type,
+        )
+
+    @staticmethod
+    def _encode(prefix: bytes, items: List[Any], suffix: bytes, batch_size: int) -> Iterator[bytes]:
+        if not items:
+            yield prefix + b"[]" + suffix
+            return
+        for start in range(0, len(items), batch_size):
+            # 整批编码后去掉首尾的方括号，比逐个元素编码再拼接快
+            with span("serialize"):
+                chunk = _dumps(items[start:start + batch_size])[1:-1].encode("utf-8")
+            if start == 0:
+                yield prefix + b"[" + chunk
+            else:
+                yield b"," + chunk
+        yield b"]" + suffix
+
+
+def json_list_response(
+    request: Request,
+    body: Mapping[str, Any],
+    list_path: Sequence[str],
+    etag: str,
+    immutable: bool = False,
+) -> Response:
+    """带 ETag 的 JSON 响应，list_path 指向的列表足够大时改为流式编码"""
+    if len(_get_list(body, list_path)) < settings.STREAM_JSON_MIN_ITEMS:
+        return conditional_response(request, body, etag, immutable)
+    return conditional_response(
+        request, body, etag, immutable, response_class=StreamingJSONResponse, list_path=list_path
+    )
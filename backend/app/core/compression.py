@@ -0,0 +1,166 @@
+import asyncio
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时只使用 gzip
+    brotli = None
+
+# 超过该大小的数据块在线程中压缩，避免阻塞事件循环
+_THREAD_THRESHOLD = 256 * 1024
+
+# 不压缩的响应类型：事件流需要逐条实时送达，图片等已是压缩格式
+_SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    """根据 Accept-Encoding 选择编码，优先 br，忽略 q=0 的编码"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        key, _, value = params.partition("=")
+        if key.strip() == "q":
+            try:
+                if float(value) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._obj.process
+            self._finish = self._obj.finish
+        else:
+            # wbits=31 生成带 gzip 头的数据
+            self._obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._compress = self._obj.compress
+            self._finish = self._obj.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """响应压缩中间件（gzip / brotli）
+
+    超过 minimum_size 的响应按客户端 Accept-Encoding 压缩；流式响应逐块压缩，不会先把整个响应体缓存下来。
+    已压缩、部分内容（206）、事件流等响应原样透传。压缩后的 ETag 改为弱 ETag，与 If-None-Match 的弱比较保持一致。
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._compressor: Optional[_Compressor] = None
+        self._passthrough = False
+
+    def _should_skip(self, headers: Headers, status: int) -> bool:
+        if status < 200 or status in (204, 206, 304):
+            return True
+        if "content-encoding" in headers or "content-range" in headers:
+            return True
+        content_type = headers.get("content-type", "")
+        return any(content_type.startswith(prefix) for prefix in _SKIP_CONTENT_TYPES)
+
+    def _compressed_start(self, content_length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=list(self._start["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if content_length is None:
+            del headers["content-length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        return {**self._start, "headers": headers.raw}
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self._start = message
+            headers = Headers(raw=message["headers"])
+            self._passthrough = self._should_skip(headers, message["status"])
+            if self._passthrough:
+                await self._send(message)
+            return
+        if message_type != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._compressor is None:
+            if not more_body:
+                # 完整响应体一次发送：小于阈值时不压缩
+                if len(body) < self.middleware.minimum_size:
+                    self._passthrough = True
+                    await self._send(self._start)
+                    await self._send(message)
+                    return
+                compressor = self._new_compressor()
+                compressed = await self._run(lambda: compressor.compress(body) + compressor.finish(), len(body))
+                await self._send(self._compressed_start(len(compressed)))
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            # 流式响应：总长度未知，逐块压缩
+            self._compressor = self._new_compressor()
+            await self._send(self._compressed_start(None))
+
+        compressor = self._compressor
+
+        def compress_chunk() -> bytes:
+            chunks: List[bytes] = [compressor.compress(body)]
+            if not more_body:
+                chunks.append(compressor.finish())
+            return b"".join(chunks)
+
+        data = await self._run(compress_chunk, len(body))
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    @staticmethod
+    async def _run(fn, size: int) -> bytes:
+        if size >= _THREAD_THRESHOLD:
+            return await asyncio.to_thread(fn)
+        return fn()
+
+    def _new_compressor(self) -> _Compressor:
+        return _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -20,6 +20,99 @@ class Settings(BaseSettings):
     JENKINS_PASSWORD: Optional[str] = Field(default='admin', description="Jenkins 密码")
     JENKINS_API_TOKEN: Optional[str] = Field(default='2c979226facf44ad99359e0655563c9f', description="Jenkins API Token")
     
+    # Jenkins 上游连接池配置
+    JENKINS_CONNECT_TIMEOUT: float = Field(default=5.0, description="Jenkins 建立连接超时（秒）")
+    JENKINS_READ_TIMEOUT: float = Field(default=30.0, description="Jenkins 读取响应超时（秒）")
+    JENKINS_POOL_TIMEOUT: float = Field(default=10.0, description="等待连接池空闲连接超时（秒）")
+    JENKINS_POOL_MAX_CONNECTIONS: int = Field(default=100, description="每个 Jenkins 主机的最大连接数")
+    JENKINS_POOL_MAX_KEEPALIVE: int = Field(default=20, description="每个 Jenkins 主机保持的最大空闲连接数")
+    JENKINS_POOL_KEEPALIVE_EXPIRY: float = Field(default=60.0, description="空闲 keep-alive 连接的保留时间（秒）")
+    
+    # Jenkins 熔断配置
+    CIRCUIT_FAILURE_THRESHOLD: int = Field(default=3, ge=1, description="连续失败多少次后熔断（连接失败或 502/503/504）")
+    CIRCUIT_BACKOFF_INITIAL: float = Field(default=1.0, gt=0, description="熔断后首次探测的等待时间（秒），之后每次失败翻倍")
+    CIRCUIT_BACKOFF_MAX: float = Field(default=60.0, gt=0, description="熔断探测的最长间隔（秒）")
+    
+    # Jenkins 健康探测配置
+    HEALTH_PROBE_INTERVAL: float = Field(default=10.0, gt=0, description="后台健康探测间隔（秒）")
+    HEALTH_PROBE_TIMEOUT: float = Field(default=5.0, gt=0, description="单次健康探测超时（秒）")
+    HEALTH_LATENCY_WINDOW: int = Field(default=60, ge=1, description="计算延迟百分位使用的最近探测次数")
+    
+    # 响应缓存配置（TTL 为 0 表示该类别不缓存）
+    CACHE_MAX_ENTRIES: int = Field(default=1024, description="响应缓存最大条目数（LRU 淘汰）")
+    CACHE_STALE_TTL: float = Field(default=60.0, description="过期后仍可返回旧值并后台刷新的时间窗口（秒）")
+    CACHE_TTL_SERVER_INFO: float = Field(default=60.0, description="服务器信息缓存时间（秒）")
+    CACHE_TTL_JOBS: float = Field(default=10.0, description="任务列表缓存时间（秒）")
+    CACHE_TTL_PLUGINS: float = Field(default=300.0, description="插件列表缓存时间（秒）")
+    CACHE_TTL_NODES: float = Field(default=15.0, description="节点列表缓存时间（秒）")
+    CACHE_TTL_PEOPLE: float = Field(default=300.0, description="用户列表缓存时间（秒）")
+    CACHE_TTL_CURRENT_USER: float = Field(default=300.0, description="当前用户信息缓存时间（秒）")
+    
+    # 构建实时事件流配置
+    BUILD_STREAM_POLL_INTERVAL: float = Field(default=2.0, description="构建事件流轮询 Jenkins 的间隔（秒）")
+    BUILD_STREAM_MAX_EVENTS: int = Field(default=256, ge=2, description="每个订阅者最多积压的事件数，超出后断开")
+    BUILD_STREAM_HEARTBEAT: float = Field(default=15.0, description="事件流心跳间隔（秒）")
+    
+    # 队列跟踪配置
+    QUEUE_WATCH_INTERVAL: float = Field(default=1.0, description="队列跟踪轮询间隔（秒）")
+    QUEUE_WATCH_MAX_WAIT: float = Field(default=1800.0, description="队列项最长跟踪时间（秒），超过后标记为 expired")
+    
+    # 构建日志本地存储配置
+    LOG_STORE_DIR: str = Field(default="data/build_logs", description="已完成构建日志的本地存储目录")
+    LOG_STORE_MAX_BYTES: int = Field(default=2 * 1024 ** 3, description="日志存储占用上限（压缩后字节数），超过后按 LRU 淘汰")
+    LOG_STORE_BLOCK_SIZE: int = Field(default=256 * 1024, ge=4096, description="日志压缩分块大小（字节），决定区间读取的粒度")
+    
+    # 构建日志搜索配置
+    LOG_SEARCH_FETCH_CONCURRENCY: int = Field(default=8, ge=1, description="日志搜索时并发获取日志的数量")
+    LOG_SEARCH_WORKERS: Optional[int] = Field(default=None, ge=1, description="日志扫描进程池大小，默认为 CPU 核数")
+    LOG_SEARCH_MAX_BUILDS: int = Field(default=500, ge=1, description="单次搜索最多覆盖的构建数")
+    LOG_SEARCH_MAX_MATCHES_PER_BUILD: int = Field(default=100, ge=1, description="单个构建最多返回的匹配行数")
+    LOG_SEARCH_SCAN_TIMEOUT: float = Field(default=30.0, gt=0, description="单个构建日志的正则扫描时限（秒），超时的构建标记为 skipped 并重建扫描进程池")
+    LOG_SEARCH_MAX_PATTERN_LENGTH: int = Field(default=500, ge=1, description="搜索正则表达式的最大长度")
+    
+    # 构建历史同步配置
+    HISTORY_DB_PATH: str = Field(default="data/build_history.db", description="构建历史 SQLite 数据库路径")
+    HISTORY_SYNC_INTERVAL: float = Field(default=30.0, description="构建历史增量同步间隔（秒）")
+    HISTORY_SYNC_CONCURRENCY: int = Field(default=4, ge=1, description="同步时并发拉取任务构建列表的数量")
+    HISTORY_SYNC_MAX_BUILDS_PER_JOB: int = Field(default=100, ge=1, description="单个任务每次同步最多拉取的构建数，超出部分在之后的周期继续向前回填")
+    
+    # 任务索引配置
+    JOB_INDEX_REFRESH_INTERVAL: float = Field(default=10.0, description="任务索引后台刷新间隔（秒）")
+    
+    # 任务树递归遍历配置
+    JOB_CRAWL_CONCURRENCY: int = Field(default=8, ge=1, description="遍历文件夹时的最大并发请求数")
+    JOB_CRAWL_FOLDER_TTL: float = Field(default=300.0, description="普通文件夹子项缓存时间（秒）")
+    JOB_CRAWL_COMPUTED_FOLDER_TTL: float = Field(default=60.0, description="多分支项目/组织文件夹子项缓存时间（秒）")
+    
+    # 批量操作配置（所有批量写操作共享限速）
+    BATCH_CONCURRENCY: int = Field(default=50, ge=1, description="单次批量操作的最大并发请求数")
+    BATCH_RATE_LIMIT: float = Field(default=50.0, gt=0, description="批量写操作的平均速率上限（次/秒）")
+    BATCH_RATE_BURST: int = Field(default=50, ge=1, description="批量写操作允许的突发次数")
+    BATCH_MAX_ITEMS: int = Field(default=200, ge=1, description="单次批量操作最多包含的项数")
+    
+    # 响应压缩与流式编码配置
+    RESPONSE_COMPRESSION_MIN_SIZE: int = Field(default=1024, ge=0, description="超过该大小（字节）的响应才压缩")
+    RESPONSE_GZIP_LEVEL: int = Field(default=6, ge=1, le=9, description="gzip 压缩级别")
+    RESPONSE_BROTLI_QUALITY: int = Field(default=4, ge=0, le=11, description="brotli 压缩质量（需安装 brotli）")
+    STREAM_JSON_MIN_ITEMS: int = Field(default=500, ge=1, description="列表元素数达到该值时改为流式编码 JSON")
+    STREAM_JSON_BATCH_SIZE: int = Field(default=200, ge=1, description="流式编码时每个数据块包含的列表元素数")
+    
+    # 多控制器联邦配置
+    JENKINS_CONTROLLER_NAME: str = Field(default="default", description="JENKINS_URL 对应控制器在联邦查询中的名称")
+    JENKINS_CONTROLLERS: List[Dict[str, str]] = Field(
+        default=[],
+        description='其他 Jenkins 控制器（JSON 列表）: [{"name": ..., "url": ..., "username": ..., "api_token" 或 "password": ...}]'
+    )
+    FEDERATION_TIMEOUT: float = Field(default=5.0, gt=0, description="联邦查询中单个控制器的响应期限（秒），超时的控制器不阻塞其他结果")
+    
+    # 指标配置
+    METRICS_LOOP_LAG_INTERVAL: float = Field(default=0.5, gt=0, description="事件循环延迟采样间隔（秒）")
+    
+    # 请求耗时分解配置
+    SERVER_TIMING_ENABLED: bool = Field(default=True, description="是否在响应头中返回 Server-Timing 耗时分解")
+    TRACE_SLOW_THRESHOLD_MS: float = Field(default=1000.0, ge=0, description="总耗时超过该值（毫秒）的请求记录完整耗时分解日志")
+    TRACE_SLOW_SAMPLE_RATE: float = Field(default=1.0, ge=0, le=1, description="慢请求日志的采样比例（0~1）")
+    
     # 日志配置
     LOG_LEVEL: str = Field(default="INFO", description="日志级别")
     LOG_FORMAT: str = Field(default="console", description="日志格式")
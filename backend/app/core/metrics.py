@@ -0,0 +1,270 @@
+"""
+Prometheus 文本格式指标
+
+不依赖 prometheus_client：所有记录都发生在事件循环线程中，计数直接自增，不加锁；
+直方图每个标签组合只保存各桶的计数，抓取时才累加为 Prometheus 要求的累积桶。
+抓取时才能得到的值（缓存命中率、熔断状态等）通过 add_collector 注册的函数生成。
+"""
+import asyncio
+import bisect
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import structlog
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = structlog.get_logger("metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 请求/上游延迟的默认分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 事件循环延迟分桶（秒）
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def sample_lines(
+    name: str,
+    help_text: str,
+    metric_type: str,
+    samples: Iterable[Tuple[Dict[str, str], float]],
+) -> List[str]:
+    """为抓取时计算的指标生成文本行，samples 为 (标签字典, 值)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+    return lines
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        REGISTRY.register(self)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self) -> List[str]:
+        lines = self._header()
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    metric_type = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self._values[labels] = value
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, _HistogramSeries] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _HistogramSeries(len(self.buckets) + 1)
+        # 落在第一个上界 >= value 的桶，超过所有上界时落在 +Inf 桶
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.total += value
+        series.count += 1
+
+    def collect(self) -> List[str]:
+        lines = self._header()
+        bounds = [*(_format_value(b) for b in self.buckets), "+Inf"]
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series.counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(series.total)}")
+            lines.append(f"{self.name}_count{label_text} {series.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """注册抓取时调用的函数，返回完整的指标文本行（含 HELP/TYPE）"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logger.warning("指标采集失败", collector=getattr(collector, "__name__", str(collector)), error=str(e))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# -----------------------------------------------------------------------------
+# 指标定义
+# -----------------------------------------------------------------------------
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP 请求处理耗时（到响应发送完毕）", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "正在处理的 HTTP 请求数")
+HTTP_RESPONSE_BYTES = Counter("http_response_bytes_total", "HTTP 响应体字节数（压缩后）", ("route",))
+
+UPSTREAM_DURATION = Histogram(
+    "jenkins_upstream_request_duration_seconds", "Jenkins 上游请求耗时", ("controller", "operation", "outcome")
+)
+UPSTREAM_IN_FLIGHT = Gauge("jenkins_upstream_requests_in_flight", "正在进行的 Jenkins 上游请求数", ("controller",))
+UPSTREAM_BYTES = Counter(
+    "jenkins_upstream_response_bytes_total", "从 Jenkins 接收的字节数（压缩前的传输字节）", ("controller", "operation")
+)
+
+EVENT_LOOP_LAG = Histogram("event_loop_lag_seconds", "事件循环调度延迟", buckets=LOOP_LAG_BUCKETS)
+EVENT_LOOP_LAG_LAST = Gauge("event_loop_lag_last_seconds", "最近一次测得的事件循环调度延迟")
+
+
+def add_collector(collector: Callable[[], Iterable[str]]) -> None:
+    REGISTRY.add_collector(collector)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# -----------------------------------------------------------------------------
+# HTTP 请求指标中间件
+# -----------------------------------------------------------------------------
+
+class MetricsMiddleware:
+    """记录每个请求的耗时、状态码和响应字节数
+
+    route 标签使用路由模板（如 /jenkins-pro/build/{job_name}/{build_number}），避免任务名等路径参数造成标签爆炸；
+    没有匹配到路由的请求记为 unmatched。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        sent = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, (scope["method"], route_path, str(status)))
+            if sent:
+                HTTP_RESPONSE_BYTES.inc((route_path,), sent)
+
+
+# -----------------------------------------------------------------------------
+# 事件循环延迟
+# -----------------------------------------------------------------------------
+
+class LoopLagMonitor:
+    """每隔 interval 秒 sleep 一次，实际唤醒时间与预期的差值即为事件循环被阻塞的时间"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            EVENT_LOOP_LAG.observe(lag)
+            EVENT_LOOP_LAG_LAST.set(lag)
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
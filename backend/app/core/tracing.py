@@ -0,0 +1,146 @@
+"""
+请求级耗时分解
+
+每个请求开始时创建一个 RequestTrace 放入 ContextVar，Jenkins 上游调用、JSON 解码、ETag 计算和响应序列化
+通过 span() 记录各自的耗时。响应发出时按名称汇总为 Server-Timing 响应头（浏览器开发者工具可直接查看）；
+总耗时超过 TRACE_SLOW_THRESHOLD_MS 的请求按 TRACE_SLOW_SAMPLE_RATE 采样，把完整的 span 列表写入日志。
+没有 RequestTrace 的上下文（后台任务）中 span() 不做任何记录。
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = structlog.get_logger("tracing")
+
+# 单个请求最多保留的 span 数，超出后只累计汇总值
+_MAX_SPANS = 200
+
+_current: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    __slots__ = ("started", "spans", "totals", "counters", "dropped")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (名称, 相对请求开始的起点秒数, 耗时秒数, 说明)
+        self.spans: List[Tuple[str, float, float, Optional[str]]] = []
+        # 名称 -> [总耗时, 次数]
+        self.totals: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.dropped = 0
+
+    def add(self, name: str, started: float, duration: float, detail: Optional[str] = None) -> None:
+        total = self.totals.get(name)
+        if total is None:
+            self.totals[name] = [duration, 1]
+        else:
+            total[0] += duration
+            total[1] += 1
+        if len(self.spans) < _MAX_SPANS:
+            self.spans.append((name, started - self.started, duration, detail))
+        else:
+            self.dropped += 1
+
+    def count(self, name: str) -> None:
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    def server_timing(self, total: float) -> str:
+        entries = [
+            f'{name};dur={duration * 1000:.1f};desc="x{int(count)}"'
+            for name, (duration, count) in self.totals.items()
+        ]
+        entries.extend(f'{name};desc="{count}"' for name, count in self.counters.items())
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def span(name: str, detail: Optional[str] = None) -> Iterator[None]:
+    """记录一段耗时，当前上下文没有请求追踪时不做任何事"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, started, time.perf_counter() - started, detail)
+
+
+def count(name: str) -> None:
+    """记录一次事件（如缓存命中），在 Server-Timing 中只显示次数"""
+    trace = _current.get()
+    if trace is not None:
+        trace.count(name)
+
+
+class TimedJSONResponse(JSONResponse):
+    """记录响应体 JSON 编码耗时的 JSONResponse"""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            return super().render(content)
+
+
+class TracingMiddleware:
+    """为每个请求创建 RequestTrace，在响应头中写入 Server-Timing，并对慢请求采样记录日志
+
+    响应头发出之后的耗时（如流式响应体的编码和发送）不计入 Server-Timing，但计入慢请求日志的总耗时。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current.set(trace)
+        status = 500
+        first_byte: Optional[float] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, first_byte
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                first_byte = time.perf_counter() - trace.started
+                if settings.SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append("Server-Timing", trace.server_timing(first_byte))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - trace.started
+            if elapsed * 1000 >= settings.TRACE_SLOW_THRESHOLD_MS and random.random() < settings.TRACE_SLOW_SAMPLE_RATE:
+                route = getattr(scope.get("route"), "path", None)
+                logger.warning(
+                    "慢请求",
+                    method=scope["method"],
+                    path=scope["path"],
+                    route=route,
+                    status=status,
+                    duration_ms=round(elapsed * 1000, 1),
+                    first_byte_ms=round(first_byte * 1000, 1) if first_byte is not None else None,
+                    totals_ms={name: round(total[0] * 1000, 1) for name, total in trace.totals.items()},
+                    counters=trace.counters,
+                    spans=[
+                        {"name": name, "start_ms": round(start * 1000, 1), "duration_ms": round(duration * 1000, 1), "detail": detail}
+                        for name, start, duration, detail in trace.spans
+                    ],
+                    dropped_spans=trace.dropped,
+                )
@@ -1,16 +1,45 @@
 import time
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core import metrics
+from app.core.tracing import TimedJSONResponse, TracingMiddleware
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.logging_config import setup_logging, logger
-from app.api.endpoints import jenkins, jenkins_pro
-from app.api.deps import get_jenkins_service
+from app.api.endpoints import federation, health, jenkins, jenkins_pro
+from app.api.deps import active_jenkins_services, get_jenkins_service, close_jenkins_service
+from app.services.log_store import build_log_store
+from app.services.response_cache import track_stale
+from app.services.service_metrics import jenkins_metrics
 
 # 在应用启动前配置好日志
 setup_logging()
 
+loop_lag_monitor = metrics.LoopLagMonitor(settings.METRICS_LOOP_LAG_INTERVAL)
+
+# 抓取 /metrics 时从已创建的各控制器服务读取缓存、熔断和连接池状态
+metrics.add_collector(lambda: jenkins_metrics(active_jenkins_services()))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动构建历史同步、健康探测和事件循环延迟采样，关闭时停止后台任务并释放 Jenkins 连接"""
+    loop_lag_monitor.ensure_started()
+    # 在线程中扫描本地构建日志索引，避免首个日志请求在事件循环上做磁盘 IO
+    await build_log_store.ensure_loaded()
+    try:
+        jenkins_svc = get_jenkins_service()
+        jenkins_svc.build_history.ensure_started()
+        jenkins_svc.health.ensure_started()
+    except ConnectionError as e:
+        logger.warning("Jenkins 服务不可用，构建历史同步和健康探测将在首次请求时启动", error=str(e))
+    yield
+    await loop_lag_monitor.aclose()
+    await close_jenkins_service()
+
 def create_app() -> FastAPI:
     """创建并配置 FastAPI 应用"""
     app = FastAPI(
@@ -19,6 +48,8 @@ def create_app() -> FastAPI:
         description="简化的 Jenkins REST API 通信验证工具",
         docs_url="/docs" if settings.DEBUG else None,
         redoc_url="/redoc" if settings.DEBUG else None,
+        lifespan=lifespan,
+        default_response_class=TimedJSONResponse,
     )
 
     # 配置 CORS
@@ -28,8 +59,20 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Warning", "X-Jenkins-Stale", "Server-Timing"],
     )
 
+    # 响应压缩（gzip / brotli），流式响应逐块压缩
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE,
+        gzip_level=settings.RESPONSE_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_BROTLI_QUALITY,
+    )
+
+    # 请求耗时分解（Server-Timing 响应头、慢请求日志）
+    app.add_middleware(TracingMiddleware)
+
     # 请求日志中间件
     @app.middleware("http")
     async def log_requests(request: Request, call_next) -> Response:
@@ -45,9 +88,24 @@ def create_app() -> FastAPI:
         )
         return response
 
+    # Jenkins 不可用时接口可能返回过期缓存，通过响应头标记（X-Jenkins-Stale 为数据年龄，秒）
+    @app.middleware("http")
+    async def mark_stale_responses(request: Request, call_next) -> Response:
+        stale_ages = track_stale()
+        response = await call_next(request)
+        if stale_ages:
+            response.headers["Warning"] = '110 - "Response is Stale"'
+            response.headers["X-Jenkins-Stale"] = str(round(max(stale_ages)))
+        return response
+
+    # 请求指标：最后注册即为最外层，包含压缩后的响应字节数和上面所有中间件的耗时
+    app.add_middleware(metrics.MetricsMiddleware)
+
     # 包含 API 路由
     app.include_router(jenkins.router, prefix="/jenkins", tags=["Jenkins"])
     app.include_router(jenkins_pro.router, prefix="/jenkins-pro", tags=["Jenkins Pro"])
+    app.include_router(federation.router, prefix="/federation", tags=["Federation"])
+    app.include_router(health.router, prefix="/health", tags=["Health"])
 
     # 定义根路径和健康检查
     @app.get("/", tags=["General"])
@@ -58,16 +116,18 @@ def create_app() -> FastAPI:
             "status": "running"
         }
 
+    @app.get("/metrics", tags=["General"], include_in_schema=False)
+    async def prometheus_metrics():
+        """Prometheus 文本格式指标"""
+        return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
     @app.get("/health", tags=["General"])
     async def health_check():
+        """健康检查：直接返回后台探测的 Jenkins 状态快照，不访问 Jenkins"""
         try:
             jenkins_svc = get_jenkins_service()
-            server_info = jenkins_svc.get_server_info()
-            jenkins_status = {
-                "status": "connected",
-                "url": settings.JENKINS_URL,
-                "version": server_info.get("version", "unknown"),
-            }
+            jenkins_svc.health.ensure_started()
+            jenkins_status = jenkins_svc.health.snapshot()
         except Exception as e:
             jenkins_status = {
                 "status": "disconnected",
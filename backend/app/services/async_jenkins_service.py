@@ -0,0 +1,613 @@
+import asyncio
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+import httpx
+import structlog
+from fastapi import HTTPException
+from app.core.config import settings
+from app.services.jenkins_transport import JenkinsTransport, job_path
+from app.services.response_cache import ResponseCache
+from app.services.build_stream import BuildStreamHub
+from app.services.queue_watcher import QueueWatcher
+from app.services.log_store import build_log_store
+from app.services.log_search import BuildLogSearch
+from app.services.build_history import BuildHistorySync, get_build_history_store
+from app.services.build_analytics import BuildAnalytics
+from app.services.job_index import JobIndex
+from app.services.job_crawler import JobCrawler
+from app.services.batch_ops import BatchOperations
+from app.services.health_prober import HealthProber
+from app.services import jenkins_tree
+
+logger = structlog.get_logger("async_jenkins_service")
+
+
+def _is_not_found(error: Exception) -> bool:
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 404
+
+
+class AsyncJenkinsService:
+    """Jenkins 异步服务封装
+
+    与 JenkinsService 保持相同的方法签名，但通过 JenkinsTransport 共享的 httpx 连接池
+    非阻塞地访问 Jenkins REST API，端点中直接 await 即可，不会阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        name: Optional[str] = None,
+    ):
+        self.url = (url or settings.JENKINS_URL).rstrip("/")
+        # 控制器名称，用于联邦查询结果和指标标签
+        self.name = name or settings.JENKINS_CONTROLLER_NAME
+        self.username = username or settings.JENKINS_USERNAME
+        if not self.username:
+            raise ValueError("必须提供 JENKINS_USERNAME")
+
+        # 优先使用 API Token，如果没有则使用密码
+        auth_credential = password or settings.JENKINS_API_TOKEN or settings.JENKINS_PASSWORD
+        if not auth_credential:
+            raise ValueError("必须提供 JENKINS_API_TOKEN 或 JENKINS_PASSWORD")
+        self.auth_method = "API Token" if (password is None and settings.JENKINS_API_TOKEN) else "Password"
+
+        self.transport = JenkinsTransport(self.url, (self.username, auth_credential), name=self.name)
+        self.cache = ResponseCache(
+            ttls={
+                "server_info": settings.CACHE_TTL_SERVER_INFO,
+                "jobs": settings.CACHE_TTL_JOBS,
+                "plugins": settings.CACHE_TTL_PLUGINS,
+                "nodes": settings.CACHE_TTL_NODES,
+                "people": settings.CACHE_TTL_PEOPLE,
+                "current_user": settings.CACHE_TTL_CURRENT_USER,
+            },
+            stale_ttl=settings.CACHE_STALE_TTL,
+            max_entries=settings.CACHE_MAX_ENTRIES,
+        )
+        self.build_streams = BuildStreamHub(self)
+        self.queue_watcher = QueueWatcher(self)
+        self.log_store = build_log_store
+        self.log_search = BuildLogSearch(self)
+        self.build_history = BuildHistorySync(self, get_build_history_store())
+        self.build_analytics = BuildAnalytics(self.build_history)
+        self.job_index = JobIndex(self)
+        self.job_crawler = JobCrawler(self)
+        self.batch = BatchOperations(self)
+        self.health = HealthProber(self)
+
+        logger.info("Jenkins 异步服务初始化成功", url=self.url, username=self.username, auth_method=self.auth_method)
+
+    async def aclose(self) -> None:
+        """停止后台任务并关闭底层连接池"""
+        await self.build_streams.aclose()
+        await self.queue_watcher.aclose()
+        await self.build_history.aclose()
+        await self.build_analytics.aclose()
+        await self.job_index.aclose()
+        await self.job_crawler.aclose()
+        await self.health.aclose()
+        await self.log_search.aclose()
+        await self.transport.aclose()
+
+    # -------------------------------------------------------------------------
+    # 底层请求
+    # -------------------------------------------------------------------------
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        return await self.transport.request(method, path, **kwargs)
+
+    async def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return await self.transport.get_json(path, params=params)
+
+    async def _get_cached_json(self, category: str, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """带缓存的 GET 请求，缓存条目按路径和查询参数区分"""
+        key = (path, tuple(sorted((params or {}).items())))
+        return await self.cache.get_or_load(category, key, lambda: self._get_json(path, params))
+
+    def _invalidate_jobs(self) -> None:
+        """任务发生变更后失效任务列表（服务器信息中也包含任务列表）"""
+        self.cache.invalidate("jobs")
+        self.cache.invalidate("server_info")
+        self.job_index.request_refresh()
+
+    def get_upstream_stats(self) -> Dict[str, Any]:
+        """上游访问统计"""
+        return {
+            "transport": self.transport.stats(),
+            "single_flight": self.transport.single_flight.stats(),
+            "cache": self.cache.stats(),
+            "build_streams": self.build_streams.stats(),
+            "queue_watcher": self.queue_watcher.stats(),
+            "log_store": self.log_store.stats(),
+            "log_search": self.log_search.stats(),
+            "build_history": self.build_history.stats(),
+            "build_analytics": self.build_analytics.stats(),
+            "job_index": self.job_index.stats(),
+            "job_crawler": self.job_crawler.stats(),
+            "batch": self.batch.stats(),
+            "health": self.health.stats(),
+        }
+
+    # -------------------------------------------------------------------------
+    # 服务器信息
+    # -------------------------------------------------------------------------
+
+    async def test_connection(self) -> Dict[str, Any]:
+        """测试 Jenkins 连接"""
+        try:
+            user_info = await self.get_server_user()
+            version = await self.get_server_version()
+
+            result = {
+                "connected": True,
+                "user": user_info,
+                "version": version,
+                "url": self.url,
+                "auth_method": self.auth_method
+            }
+
+            logger.info("Jenkins 连接测试成功", **result)
+            return result
+
+        except Exception as e:
+            logger.error("Jenkins 连接测试失败", error=str(e))
+            return {
+                "connected": False,
+                "error": str(e),
+                "url": self.url
+            }
+
+    async def get_server_user(self) -> Dict[str, Any]:
+        """获取 Jenkins 服务器用户"""
+        try:
+            return await self._get_cached_json("current_user", "me/api/json", params={"depth": 0})
+        except Exception as e:
+            logger.error("获取 Jenkins 服务器用户失败", error=str(e))
+            raise
+
+    async def get_server_version(self) -> Optional[str]:
+        """获取 Jenkins 服务器版本"""
+        try:
+            response = await self._request("GET", "api/json", params={"tree": "mode"})
+            return response.headers.get("X-Jenkins")
+        except Exception as e:
+            logger.error("获取 Jenkins 服务器版本失败", error=str(e))
+
+    async def get_server_info(self) -> Dict[str, Any]:
+        """获取服务器信息"""
+        try:
+            info = await self._get_cached_json("server_info", "api/json")
+            logger.info("获取 Jenkins 服务器信息成功", version=info.get("version"))
+            return info
+        except Exception as e:
+            logger.error("获取 Jenkins 服务器信息失败", error=str(e))
+            raise
+
+    # -------------------------------------------------------------------------
+    # 任务管理
+    # -------------------------------------------------------------------------
+
+    async def get_jobs(self, depth: int = 1) -> List[Dict[str, Any]]:
+        """获取任务列表，depth 决定投影包含的字段"""
+        try:
+            data = await self._get_cached_json("jobs", "api/json", params={"tree": jenkins_tree.jobs_tree(depth)})
+            jobs = data.get("jobs", [])
+            for job in jobs:
+                job.setdefault("fullname", job.get("fullName") or job.get("name"))
+            logger.info("获取任务列表成功", job_count=len(jobs))
+            return jobs
+        except Exception as e:
+            logger.error("获取任务列表失败", error=str(e))
+            raise
+
+    async def get_job_info(self, job_name: str, depth: int = 1, tree: Optional[str] = None) -> Dict[str, Any]:
+        """获取任务详情，指定 tree 时只返回投影字段（此时 depth 不生效）"""
+        params = {"tree": tree} if tree else {"depth": depth}
+        try:
+            job_info = await self._get_json(f"{job_path(job_name)}/api/json", params=params)
+            logger.info("获取任务详情成功", job_name=job_name)
+            return job_info
+        except httpx.HTTPStatusError as e:
+            if _is_not_found(e):
+                logger.warning("任务不存在", job_name=job_name)
+                raise HTTPException(status_code=404, detail=f"任务 '{job_name}' 不存在")
+            logger.error("获取任务详情失败", job_name=job_name, error=str(e))
+            raise
+        except Exception as e:
+            logger.error("获取任务详情失败", job_name=job_name, error=str(e))
+            raise
+
+    async def get_job_builds(self, job_name: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """获取任务构建摘要（按构建号倒序），跳过最新的 offset 条后取 limit 条"""
+        job_info = await self.get_job_info(job_name, tree=jenkins_tree.job_builds_tree(limit, offset))
+        return job_info.get(jenkins_tree.job_builds_field(limit, offset), [])[:limit]
+
+    async def get_job_parameters(self, job_name: str) -> List[Dict[str, Any]]:
+        """获取任务参数定义"""
+        job_info = await self.get_job_info(job_name, tree=jenkins_tree.JOB_PARAMETERS_TREE)
+        for prop in job_info.get("property", []):
+            if prop.get("parameterDefinitions"):
+                return prop["parameterDefinitions"]
+        return []
+
+    async def get_last_build_number(self, job_name: str) -> Optional[int]:
+        """获取任务最近一次构建号，没有构建时返回 None"""
+        job_info = await self.get_job_info(job_name, tree=jenkins_tree.JOB_LAST_BUILD_TREE)
+        last_build = job_info.get("lastBuild")
+        return last_build["number"] if last_build else None
+
+    async def create_job(self, job_name: str, config_xml: str) -> None:
+        """创建任务"""
+        folder, _, short_name = job_name.rpartition("/")
+        path = f"{job_path(folder)}/createItem" if folder else "createItem"
+        try:
+            await self._request(
+                "POST",
+                path,
+                params={"name": short_name},
+                content=config_xml.encode("utf-8"),
+                headers={"Content-Type": "text/xml; charset=utf-8"},
+            )
+            self._invalidate_jobs()
+            self.job_crawler.invalidate(job_name)
+            logger.info("创建任务成功", job_name=job_name)
+        except Exception as e:
+            logger.error("创建任务失败", job_name=job_name, error=str(e))
+            raise
+
+    async def delete_job(self, job_name: str) -> None:
+        """删除任务"""
+        try:
+            await self._request("POST", f"{job_path(job_name)}/doDelete")
+            self._invalidate_jobs()
+            self.job_crawler.invalidate(job_name)
+            logger.info("删除任务成功", job_name=job_name)
+        except Exception as e:
+            logger.error("删除任务失败", job_name=job_name, error=str(e))
+            raise
+
+    async def enable_job(self, job_name: str) -> None:
+        """启用任务"""
+        try:
+            await self._request("POST", f"{job_path(job_name)}/enable")
+            self._invalidate_jobs()
+            logger.info("启用任务成功", job_name=job_name)
+        except Exception as e:
+            logger.error("启用任务失败", job_name=job_name, error=str(e))
+            raise
+
+    async def disable_job(self, job_name: str) -> None:
+        """禁用任务"""
+        try:
+            await self._request("POST", f"{job_path(job_name)}/disable")
+            self._invalidate_jobs()
+            logger.info("禁用任务成功", job_name=job_name)
+        except Exception as e:
+            logger.error("禁用任务失败", job_name=job_name, error=str(e))
+            raise
+
+    # -------------------------------------------------------------------------
+    # 构建控制
+    # -------------------------------------------------------------------------
+
+    async def build_job(self, job_name: str, parameters: Dict[str, Any] = None) -> int:
+        """触发任务构建"""
+        try:
+            logger.info("开始触发任务构建", job_name=job_name, parameters=parameters)
+            if parameters:
+                response = await self._request(
+                    "POST", f"{job_path(job_name)}/buildWithParameters", params=parameters
+                )
+            else:
+                response = await self._request("POST", f"{job_path(job_name)}/build")
+
+            location = response.headers.get("Location")
+            if not location:
+                raise HTTPException(status_code=500, detail="Jenkins 异常: 响应中缺少 Location 头")
+            # Location 形如 http://jenkins/queue/item/25/
+            queue_id = int(location.rstrip("/").split("/")[-1])
+
+            self._invalidate_jobs()
+            # 立即开始跟踪队列项，调用方随后查询构建号时可直接拿到结果
+            self.queue_watcher.watch(queue_id, job_name)
+            logger.info("触发任务构建成功", job_name=job_name, queue_id=queue_id)
+            return queue_id
+
+        except httpx.HTTPStatusError as e:
+            if _is_not_found(e):
+                logger.warning("任务不存在", job_name=job_name)
+                raise HTTPException(status_code=404, detail=f"任务 '{job_name}' 不存在")
+            logger.error("Jenkins 异常", job_name=job_name, error=str(e), error_type=type(e).__name__)
+            raise HTTPException(status_code=500, detail=f"Jenkins 异常: {str(e)}")
+        except Exception as e:
+            logger.error("触发任务构建失败", job_name=job_name, error=str(e), error_type=type(e).__name__)
+            raise
+
+    async def get_build_info(
+        self, job_name: str, build_number: int, tree: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """获取构建详情，指定 tree 时只返回投影字段"""
+        params = {"tree": tree} if tree else {"depth": 0}
+        try:
+            build_info = await self._get_json(
+                f"{job_path(job_name)}/{build_number}/api/json", params=params
+            )
+            logger.info("获取构建详情成功", job_name=job_name, build_number=build_number)
+            return build_info
+        except httpx.HTTPStatusError as e:
+            if _is_not_found(e):
+                logger.warning("构建不存在", job_name=job_name, build_number=build_number)
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"任务 '{job_name}' 的构建 #{build_number} 不存在"
+                )
+            logger.error("获取构建详情失败", job_name=job_name, build_number=build_number, error=str(e))
+            raise
+        except Exception as e:
+            logger.error("获取构建详情失败", job_name=job_name, build_number=build_number, error=str(e))
+            raise
+
+    async def get_build_status(self, job_name: str, build_number: int) -> Dict[str, Any]:
+        """获取构建状态字段"""
+        return await self.get_build_info(job_name, build_number, tree=jenkins_tree.BUILD_STATUS_TREE)
+
+    def _log_key(self, job_name: str, build_number: int) -> str:
+        return self.log_store.make_key(self.url, job_name, build_number)
+
+    async def get_stored_console_size(self, job_name: str, build_number: int) -> Optional[int]:
+        """本地日志存储中已结束构建的日志长度，未存储时返回 None"""
+        await self.log_store.ensure_loaded()
+        return self.log_store.size(self._log_key(job_name, build_number))
+
+    async def _store_console_log(self, job_name: str, build_number: int, content: bytes) -> None:
+        """保存已完成构建的完整日志，写入失败只记录警告"""
+        try:
+            await asyncio.to_thread(self.log_store.put, self._log_key(job_name, build_number), content)
+            logger.info("构建日志已写入本地存储", job_name=job_name, build_number=build_number, size=len(content))
+        except OSError as e:
+            logger.warning("构建日志写入本地存储失败", job_name=job_name, build_number=build_number, error=str(e))
+
+    async def get_build_console_bytes(self, job_name: str, build_number: int) -> Tuple[bytes, bool]:
+        """获取完整控制台输出的原始字节，以及构建日志是否已完整（构建已结束）
+
+        已完成的构建优先从本地日志存储读取；从 Jenkins 读取时使用 progressiveText，
+        通过 X-More-Data 判断构建是否结束，结束后写入本地存储，无需额外查询构建状态。
+        """
+        content = await asyncio.to_thread(self.log_store.read, self._log_key(job_name, build_number))
+        if content is not None:
+            return content, True
+        try:
+            response = await self._request(
+                "GET", f"{job_path(job_name)}/{build_number}/logText/progressiveText", params={"start": 0}
+            )
+        except httpx.HTTPStatusError as e:
+            if _is_not_found(e):
+                logger.warning("构建不存在", job_name=job_name, build_number=build_number)
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"任务 '{job_name}' 的构建 #{build_number} 不存在"
+                )
+            raise
+        complete = response.headers.get("X-More-Data", "false").lower() != "true"
+        if complete:
+            await self._store_console_log(job_name, build_number, response.content)
+        return response.content, complete
+
+    async def get_build_console_output(self, job_name: str, build_number: int) -> str:
+        """获取构建控制台输出"""
+        try:
+            content, _ = await self.get_build_console_bytes(job_name, build_number)
+            logger.info("获取构建控制台输出成功", job_name=job_name, build_number=build_number)
+            return content.decode("utf-8", errors="replace")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("获取构建控制台输出失败", job_name=job_name, build_number=build_number, error=str(e))
+            raise
+
+    async def get_build_console_range(
+        self, job_name: str, build_number: int, start: int = 0, end: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """按字节区间 [start, end) 读取控制台输出，start 为负数时表示最后 -start 个字节
+
+        已存储的日志只解压覆盖该区间的数据块；返回实际起始位置、区间内容、日志总长度以及日志是否已完整。
+        """
+        key = self._log_key(job_name, build_number)
+        try:
+            await self.log_store.ensure_loaded()
+            total = self.log_store.size(key)
+            if total is not None:
+                if start < 0:
+                    start = max(total + start, 0)
+                content = await asyncio.to_thread(self.log_store.read, key, start, end)
+                if content is not None:
+                    return {"content": content, "start": start, "total": total, "complete": True}
+            full, complete = await self.get_build_console_bytes(job_name, build_number)
+            if start < 0:
+                start = max(len(full) + start, 0)
+            return {"content": full[start:end], "start": start, "total": len(full), "complete": complete}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("按区间读取构建控制台输出失败", job_name=job_name, build_number=build_number, error=str(e))
+            raise
+
+    async def get_build_console_chunk(self, job_name: str, build_number: int, start: int = 0) -> Dict[str, Any]:
+        """增量获取构建控制台输出 (logText/progressiveText)
+
+        返回从字节偏移 start 开始的新增日志、下次请求使用的 offset，以及构建是否还会继续输出（more_data）。
+        """
+        key = self._log_key(job_name, build_number)
+        try:
+            stored = await asyncio.to_thread(self.log_store.read, key, start)
+            if stored is not None:
+                offset = max(start, self.log_store.size(key) or 0)
+                return {"text": stored.decode("utf-8", errors="replace"), "offset": offset, "more_data": False}
+
+            response = await self._request(
+                "GET", f"{job_path(job_name)}/{build_number}/logText/progressiveText", params={"start": start}
+            )
+            text = response.text
+            offset = int(response.headers.get("X-Text-Size", start + len(response.content)))
+            more_data = response.headers.get("X-More-Data", "false").lower() == "true"
+            if start == 0 and not more_data:
+                # 从头读取且构建已结束，拿到的就是完整日志
+                await self._store_console_log(job_name, build_number, response.content)
+            logger.debug("增量获取构建控制台输出成功", job_name=job_name, build_number=build_number, start=start, offset=offset)
+            return {"text": text, "offset": offset, "more_data": more_data}
+        except httpx.HTTPStatusError as e:
+            if _is_not_found(e):
+                logger.warning("构建不存在", job_name=job_name, build_number=build_number)
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"任务 '{job_name}' 的构建 #{build_number} 不存在"
+                )
+            logger.error("增量获取构建控制台输出失败", job_name=job_name, build_number=build_number, error=str(e))
+            raise
+        except Exception as e:
+            logger.error("增量获取构建控制台输出失败", job_name=job_name, build_number=build_number, error=str(e))
+            raise
+
+    async def stop_build(self, job_name: str, build_number: int) -> None:
+        """停止构建"""
+        try:
+            await self._request("POST", f"{job_path(job_name)}/{build_number}/stop")
+            self._invalidate_jobs()
+            logger.info("停止构建成功", job_name=job_name, build_number=build_number)
+        except Exception as e:
+            logger.error("停止构建失败", job_name=job_name, build_number=build_number, error=str(e))
+            raise
+
+    async def get_queue_item(self, queue_id: int, tree: Optional[str] = None) -> Dict[str, Any]:
+        """获取队列项信息，指定 tree 时只返回投影字段"""
+        params = {"tree": tree} if tree else {"depth": 0}
+        try:
+            queue_info = await self._get_json(f"queue/item/{queue_id}/api/json", params=params)
+            logger.info("获取队列项信息成功", queue_id=queue_id)
+            return queue_info
+        except httpx.HTTPStatusError as e:
+            if _is_not_found(e):
+                logger.warning("队列项不存在", queue_id=queue_id)
+                raise HTTPException(status_code=404, detail=f"队列项 {queue_id} 不存在")
+            logger.error("获取队列项信息失败", queue_id=queue_id, error=str(e))
+            raise
+        except Exception as e:
+            logger.error("获取队列项信息失败", queue_id=queue_id, error=str(e))
+            raise
+
+    async def get_queue_info(self, tree: str = jenkins_tree.QUEUE_TREE) -> Dict[str, Any]:
+        """获取构建队列"""
+        try:
+            return await self._get_json("queue/api/json", params={"tree": tree})
+        except Exception as e:
+            logger.error("获取构建队列失败", error=str(e))
+            raise
+
+    # -------------------------------------------------------------------------
+    # Pipeline
+    # -------------------------------------------------------------------------
+
+    async def get_pipeline_describe(self, job_name: str, build_number: int) -> Dict[str, Any]:
+        """获取 Pipeline 运行信息 (wfapi/describe)"""
+        try:
+            return await self._get_json(f"{job_path(job_name)}/{build_number}/wfapi/describe")
+        except Exception as e:
+            logger.error("获取Pipeline运行信息失败", job_name=job_name, build_number=build_number, error=str(e))
+            raise
+
+    async def get_pipeline_log(self, job_name: str, build_number: int) -> Dict[str, Any]:
+        """获取 Pipeline 日志 (wfapi/log)"""
+        try:
+            return await self._get_json(f"{job_path(job_name)}/{build_number}/wfapi/log")
+        except Exception as e:
+            logger.error("获取Pipeline日志失败", job_name=job_name, build_number=build_number, error=str(e))
+            raise
+
+    # -------------------------------------------------------------------------
+    # 系统、插件、节点与用户
+    # -------------------------------------------------------------------------
+
+    async def get_system_info(self) -> str:
+        """获取系统信息页面 (/systemInfo)"""
+        try:
+            response = await self._request("GET", "systemInfo")
+            return response.text
+        except Exception as e:
+            logger.error("获取系统信息失败", error=str(e))
+            raise
+
+    async def get_plugins(self) -> Dict[str, Any]:
+        """获取插件信息"""
+        try:
+            return await self._get_cached_json("plugins", "pluginManager/api/json", params={"tree": jenkins_tree.PLUGINS_TREE})
+        except Exception as e:
+            logger.error("获取插件信息失败", error=str(e))
+            raise
+
+    async def get_nodes(self) -> Dict[str, Any]:
+        """获取所有节点信息"""
+        try:
+            return await self._get_cached_json("nodes", "computer/api/json", params={"tree": jenkins_tree.NODES_TREE})
+        except Exception as e:
+            logger.error("获取节点信息失败", error=str(e))
+            raise
+
+    @staticmethod
+    def _job_name_from_url(url: str) -> Optional[str]:
+        """从构建 URL（.../job/a/job/b/12/）解析任务全名"""
+        parts = [unquote(part) for part in urlsplit(url).path.split("/") if part]
+        return "/".join(parts[i + 1] for i in range(len(parts) - 1) if parts[i] == "job") or None
+
+    async def get_running_builds(self) -> List[Dict[str, Any]]:
+        """获取所有节点执行器上正在运行的构建"""
+        try:
+            data = await self._get_json("computer/api/json", params={"tree": jenkins_tree.EXECUTORS_TREE})
+        except Exception as e:
+            logger.error("获取运行中的构建失败", error=str(e))
+            raise
+        builds: List[Dict[str, Any]] = []
+        for computer in data.get("computer", []):
+            for executor in (computer.get("executors") or []) + (computer.get("oneOffExecutors") or []):
+                executable = (executor or {}).get("currentExecutable")
+                if not executable:
+                    continue
+                builds.append({
+                    "job_name": self._job_name_from_url(executable.get("url", "")),
+                    "build_number": executable.get("number"),
+                    "display_name": executable.get("fullDisplayName"),
+                    "url": executable.get("url"),
+                    "node": computer.get("displayName"),
+                    "timestamp": executable.get("timestamp"),
+                    "estimated_duration": executable.get("estimatedDuration"),
+                })
+        return builds
+
+    async def get_node_info(self, node_name: str) -> Dict[str, Any]:
+        """获取特定节点信息"""
+        try:
+            return await self._get_json(f"computer/{quote(node_name, safe='')}/api/json")
+        except Exception as e:
+            logger.error("获取节点详情失败", node_name=node_name, error=str(e))
+            raise
+
+    async def toggle_node_offline(self, node_name: str, offline_message: Optional[str] = None) -> None:
+        """切换节点在线/离线状态"""
+        try:
+            data = {"offlineMessage": offline_message} if offline_message else {}
+            await self._request("POST", f"computer/{quote(node_name, safe='')}/toggleOffline", data=data)
+            self.cache.invalidate("nodes")
+            logger.info("切换节点状态成功", node_name=node_name)
+        except Exception as e:
+            logger.error("切换节点状态失败", node_name=node_name, error=str(e))
+            raise
+
+    async def get_people(self) -> Dict[str, Any]:
+        """获取所有用户列表"""
+        try:
+            return await self._get_cached_json("people", "people/api/json", params={"tree": jenkins_tree.PEOPLE_TREE})
+        except Exception as e:
+            logger.error("获取用户列表失败", error=str(e))
+            raise
@@ -0,0 +1,250 @@
+import asyncio
+import fnmatch
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar, TYPE_CHECKING
+
+import structlog
+from fastapi import HTTPException
+from app.core.config import settings
+from app.services import jenkins_tree
+
+if TYPE_CHECKING:
+    from app.services.async_jenkins_service import AsyncJenkinsService
+
+logger = structlog.get_logger("batch_ops")
+
+T = TypeVar("T")
+
+# 批量任务操作：enable/disable/delete 作用于任务，stop 停止任务所有正在运行的构建
+BULK_JOB_ACTIONS = ("enable", "disable", "delete", "stop")
+
+
+def describe_error(error: BaseException) -> str:
+    """单项操作失败的原因（HTTPException 取 detail）"""
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    return str(error) or type(error).__name__
+
+
+class RateLimiter:
+    """令牌桶限速器：长期平均每秒 rate 次，最多突发 burst 次"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._acquired = 0
+        self._waited = 0.0
+
+    async def acquire(self) -> None:
+        # 持锁等待，排队的调用方按先后顺序获得令牌
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._acquired += 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+                self._waited += delay
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "acquired": self._acquired,
+            "waited_seconds": round(self._waited, 3),
+        }
+
+
+class BatchOperations:
+    """批量写操作
+
+    同一 Jenkins 控制器的所有批量操作共享一个令牌桶限速器，单次批量内再按 BATCH_CONCURRENCY 限制并发，
+    避免一次发布触发几十个任务时瞬间压垮 Jenkins。每一项单独返回结果或错误，部分失败不影响其他项。
+    """
+
+    def __init__(self, jenkins: "AsyncJenkinsService"):
+        self.jenkins = jenkins
+        self.limiter = RateLimiter(settings.BATCH_RATE_LIMIT, settings.BATCH_RATE_BURST)
+        self._batches = 0
+        self._items = 0
+        self._failures = 0
+
+    async def _run(self, items: Sequence[T], worker: Callable[[T], Awaitable[Any]]) -> List[Any]:
+        """并发执行 worker，按输入顺序返回结果，失败项为异常对象"""
+        semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+        async def run(item: T) -> Any:
+            async with semaphore:
+                await self.limiter.acquire()
+                return await worker(item)
+
+        self._batches += 1
+        self._items += len(items)
+        results = await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+        self._failures += sum(1 for result in results if isinstance(result, Exception))
+        return results
+
+    async def trigger_builds(
+        self,
+        builds: Sequence[Dict[str, Any]],
+        resolve_build_numbers: bool = False,
+        wait_timeout: float = 30,
+    ) -> Dict[str, Any]:
+        """批量触发构建
+
+        builds 的每一项为 {"job_name": ..., "parameters": {...}}。结果与输入顺序一致，成功项带 queue_id，
+        失败项带 error；resolve_build_numbers 为 True 时通过 QueueWatcher 等待各队列项开始构建
+        （所有项共用 wait_timeout），超时仍在排队的项 build_status 为 waiting。
+        """
+        started = time.monotonic()
+
+        async def trigger(build: Dict[str, Any]) -> int:
+            job_name = build.get("job_name")
+            if not job_name or not isinstance(job_name, str):
+                raise ValueError("缺少 job_name")
+            parameters = build.get("parameters")
+            if parameters is not None and not isinstance(parameters, dict):
+                raise ValueError("parameters 必须是对象")
+            return await self.jenkins.build_job(job_name, parameters or None)
+
+        outcomes = await self._run(builds, trigger)
+        results: List[Dict[str, Any]] = []
+        for build, outcome in zip(builds, outcomes):
+            result: Dict[str, Any] = {"job_name": build.get("job_name"), "parameters": build.get("parameters")}
+            if isinstance(outcome, Exception):
+                result["error"] = describe_error(outcome)
+            else:
+                result["queue_id"] = outcome
+            results.append(result)
+        dispatch_ms = round((time.monotonic() - started) * 1000, 1)
+
+        if resolve_build_numbers:
+            queued = [result for result in results if "queue_id" in result]
+            states = await asyncio.gather(
+                *(
+                    self.jenkins.queue_watcher.wait_for_build(result["queue_id"], result["job_name"], timeout=wait_timeout)
+                    for result in queued
+                )
+            )
+            for result, state in zip(queued, states):
+                result["build_status"] = state.get("status")
+                result["build_number"] = state.get("build_number")
+
+        failed = sum(1 for result in results if "error" in result)
+        logger.info("批量触发构建完成", total=len(results), failed=failed, dispatch_ms=dispatch_ms)
+        return {
+            "results": results,
+            "total": len(results),
+            "queued": len(results) - failed,
+            "failed": failed,
+            "dispatch_ms": dispatch_ms,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+
+    async def resolve_jobs(self, job_names: Optional[Sequence[str]] = None, pattern: Optional[str] = None) -> List[str]:
+        """合并显式任务名与通配符匹配结果（去重并保持顺序）
+
+        pattern 为 fnmatch 风格通配符（如 release/*、*-deploy），与递归遍历得到的任务全名匹配，区分大小写。
+        目标数超过 BATCH_MAX_ITEMS 时抛出 ValueError。
+        """
+        targets: Dict[str, None] = {}
+        for name in job_names or ():
+            if not name or not isinstance(name, str):
+                raise ValueError("job_names 只能包含非空字符串")
+            targets[name] = None
+        if pattern:
+            listing = await self.jenkins.job_crawler.list_jobs()
+            for name in listing["jobs"]:
+                if fnmatch.fnmatchcase(name, pattern):
+                    targets[name] = None
+        if len(targets) > settings.BATCH_MAX_ITEMS:
+            raise ValueError(f"匹配到 {len(targets)} 个任务，单次最多操作 {settings.BATCH_MAX_ITEMS} 个")
+        return list(targets)
+
+    async def _running_builds(self, job_names: Sequence[str]) -> List[Dict[str, Any]]:
+        """并发查找各任务正在运行的构建，返回 [{"job_name", "build_number"}]，查找失败的任务带 error"""
+        semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+        async def find(job_name: str) -> List[int]:
+            async with semaphore:
+                job_info = await self.jenkins.get_job_info(job_name, tree=jenkins_tree.RUNNING_BUILDS_TREE)
+            return [build["number"] for build in job_info.get("builds", []) if build.get("building")]
+
+        outcomes = await asyncio.gather(*(find(name) for name in job_names), return_exceptions=True)
+        targets: List[Dict[str, Any]] = []
+        for job_name, outcome in zip(job_names, outcomes):
+            if isinstance(outcome, Exception):
+                targets.append({"job_name": job_name, "error": describe_error(outcome)})
+            else:
+                targets.extend({"job_name": job_name, "build_number": number} for number in outcome)
+        return targets
+
+    async def bulk_job_action(
+        self,
+        action: str,
+        job_names: Optional[Sequence[str]] = None,
+        pattern: Optional[str] = None,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """批量启用/禁用/删除任务，或停止任务正在运行的构建
+
+        目标为 job_names 与 pattern 匹配结果的并集。stop 先并发查找各任务正在运行的构建，再逐个停止，
+        结果按构建逐项返回。dry_run 为 True 时只解析目标（stop 会查找运行中的构建），不执行任何写操作。
+        参数无效时抛出 ValueError。
+        """
+        if action not in BULK_JOB_ACTIONS:
+            raise ValueError(f"不支持的操作: {action}，可选: {', '.join(BULK_JOB_ACTIONS)}")
+        if not job_names and not pattern:
+            raise ValueError("需要提供 job_names 或 pattern")
+        started = time.monotonic()
+        jobs = await self.resolve_jobs(job_names, pattern)
+
+        if action == "stop":
+            targets = await self._running_builds(jobs)
+        else:
+            targets = [{"job_name": name} for name in jobs]
+        pending = [target for target in targets if "error" not in target]
+
+        if not dry_run and pending:
+            operations = {
+                "enable": lambda target: self.jenkins.enable_job(target["job_name"]),
+                "disable": lambda target: self.jenkins.disable_job(target["job_name"]),
+                "delete": lambda target: self.jenkins.delete_job(target["job_name"]),
+                "stop": lambda target: self.jenkins.stop_build(target["job_name"], target["build_number"]),
+            }
+            outcomes = await self._run(pending, operations[action])
+            for target, outcome in zip(pending, outcomes):
+                if isinstance(outcome, Exception):
+                    target["error"] = describe_error(outcome)
+
+        failed = sum(1 for target in targets if "error" in target)
+        elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+        logger.info(
+            "批量任务操作完成", action=action, dry_run=dry_run, jobs=len(jobs),
+            total=len(targets), failed=failed, elapsed_ms=elapsed_ms,
+        )
+        return {
+            "action": action,
+            "dry_run": dry_run,
+            "results": targets,
+            "jobs": len(jobs),
+            "total": len(targets),
+            "succeeded": 0 if dry_run else len(targets) - failed,
+            "failed": failed,
+            "elapsed_ms": elapsed_ms,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "failures": self._failures,
+            "rate_limiter": self.limiter.stats(),
+        }
@@ -0,0 +1,245 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np
+import structlog
+
+if TYPE_CHECKING:
+    from app.services.build_history import BuildHistorySync
+
+logger = structlog.get_logger("build_analytics")
+
+# 构建结果编码，building 的构建 result 为空
+RESULT_CODES = {"SUCCESS": 0, "FAILURE": 1, "UNSTABLE": 2, "ABORTED": 3, "NOT_BUILT": 4}
+_UNKNOWN = 5
+_HOUR_MS = 3600 * 1000
+_PERCENTILES = (0.5, 0.9, 0.99)
+
+
+class _Columns:
+    """按任务、开始时间排序的构建列式快照"""
+
+    __slots__ = ("version", "job_names", "job", "number", "result", "building", "timestamp", "duration")
+
+    def __init__(self, version: int, raw: Dict[str, List[Any]]):
+        self.version = version
+        # 任务名编码为整数，行已按任务名排序，np.unique 的编号与之保持一致
+        job_names = np.array(raw["job_name"], dtype=object)
+        self.job_names, job = np.unique(job_names, return_inverse=True)
+        self.job = job.astype(np.int32).reshape(-1)
+        self.number = np.array(raw["number"], dtype=np.int64)
+        self.result = np.fromiter(
+            (RESULT_CODES.get(r, _UNKNOWN) for r in raw["result"]), dtype=np.int8, count=len(raw["result"])
+        )
+        self.building = np.array(raw["building"], dtype=bool)
+        self.timestamp = np.array(raw["timestamp"], dtype=np.int64)
+        self.duration = np.array(raw["duration"], dtype=np.int64)
+
+
+def _group_percentiles(groups: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """按分组计算线性插值分位数，返回形状为 (n_groups, len(_PERCENTILES)) 的数组，空分组为 NaN"""
+    result = np.full((n_groups, len(_PERCENTILES)), np.nan)
+    if len(values) == 0:
+        return result
+    # 组号与取值合成单个整数键，一次排序即可得到组内有序的取值，比 lexsort 快得多
+    values = np.maximum(values, 0)
+    scale = int(values.max()) + 1
+    sorted_values = (np.sort(groups * scale + values) % scale).astype(np.float64)
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    base = starts[present]
+    for i, q in enumerate(_PERCENTILES):
+        pos = (counts[present] - 1) * q
+        lower = np.floor(pos).astype(np.int64)
+        upper = np.ceil(pos).astype(np.int64)
+        low_values = sorted_values[base + lower]
+        high_values = sorted_values[base + upper]
+        result[present, i] = low_values + (high_values - low_values) * (pos - lower)
+    return result
+
+
+def _recoveries(job: np.ndarray, result: np.ndarray, timestamp: np.ndarray, duration: np.ndarray):
+    """计算恢复时间：从连续失败的第一次构建开始，到随后第一次成功构建结束
+
+    只考虑 SUCCESS / FAILURE 两种结果，输入需按任务和开始时间排序。返回 (任务编号数组, 恢复耗时毫秒数组)。
+    """
+    mask = (result == RESULT_CODES["SUCCESS"]) | (result == RESULT_CODES["FAILURE"])
+    job, result, timestamp, duration = job[mask], result[mask], timestamp[mask], duration[mask]
+    if len(job) < 2:
+        return np.array([], dtype=np.int32), np.array([], dtype=np.int64)
+
+    failed = result == RESULT_CODES["FAILURE"]
+    same_job = np.concatenate(([False], job[1:] == job[:-1]))
+    prev_failed = np.concatenate(([False], failed[:-1])) & same_job
+    failure_start = failed & ~prev_failed
+    recovered = ~failed & prev_failed
+
+    index = np.arange(len(job))
+    # 每个位置之前最近一次"开始失败"的下标
+    last_start = np.maximum.accumulate(np.where(failure_start, index, 0))
+    recovery_index = index[recovered]
+    start_index = last_start[recovery_index]
+    recovery_ms = timestamp[recovery_index] + duration[recovery_index] - timestamp[start_index]
+    return job[recovery_index], recovery_ms
+
+
+def _summary(metrics: Dict[str, List[Any]], window_hours: float, i: int) -> Dict[str, Any]:
+    def ms(value: float) -> Optional[int]:
+        return None if value != value else int(round(value))
+
+    done = metrics["completed"][i]
+    return {
+        "builds": metrics["count"][i],
+        "completed": done,
+        "failure_rate": round(metrics["failures"][i] / done, 4) if done else None,
+        "unstable_rate": round(metrics["unstable"][i] / done, 4) if done else None,
+        "duration_p50_ms": ms(metrics["percentiles"][i][0]),
+        "duration_p90_ms": ms(metrics["percentiles"][i][1]),
+        "duration_p99_ms": ms(metrics["percentiles"][i][2]),
+        "mttr_ms": ms(metrics["mttr_ms"][i]),
+        "recoveries": metrics["recoveries"][i],
+        "builds_per_hour": round(metrics["count"][i] / window_hours, 4),
+    }
+
+
+class BuildAnalytics:
+    """构建统计分析
+
+    从构建历史库加载列式快照（NumPy 数组）常驻内存，历史库有新写入时才重新加载；
+    统计查询只对窗口内的数组做向量化运算，不逐条遍历构建字典。
+    """
+
+    def __init__(self, history: "BuildHistorySync"):
+        self.history = history
+        self._columns: Optional[_Columns] = None
+        self._lock = asyncio.Lock()
+        self._reload_task: Optional[asyncio.Task] = None
+        self._reloads = 0
+        self._queries = 0
+
+    async def _get_columns(self) -> _Columns:
+        """获取列式快照；历史库有新写入时在后台重建，期间继续使用旧快照"""
+        columns = self._columns
+        if columns is None:
+            async with self._lock:
+                if self._columns is None:
+                    await self._reload()
+            return self._columns
+        if columns.version != self.history.store.version and (self._reload_task is None or self._reload_task.done()):
+            self._reload_task = asyncio.create_task(self._reload_in_background())
+        return columns
+
+    async def _reload(self) -> None:
+        store = self.history.store
+        version = store.version
+        raw = await asyncio.to_thread(store.load_columns, self.history.controller)
+        self._columns = await asyncio.to_thread(_Columns, version, raw)
+        self._reloads += 1
+        logger.info("构建统计快照已重新加载", builds=len(raw["number"]), version=version)
+
+    async def _reload_in_background(self) -> None:
+        try:
+            async with self._lock:
+                await self._reload()
+        except Exception as e:
+            logger.warning("构建统计快照重新加载失败", error=str(e))
+
+    async def aclose(self) -> None:
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+            await asyncio.gather(self._reload_task, return_exceptions=True)
+
+    async def compute(
+        self,
+        window_hours: float = 24.0,
+        job_name: Optional[str] = None,
+        per_job: bool = True,
+        now_ms: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """统计窗口 [now - window_hours, now) 内开始的构建"""
+        self._queries += 1
+        columns = await self._get_columns()
+        started = time.perf_counter()
+
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        mask = columns.timestamp >= now_ms - int(window_hours * _HOUR_MS)
+        mask &= columns.timestamp < now_ms
+        if job_name is not None:
+            matches = np.flatnonzero(columns.job_names == job_name)
+            if len(matches) == 0:
+                mask &= False
+            else:
+                mask &= columns.job == matches[0]
+
+        job = columns.job[mask]
+        result = columns.result[mask]
+        timestamp = columns.timestamp[mask]
+        duration = columns.duration[mask]
+        completed_mask = ~columns.building[mask]
+
+        # 第 0 组为全局汇总，任务 i 对应第 i + 1 组
+        n_jobs = len(columns.job_names)
+        n_groups = n_jobs + 1
+        groups = job.astype(np.int64) + 1
+
+        def grouped_count(selector: np.ndarray) -> np.ndarray:
+            per_group = np.bincount(groups[selector], minlength=n_groups)
+            per_group[0] = selector.sum()
+            return per_group
+
+        count = grouped_count(np.ones(len(job), dtype=bool))
+        completed = grouped_count(completed_mask)
+        failures = grouped_count(completed_mask & (result == RESULT_CODES["FAILURE"]))
+        unstable = grouped_count(completed_mask & (result == RESULT_CODES["UNSTABLE"]))
+
+        done_groups = groups[completed_mask]
+        done_durations = duration[completed_mask]
+        percentiles = _group_percentiles(done_groups, done_durations, n_groups)
+        if len(done_durations):
+            percentiles[0] = np.percentile(done_durations, [q * 100 for q in _PERCENTILES])
+
+        recovery_jobs, recovery_ms = _recoveries(
+            job[completed_mask], result[completed_mask], timestamp[completed_mask], duration[completed_mask]
+        )
+        recovery_groups = recovery_jobs.astype(np.int64) + 1
+        recoveries = np.bincount(recovery_groups, minlength=n_groups)
+        recoveries[0] = len(recovery_ms)
+        recovery_total = np.bincount(recovery_groups, weights=recovery_ms, minlength=n_groups).astype(np.float64)
+        recovery_total[0] = recovery_ms.sum()
+        mttr_ms = np.where(recoveries > 0, recovery_total / np.maximum(recoveries, 1), np.nan)
+
+        # 一次性转换为 Python 列表，避免逐个访问 NumPy 标量
+        metrics = {
+            "count": count.tolist(),
+            "completed": completed.tolist(),
+            "failures": failures.tolist(),
+            "unstable": unstable.tolist(),
+            "percentiles": percentiles.tolist(),
+            "mttr_ms": mttr_ms.tolist(),
+            "recoveries": recoveries.tolist(),
+        }
+        data: Dict[str, Any] = {
+            "window_hours": window_hours,
+            "window_start": now_ms - int(window_hours * _HOUR_MS),
+            "window_end": now_ms,
+            "fleet": _summary(metrics, window_hours, 0),
+        }
+        if per_job:
+            data["jobs"] = [
+                {"job_name": str(columns.job_names[i - 1]), **_summary(metrics, window_hours, i)}
+                for i in (np.flatnonzero(count[1:]) + 1).tolist()
+            ]
+        data["compute_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        columns = self._columns
+        return {
+            "snapshot_version": columns.version if columns is not None else None,
+            "builds_loaded": len(columns.number) if columns is not None else 0,
+            "jobs_loaded": len(columns.job_names) if columns is not None else 0,
+            "reloads": self._reloads,
+            "queries": self._queries,
+        }
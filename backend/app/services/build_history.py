@@ -0,0 +1,469 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, TYPE_CHECKING
+
+import structlog
+from app.core.config import settings
+from app.services import jenkins_tree
+from app.services.jenkins_transport import job_path
+
+if TYPE_CHECKING:
+    from app.services.async_jenkins_service import AsyncJenkinsService
+
+logger = structlog.get_logger("build_history")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    controller   TEXT    NOT NULL,
+    job_name     TEXT    NOT NULL,
+    number       INTEGER NOT NULL,
+    result       TEXT,
+    building     INTEGER NOT NULL DEFAULT 0,
+    timestamp    INTEGER NOT NULL DEFAULT 0,
+    duration     INTEGER NOT NULL DEFAULT 0,
+    url          TEXT,
+    display_name TEXT,
+    PRIMARY KEY (controller, job_name, number)
+);
+CREATE INDEX IF NOT EXISTS idx_builds_timestamp ON builds (controller, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_builds_job ON builds (controller, job_name, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_builds_result ON builds (controller, result, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_builds_building ON builds (controller, building) WHERE building = 1;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    controller        TEXT    NOT NULL,
+    job_name          TEXT    NOT NULL,
+    watermark         INTEGER NOT NULL,
+    synced_at         REAL    NOT NULL,
+    backfill_top      INTEGER,
+    backfill_frontier INTEGER,
+    PRIMARY KEY (controller, job_name)
+);
+"""
+
+# 早期版本的 sync_state 没有回填列
+_SYNC_STATE_MIGRATIONS = {
+    "backfill_top": "ALTER TABLE sync_state ADD COLUMN backfill_top INTEGER",
+    "backfill_frontier": "ALTER TABLE sync_state ADD COLUMN backfill_frontier INTEGER",
+}
+
+# 回填时向较新方向多取的构建数：估算的起始位置在 Jenkins 中有构建被删除时仍能与已拉取部分衔接
+_BACKFILL_OVERLAP = 5
+
+
+class SyncState(NamedTuple):
+    watermark: int
+    backfill_top: Optional[int]
+    backfill_frontier: Optional[int]
+
+
+_COLUMNS = ("job_name", "number", "result", "building", "timestamp", "duration", "url", "display_name")
+
+
+class BuildHistoryStore:
+    """构建历史本地存储（SQLite）
+
+    所有方法都是阻塞调用，请通过 asyncio.to_thread 使用；内部用一把锁串行化对同一连接的访问。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        # 每次写入后递增，读取方据此判断内存中的派生数据是否需要重建
+        self.version = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(sync_state)")}
+            for column, statement in _SYNC_STATE_MIGRATIONS.items():
+                if column not in existing:
+                    self._conn.execute(statement)
+
+    def get_sync_state(self, controller: str) -> Dict[str, SyncState]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_name, watermark, backfill_top, backfill_frontier FROM sync_state WHERE controller = ?",
+                (controller,),
+            ).fetchall()
+        return {
+            row["job_name"]: SyncState(row["watermark"], row["backfill_top"], row["backfill_frontier"])
+            for row in rows
+        }
+
+    def count_job_builds(self, controller: str, job_name: str, above: int, up_to: int) -> int:
+        """任务中构建号在 (above, up_to] 范围内的已存储构建数"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM builds WHERE controller = ? AND job_name = ? AND number > ? AND number <= ?",
+                (controller, job_name, above, up_to),
+            ).fetchone()[0]
+
+    def get_building(self, controller: str) -> Dict[str, int]:
+        """各任务中仍在构建的最小构建号，下次同步需要从这里开始刷新"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_name, MIN(number) AS number FROM builds "
+                "WHERE controller = ? AND building = 1 GROUP BY job_name",
+                (controller,),
+            ).fetchall()
+        return {row["job_name"]: row["number"] for row in rows}
+
+    def upsert_builds(
+        self,
+        controller: str,
+        job_name: str,
+        builds: List[Dict[str, Any]],
+        watermark: int,
+        backfill: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """写入一个任务的构建并更新同步状态（同一事务）
+
+        watermark 之前（含）的构建都已拉取；backfill 为 (top, frontier) 时表示 [frontier, top] 已拉取，
+        (watermark, frontier) 之间仍有缺口，后续周期继续向前回填。
+        """
+        rows = [
+            (
+                controller,
+                job_name,
+                build["number"],
+                build.get("result"),
+                1 if build.get("building") else 0,
+                build.get("timestamp") or 0,
+                build.get("duration") or 0,
+                build.get("url"),
+                build.get("displayName"),
+            )
+            for build in builds
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO builds (controller, job_name, number, result, building, timestamp, duration, url, display_name) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (controller, job_name, number) DO UPDATE SET "
+                "result = excluded.result, building = excluded.building, timestamp = excluded.timestamp, "
+                "duration = excluded.duration, url = excluded.url, display_name = excluded.display_name",
+                rows,
+            )
+            top, frontier = backfill or (None, None)
+            self._conn.execute(
+                "INSERT INTO sync_state (controller, job_name, watermark, synced_at, backfill_top, backfill_frontier) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (controller, job_name) DO UPDATE SET watermark = excluded.watermark, synced_at = excluded.synced_at, "
+                "backfill_top = excluded.backfill_top, backfill_frontier = excluded.backfill_frontier",
+                (controller, job_name, watermark, time.time(), top, frontier),
+            )
+            self.version += 1
+
+    def query(
+        self,
+        controller: str,
+        job_name: Optional[str] = None,
+        result: Optional[str] = None,
+        building: Optional[bool] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """按条件分页查询，结果按开始时间倒序"""
+        conditions = ["controller = ?"]
+        params: List[Any] = [controller]
+        if job_name:
+            conditions.append("job_name = ?")
+            params.append(job_name)
+        if result:
+            conditions.append("result = ?")
+            params.append(result.upper())
+        if building is not None:
+            conditions.append("building = ?")
+            params.append(1 if building else 0)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("timestamp < ?")
+            params.append(until)
+        where = " AND ".join(conditions)
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM builds WHERE {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM builds WHERE {where} "
+                "ORDER BY timestamp DESC, job_name, number DESC LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        items = [dict(row) for row in rows]
+        for item in items:
+            item["building"] = bool(item["building"])
+        return {"items": items, "total": total}
+
+    def load_columns(self, controller: str) -> Dict[str, List[Any]]:
+        """按列读取全部构建，按任务和开始时间排序"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_name, number, result, building, timestamp, duration FROM builds "
+                "WHERE controller = ? ORDER BY job_name, timestamp, number",
+                (controller,),
+            ).fetchall()
+        columns = ("job_name", "number", "result", "building", "timestamp", "duration")
+        return {name: [row[i] for row in rows] for i, name in enumerate(columns)}
+
+    def count(self, controller: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM builds WHERE controller = ?", (controller,)).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class BuildHistorySync:
+    """构建历史增量同步
+
+    任务全名来自递归任务发现（包括文件夹和多分支项目中的任务），每个周期按所在文件夹批量获取各任务的
+    lastBuild.number，与本地记录的水位线比较，只为有新构建或仍有构建在运行的任务拉取构建摘要。
+
+    单次最多拉取 HISTORY_SYNC_MAX_BUILDS_PER_JOB 条：新构建超过这个数量时（如长时间停机后）先保存最新的
+    一段并记录回填进度，之后每个周期从已拉取部分的最早构建继续向前翻页，直到与原水位线衔接才推进水位线，
+    期间 stats() 中的 jobs_backfilling 不为 0。
+    """
+
+    def __init__(self, jenkins: "AsyncJenkinsService", store: BuildHistoryStore):
+        self.jenkins = jenkins
+        self.store = store
+        self.controller = jenkins.url
+        self._task: Optional[asyncio.Task] = None
+        self._first_sync = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.last_synced_at: Optional[float] = None
+        self._syncs = 0
+        self._jobs_fetched = 0
+        self._builds_written = 0
+        self._jobs_backfilling = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+
+    def ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def wait_ready(self, timeout: float) -> None:
+        """等待首次同步完成（本地已有数据时无需等待）"""
+        if self._first_sync.is_set():
+            return
+        if await asyncio.to_thread(self.store.count, self.controller):
+            return
+        try:
+            await asyncio.wait_for(self._first_sync.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._last_error = str(e)
+                logger.warning("构建历史同步失败，下个周期重试", error=str(e))
+            await asyncio.sleep(settings.HISTORY_SYNC_INTERVAL)
+
+    async def _last_builds(self, semaphore: asyncio.Semaphore) -> Dict[str, int]:
+        """所有任务全名 -> 最近构建号（没有构建的任务不包含在内）
+
+        按所在文件夹分组，每个文件夹请求一次子任务的 lastBuild；根目录失败时抛出异常，子文件夹失败时跳过。
+        """
+        listing = await self.jenkins.job_crawler.list_jobs()
+        by_folder: Dict[str, Set[str]] = {}
+        for full_name in listing["jobs"]:
+            folder, _, name = full_name.rpartition("/")
+            by_folder.setdefault(folder, set()).add(name)
+
+        async def fetch(folder: str) -> Dict[str, int]:
+            prefix = f"{job_path(folder)}/" if folder else ""
+            async with semaphore:
+                data = await self.jenkins._get_json(
+                    f"{prefix}api/json", params={"tree": jenkins_tree.FOLDER_LAST_BUILDS_TREE}
+                )
+            found = {}
+            for item in data.get("jobs", []):
+                name = item.get("name")
+                number = (item.get("lastBuild") or {}).get("number")
+                if name in by_folder[folder] and number is not None:
+                    found[f"{folder}/{name}" if folder else name] = number
+            return found
+
+        folders = list(by_folder)
+        results = await asyncio.gather(*(fetch(folder) for folder in folders), return_exceptions=True)
+        last_builds: Dict[str, int] = {}
+        for folder, result in zip(folders, results):
+            if isinstance(result, Exception):
+                if not folder:
+                    raise result
+                self._errors += 1
+                logger.warning("获取文件夹内任务构建号失败", folder=folder, error=str(result))
+                continue
+            last_builds.update(result)
+        return last_builds
+
+    async def _sync_job(
+        self, job_name: str, last_build: int, state: Optional[SyncState], running: Optional[int], semaphore: asyncio.Semaphore
+    ) -> Optional[int]:
+        """同步一个任务，返回写入的构建数；没有需要拉取的构建时返回 None"""
+        max_builds = settings.HISTORY_SYNC_MAX_BUILDS_PER_JOB
+        watermark = state.watermark if state else 0
+        top, frontier = (state.backfill_top, state.backfill_frontier) if state else (None, None)
+        if last_build < watermark or (top is not None and last_build < top):
+            # 任务被删除后重建，构建号重新开始
+            watermark, top, frontier = 0, None, None
+
+        async def fetch(limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.jenkins.get_job_builds(job_name, limit=limit, offset=offset)
+
+        def numbers(builds: List[Dict[str, Any]]) -> List[int]:
+            return [build["number"] for build in builds]
+
+        if top is None:
+            # 从水位线之后开始；仍在构建的记录需要重新拉取以更新结果
+            floor = min(watermark, (running or last_build + 1) - 1)
+            if last_build <= floor:
+                return None
+            wanted = last_build - floor
+            builds = await fetch(min(wanted, max_builds))
+            fetched = numbers(builds)
+            if wanted <= max_builds or len(builds) < max_builds or min(fetched) <= floor + 1:
+                await asyncio.to_thread(self.store.upsert_builds, self.controller, job_name, builds, last_build)
+            else:
+                await asyncio.to_thread(
+                    self.store.upsert_builds, self.controller, job_name, builds, watermark, (last_build, min(fetched))
+                )
+            return len(builds)
+
+        # 回填中：先拉取已拉取部分之后的新构建（以及其中仍在运行的构建）
+        newer: List[Dict[str, Any]] = []
+        if running is not None and running >= frontier:
+            ceiling = min(top, running - 1)
+        else:
+            ceiling = top
+        if last_build > ceiling:
+            wanted = last_build - ceiling
+            newer = await fetch(min(wanted, max_builds))
+            fetched = numbers(newer)
+            if wanted > max_builds and len(newer) == max_builds and min(fetched) > ceiling + 1:
+                # 新构建又超过了单次上限：从新的最新段重新开始回填，缺口延伸到原水位线
+                await asyncio.to_thread(
+                    self.store.upsert_builds, self.controller, job_name, newer, watermark, (last_build, min(fetched))
+                )
+                return len(newer)
+
+        # 再从 frontier 继续向前翻页：frontier 在 Jenkins 构建列表中的位置 = 比它新的构建数
+        stored_newer = await asyncio.to_thread(self.store.count_job_builds, self.controller, job_name, frontier, top)
+        position = stored_newer + sum(1 for number in numbers(newer) if number > top)
+        offset = max(position - _BACKFILL_OVERLAP, 0)
+        overlap = position - offset + 1
+        older = await fetch(overlap + min(frontier - 1 - watermark, max_builds), offset)
+        fetched = numbers(older)
+        if not fetched or max(fetched) < frontier:
+            # 估算的位置偏到了 frontier 之前（Jenkins 中删除的构建多于重叠量）：清除回填进度，
+            # 水位线不变，下个周期从最新一段重新开始回填
+            logger.warning("构建历史回填位置无法衔接，重新开始回填", job_name=job_name, frontier=frontier)
+            await asyncio.to_thread(self.store.upsert_builds, self.controller, job_name, newer, watermark)
+            return len(newer)
+        builds = newer + older
+        new_top = max(last_build, top)
+        new_frontier = min(fetched)
+        if len(older) < overlap + min(frontier - 1 - watermark, max_builds) or new_frontier <= watermark + 1:
+            await asyncio.to_thread(self.store.upsert_builds, self.controller, job_name, builds, new_top)
+        else:
+            await asyncio.to_thread(
+                self.store.upsert_builds, self.controller, job_name, builds, watermark, (new_top, new_frontier)
+            )
+        return len(builds)
+
+    async def sync_once(self) -> Dict[str, int]:
+        """执行一次增量同步，返回本次拉取的任务数、写入的构建数和仍在回填的任务数"""
+        async with self._lock:
+            started = time.monotonic()
+            semaphore = asyncio.Semaphore(settings.HISTORY_SYNC_CONCURRENCY)
+            last_builds = await self._last_builds(semaphore)
+            states = await asyncio.to_thread(self.store.get_sync_state, self.controller)
+            building = await asyncio.to_thread(self.store.get_building, self.controller)
+
+            job_names = list(last_builds)
+            results = await asyncio.gather(
+                *(
+                    self._sync_job(name, last_builds[name], states.get(name), building.get(name), semaphore)
+                    for name in job_names
+                ),
+                return_exceptions=True,
+            )
+            fetched = 0
+            written = 0
+            for job_name, result in zip(job_names, results):
+                if isinstance(result, Exception):
+                    self._errors += 1
+                    logger.warning("同步任务构建历史失败", job_name=job_name, error=str(result))
+                elif result is not None:
+                    fetched += 1
+                    written += result
+
+            states = await asyncio.to_thread(self.store.get_sync_state, self.controller)
+            backfilling = sum(1 for name in job_names if name in states and states[name].backfill_top is not None)
+            self._syncs += 1
+            self._jobs_fetched += fetched
+            self._builds_written += written
+            self._jobs_backfilling = backfilling
+            self.last_synced_at = time.time()
+            self._first_sync.set()
+            if fetched:
+                logger.info(
+                    "构建历史同步完成",
+                    jobs=len(job_names),
+                    jobs_fetched=fetched,
+                    builds_written=written,
+                    jobs_backfilling=backfilling,
+                    elapsed_ms=round((time.monotonic() - started) * 1000, 1),
+                )
+            return {"jobs_fetched": fetched, "builds_written": written, "jobs_backfilling": backfilling}
+
+    async def query(self, **filters: Any) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.store.query, self.controller, **filters)
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "syncs": self._syncs,
+            "jobs_fetched": self._jobs_fetched,
+            "builds_written": self._builds_written,
+            "jobs_backfilling": self._jobs_backfilling,
+            "errors": self._errors,
+            "last_error": self._last_error,
+            "last_synced_at": self.last_synced_at,
+        }
+
+
+# 所有 Jenkins 服务实例共享同一个历史库，按 controller 区分
+_store: Optional[BuildHistoryStore] = None
+
+
+def get_build_history_store() -> BuildHistoryStore:
+    global _store
+    if _store is None:
+        _store = BuildHistoryStore(settings.HISTORY_DB_PATH)
+    return _store
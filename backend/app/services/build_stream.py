@@ -0,0 +1,163 @@
+import asyncio
+from typing import Any, Dict, Optional, Set, Tuple, TYPE_CHECKING
+
+import structlog
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.services.async_jenkins_service import AsyncJenkinsService
+
+logger = structlog.get_logger("build_stream")
+
+BuildKey = Tuple[str, int]
+
+
+class BuildSubscription:
+    """单个订阅者：有界事件队列，满了说明客户端消费太慢，订阅会被关闭"""
+
+    def __init__(self, max_events: int):
+        self.queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=max_events)
+        self.overflowed = False
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self._force_close()
+            return False
+
+    def close(self) -> None:
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            self._force_close()
+
+    def _force_close(self) -> None:
+        # 丢弃积压事件，只保留结束标记，避免慢客户端占用内存
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait({"event": "overflow", "data": {"message": "客户端消费过慢，订阅已关闭，请使用最新 offset 重新连接"}})
+        self.queue.put_nowait(None)
+
+
+class _BuildWatch:
+    """一个构建的共享轮询器，无论有多少订阅者，每个构建只轮询 Jenkins 一次"""
+
+    def __init__(self, hub: "BuildStreamHub", key: BuildKey):
+        self.hub = hub
+        self.key = key
+        self.subscribers: Set[BuildSubscription] = set()
+        self.status: Optional[Dict[str, Any]] = None
+        self.offset = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def broadcast(self, event: Dict[str, Any]) -> None:
+        for sub in list(self.subscribers):
+            if not sub.offer(event):
+                self.subscribers.discard(sub)
+                logger.warning("构建事件订阅者消费过慢，已断开", job_name=self.key[0], build_number=self.key[1])
+
+    async def run(self) -> None:
+        job_name, build_number = self.key
+        jenkins = self.hub.jenkins
+        try:
+            while self.subscribers:
+                status = await jenkins.get_build_status(job_name, build_number)
+                snapshot = {
+                    "building": status.get("building", False),
+                    "result": status.get("result"),
+                    "duration": status.get("duration", 0),
+                    "estimated_duration": status.get("estimatedDuration", 0),
+                    "timestamp": status.get("timestamp", 0),
+                }
+                if snapshot != self.status:
+                    self.status = snapshot
+                    self.broadcast({"event": "status", "data": snapshot})
+
+                # 构建结束后仍要把剩余日志读完（more_data 为 false）
+                while True:
+                    chunk = await jenkins.get_build_console_chunk(job_name, build_number, start=self.offset)
+                    if chunk["text"]:
+                        self.broadcast({
+                            "event": "console",
+                            "data": {"start": self.offset, "offset": chunk["offset"], "text": chunk["text"]},
+                            "id": str(chunk["offset"]),
+                        })
+                    self.offset = chunk["offset"]
+                    if snapshot["building"] or not chunk["more_data"]:
+                        break
+
+                if not snapshot["building"]:
+                    self.broadcast({"event": "end", "data": snapshot})
+                    break
+                await asyncio.sleep(settings.BUILD_STREAM_POLL_INTERVAL)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("构建事件轮询失败", job_name=job_name, build_number=build_number, error=str(e))
+            self.broadcast({"event": "error", "data": {"message": str(e)}})
+        finally:
+            for sub in self.subscribers:
+                sub.close()
+            self.subscribers.clear()
+            # 取消后 unsubscribe 已移除本轮询器，同一构建可能已有新的轮询器，不能误删
+            if self.hub._watches.get(self.key) is self:
+                del self.hub._watches[self.key]
+
+
+class BuildStreamHub:
+    """构建实时事件中心
+
+    按 (job_name, build_number) 维护共享轮询器，把状态变化和新增控制台输出推送给所有订阅者。
+    最后一个订阅者离开或构建结束后轮询器自动退出。
+    """
+
+    def __init__(self, jenkins: "AsyncJenkinsService"):
+        self.jenkins = jenkins
+        self._watches: Dict[BuildKey, _BuildWatch] = {}
+
+    def subscribe(self, job_name: str, build_number: int, start: int = 0) -> BuildSubscription:
+        key = (job_name, build_number)
+        sub = BuildSubscription(settings.BUILD_STREAM_MAX_EVENTS)
+        watch = self._watches.get(key)
+        if watch is None:
+            watch = _BuildWatch(self, key)
+            watch.offset = start
+            self._watches[key] = watch
+            watch.subscribers.add(sub)
+            watch.task = asyncio.create_task(watch.run())
+        else:
+            watch.subscribers.add(sub)
+            if watch.status is not None:
+                sub.offer({"event": "status", "data": watch.status})
+            # 新订阅者只会收到之后的增量日志，告知当前 offset 以便客户端补齐之前的部分
+            sub.offer({"event": "offset", "data": {"offset": watch.offset}})
+        return sub
+
+    def unsubscribe(self, job_name: str, build_number: int, sub: BuildSubscription) -> None:
+        key = (job_name, build_number)
+        watch = self._watches.get(key)
+        if watch is None:
+            return
+        watch.subscribers.discard(sub)
+        if not watch.subscribers:
+            # 先移出再取消：取消生效前到达的订阅（如 EventSource 重连）会创建新的轮询器，而不是加入即将退出的这个
+            del self._watches[key]
+            if watch.task is not None:
+                watch.task.cancel()
+
+    async def aclose(self) -> None:
+        tasks = [w.task for w in self._watches.values() if w.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watched_builds": len(self._watches),
+            "subscribers": sum(len(w.subscribers) for w in self._watches.values()),
+        }
@@ -0,0 +1,125 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger("circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+
+
+class CircuitOpenError(ConnectionError):
+    """熔断打开期间直接拒绝的请求（仍是 ConnectionError，接口层按 503 处理）"""
+
+
+class CircuitBreaker:
+    """上游熔断器
+
+    连续 failure_threshold 次连接失败（或 5xx 网关错误）后打开：打开期间的请求立即抛出 CircuitOpenError，
+    不再等待连接超时。打开后在后台按指数退避（带 ±20% 抖动）调用 probe 探测，探测成功即关闭；
+    打开期间若有此前发出的请求成功返回，同样立即关闭。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[Any]],
+        failure_threshold: int,
+        backoff_initial: float,
+        backoff_max: float,
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._next_probe_at: Optional[float] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._last_error: Optional[str] = None
+
+        self._opens = 0
+        self._rejected = 0
+        self._probes = 0
+
+    def check(self) -> None:
+        """请求前调用，熔断打开时直接抛出 CircuitOpenError"""
+        if self.state == OPEN:
+            self._rejected += 1
+            retry_in = max((self._next_probe_at or 0) - time.monotonic(), 0)
+            raise CircuitOpenError(
+                f"Jenkins 服务器 {self.name} 不可用（熔断中，{retry_in:.0f} 秒后重新探测）: {self._last_error}"
+            )
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        if self.state == OPEN:
+            self._close("请求成功")
+
+    def record_failure(self, error: BaseException) -> None:
+        self._last_error = str(error) or type(error).__name__
+        if self.state == OPEN:
+            return
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opens += 1
+        self._opened_at = time.monotonic()
+        logger.warning("Jenkins 熔断打开", controller=self.name, failures=self._consecutive_failures, error=self._last_error)
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    def _close(self, reason: str) -> None:
+        down_seconds = round(time.monotonic() - self._opened_at, 1) if self._opened_at else None
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._next_probe_at = None
+        logger.info("Jenkins 熔断关闭", controller=self.name, reason=reason, down_seconds=down_seconds)
+
+    async def _probe_loop(self) -> None:
+        backoff = self.backoff_initial
+        while self.state == OPEN:
+            delay = backoff * random.uniform(0.8, 1.2)
+            self._next_probe_at = time.monotonic() + delay
+            await asyncio.sleep(delay)
+            if self.state != OPEN:
+                return
+            self._probes += 1
+            try:
+                await self.probe()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._last_error = str(e) or type(e).__name__
+                backoff = min(backoff * 2, self.backoff_max)
+                logger.info("Jenkins 探测失败", controller=self.name, next_backoff=round(backoff, 1), error=self._last_error)
+                continue
+            self._close("探测成功")
+
+    async def aclose(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "open_seconds": round(now - self._opened_at, 1) if self._opened_at else None,
+            "next_probe_in": round(max(self._next_probe_at - now, 0), 1) if self._next_probe_at else None,
+            "opens": self._opens,
+            "rejected": self._rejected,
+            "probes": self._probes,
+            "last_error": self._last_error,
+        }
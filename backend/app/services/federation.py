@@ -0,0 +1,172 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import structlog
+from app.core.config import settings
+from app.services.async_jenkins_service import AsyncJenkinsService
+from app.services.batch_ops import describe_error
+
+logger = structlog.get_logger("federation")
+
+
+class JenkinsFederation:
+    """多 Jenkins 控制器联邦查询
+
+    JENKINS_URL 对应的服务作为主控制器（名称为 JENKINS_CONTROLLER_NAME），JENKINS_CONTROLLERS 中的
+    每一项各自持有独立的连接池和响应缓存。读操作并发发往所有控制器，结果合并后每一项带 controller 标签；
+    每个控制器只等待 FEDERATION_TIMEOUT 秒，超时或出错的控制器单独标记，不影响其他控制器的结果。
+    超时的请求不取消，继续在后台完成并写入该控制器的响应缓存，下一次查询可以直接命中。
+    """
+
+    def __init__(self, primary: Optional[AsyncJenkinsService] = None):
+        self.controllers: Dict[str, AsyncJenkinsService] = {}
+        # 初始化失败的控制器 -> 错误原因
+        self.unavailable: Dict[str, str] = {}
+        self._owned: List[AsyncJenkinsService] = []
+        self._stragglers: Set[asyncio.Task] = set()
+        self._queries = 0
+        self._timeouts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+
+        if primary is not None:
+            self.controllers[settings.JENKINS_CONTROLLER_NAME] = primary
+        else:
+            self.unavailable[settings.JENKINS_CONTROLLER_NAME] = "Jenkins 服务不可用，请检查配置和连接"
+
+        for config in settings.JENKINS_CONTROLLERS:
+            name = config.get("name") or config.get("url")
+            if not name:
+                logger.warning("忽略缺少 name 和 url 的控制器配置")
+                continue
+            if name in self.controllers or name in self.unavailable:
+                logger.warning("忽略重名的控制器配置", controller=name)
+                continue
+            try:
+                service = AsyncJenkinsService(
+                    url=config["url"],
+                    username=config.get("username"),
+                    password=config.get("api_token") or config.get("password"),
+                    name=name,
+                )
+            except Exception as e:
+                logger.error("控制器初始化失败", controller=name, error=str(e))
+                self.unavailable[name] = describe_error(e)
+                continue
+            self.controllers[name] = service
+            self._owned.append(service)
+
+        logger.info("联邦控制器已注册", controllers=list(self.controllers), unavailable=list(self.unavailable))
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """已注册的控制器"""
+        controllers = [{"name": name, "url": service.url, "available": True} for name, service in self.controllers.items()]
+        controllers.extend(
+            {"name": name, "url": None, "available": False, "error": error} for name, error in self.unavailable.items()
+        )
+        return controllers
+
+    def _finish_straggler(self, task: asyncio.Task) -> None:
+        self._stragglers.discard(task)
+        # 取出异常，避免 "Task exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def fan_out(
+        self,
+        fetch: Callable[[AsyncJenkinsService], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """并发调用所有控制器，返回 控制器名 -> {"status": ok/timeout/error/unavailable, "data"/"error", "elapsed_ms"}"""
+        timeout = settings.FEDERATION_TIMEOUT if timeout is None else timeout
+        self._queries += 1
+        started = time.monotonic()
+        finished: Dict[str, float] = {}
+
+        async def call(name: str, service: AsyncJenkinsService) -> Any:
+            try:
+                return await fetch(service)
+            finally:
+                finished[name] = time.monotonic()
+
+        tasks = {name: asyncio.create_task(call(name, service)) for name, service in self.controllers.items()}
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=timeout)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for name, task in tasks.items():
+            if not task.done():
+                self._stragglers.add(task)
+                task.add_done_callback(self._finish_straggler)
+                self._timeouts[name] = self._timeouts.get(name, 0) + 1
+                results[name] = {"status": "timeout", "error": f"超过 {timeout} 秒未响应", "elapsed_ms": round(timeout * 1000, 1)}
+                continue
+            elapsed_ms = round((finished[name] - started) * 1000, 1)
+            error = task.exception()
+            if error is not None:
+                self._errors[name] = self._errors.get(name, 0) + 1
+                results[name] = {"status": "error", "error": describe_error(error), "elapsed_ms": elapsed_ms}
+            else:
+                results[name] = {"status": "ok", "data": task.result(), "elapsed_ms": elapsed_ms}
+        for name, error in self.unavailable.items():
+            results[name] = {"status": "unavailable", "error": error}
+
+        degraded = [name for name, result in results.items() if result["status"] != "ok"]
+        if degraded:
+            logger.warning("部分控制器未返回结果", controllers=degraded)
+        return results
+
+    async def _merged(
+        self,
+        fetch: Callable[[AsyncJenkinsService], Awaitable[Any]],
+        items_of: Callable[[Any], List[Dict[str, Any]]],
+        timeout: Optional[float],
+    ) -> Dict[str, Any]:
+        """fan_out 后把各控制器的列表合并为一个列表，每项复制一份并加上 controller 字段（不修改缓存中的对象）"""
+        results = await self.fan_out(fetch, timeout)
+        items: List[Dict[str, Any]] = []
+        controllers: Dict[str, Dict[str, Any]] = {}
+        for name, result in results.items():
+            info = {key: value for key, value in result.items() if key != "data"}
+            if result["status"] == "ok":
+                rows = items_of(result["data"])
+                items.extend({**row, "controller": name} for row in rows)
+                info["count"] = len(rows)
+            controllers[name] = info
+        return {
+            "items": items,
+            "controllers": controllers,
+            "partial": any(info["status"] != "ok" for info in controllers.values()),
+        }
+
+    async def jobs(self, depth: int = 1, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._merged(lambda service: service.get_jobs(depth=depth), lambda jobs: jobs, timeout)
+
+    async def queue(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._merged(
+            lambda service: service.get_queue_info(), lambda data: data.get("items", []), timeout
+        )
+
+    async def nodes(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._merged(lambda service: service.get_nodes(), lambda data: data.get("computer", []), timeout)
+
+    async def running_builds(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._merged(lambda service: service.get_running_builds(), lambda builds: builds, timeout)
+
+    async def aclose(self) -> None:
+        """关闭联邦自行创建的控制器服务（主控制器由 deps 负责关闭）"""
+        for task in list(self._stragglers):
+            task.cancel()
+        await asyncio.gather(*self._stragglers, return_exceptions=True)
+        for service in self._owned:
+            await service.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "controllers": list(self.controllers),
+            "unavailable": list(self.unavailable),
+            "queries": self._queries,
+            "timeouts": self._timeouts,
+            "errors": self._errors,
+            "in_flight_stragglers": len(self._stragglers),
+        }
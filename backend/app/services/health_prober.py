@@ -0,0 +1,127 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, TYPE_CHECKING
+
+import structlog
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.services.async_jenkins_service import AsyncJenkinsService
+
+logger = structlog.get_logger("health_prober")
+
+# 快照超过多少个探测周期未更新视为过期（后台探测本身卡住）
+_STALE_INTERVALS = 3
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """最近秩法百分位，sorted_values 需已升序排列"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class HealthProber:
+    """Jenkins 健康探测
+
+    后台每 HEALTH_PROBE_INTERVAL 秒请求一次最小的 api/json 投影，记录可达性、延迟和版本号，
+    健康检查接口直接读取最近一次的快照，不访问 Jenkins：多个副本的探针不会给 Jenkins 带来额外压力，
+    Jenkins 响应慢时探针也能立即返回。最近 HEALTH_LATENCY_WINDOW 次成功探测的延迟用于计算百分位。
+    """
+
+    def __init__(self, jenkins: "AsyncJenkinsService"):
+        self.jenkins = jenkins
+        self._latencies: Deque[float] = deque(maxlen=settings.HEALTH_LATENCY_WINDOW)
+        self._task: Optional[asyncio.Task] = None
+
+        self.connected: Optional[bool] = None
+        self.version: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+        self._last_latency_ms: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._consecutive_failures = 0
+        self._probes = 0
+        self._failures = 0
+
+    def ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(settings.HEALTH_PROBE_INTERVAL)
+
+    async def probe_once(self) -> None:
+        """探测一次并更新快照，失败（含超时、熔断中）记为不可达"""
+        started = time.monotonic()
+        self._probes += 1
+        try:
+            response = await asyncio.wait_for(
+                self.jenkins._request("GET", "api/json", params={"tree": "mode"}),
+                settings.HEALTH_PROBE_TIMEOUT,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._failures += 1
+            self._consecutive_failures += 1
+            if isinstance(e, asyncio.TimeoutError):
+                self._last_error = f"{settings.HEALTH_PROBE_TIMEOUT} 秒内未响应"
+            else:
+                self._last_error = str(e) or type(e).__name__
+            if self.connected is not False:
+                logger.warning("Jenkins 健康探测失败", url=self.jenkins.url, error=self._last_error)
+            self.connected = False
+        else:
+            self._last_latency_ms = round((time.monotonic() - started) * 1000, 1)
+            self._latencies.append(self._last_latency_ms)
+            self.version = response.headers.get("X-Jenkins") or self.version
+            if self.connected is False:
+                logger.info("Jenkins 已恢复", url=self.jenkins.url, failures=self._consecutive_failures)
+            self.connected = True
+            self._consecutive_failures = 0
+            self._last_error = None
+            self.last_success_at = time.time()
+        self.checked_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """最近一次探测结果；尚未完成首次探测时 status 为 unknown"""
+        if self.connected is None:
+            status = "unknown"
+        else:
+            status = "connected" if self.connected else "disconnected"
+        age = round(time.time() - self.checked_at, 1) if self.checked_at else None
+        latencies = sorted(self._latencies)
+        return {
+            "status": status,
+            "url": self.jenkins.url,
+            "version": self.version,
+            "checked_at": self.checked_at,
+            "age_seconds": age,
+            "stale": age is not None and age > settings.HEALTH_PROBE_INTERVAL * _STALE_INTERVALS + settings.HEALTH_PROBE_TIMEOUT,
+            "latency_ms": self._last_latency_ms,
+            "latency_percentiles_ms": {f"p{q}": percentile(latencies, q) for q in (50, 90, 99)},
+            "latency_samples": len(latencies),
+            "consecutive_failures": self._consecutive_failures,
+            "last_success_at": self.last_success_at,
+            "error": self._last_error,
+            "circuit": self.jenkins.transport.breaker.state,
+        }
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "probes": self._probes,
+            "failures": self._failures,
+            "interval": settings.HEALTH_PROBE_INTERVAL,
+        }
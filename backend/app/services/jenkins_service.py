@@ -1,8 +1,12 @@
-from typing import Dict, List, Any
+import time
+from typing import Dict, List, Any, Optional
 import jenkins
+import requests
 import structlog
 from fastapi import HTTPException
 from app.core.config import settings
+from app.services import jenkins_tree
+from app.services.jenkins_transport import job_path
 
 logger = structlog.get_logger("jenkins_service")
 
@@ -22,7 +26,8 @@ class JenkinsService:
             self.server = jenkins.Jenkins(
                 settings.JENKINS_URL, 
                 username=settings.JENKINS_USERNAME, 
-                password=auth_credential
+                password=auth_credential,
+                timeout=settings.JENKINS_READ_TIMEOUT
             )
             
             # 测试连接
@@ -98,9 +103,10 @@ class JenkinsService:
     def get_jobs(self, depth: int = 1) -> List[Dict[str, Any]]:
         """获取任务列表"""
         try:
-            # python-jenkins 的 get_jobs 方法不支持 depth 参数
-            # 我们使用默认的获取方式
-            jobs = self.server.get_jobs()
+            # python-jenkins 的 get_jobs 方法不支持 depth 参数，改用 tree 投影按 depth 取字段
+            jobs = self.server.get_info(query=f"?tree={jenkins_tree.jobs_tree(depth)}")["jobs"]
+            for job in jobs:
+                job.setdefault("fullname", job.get("fullName") or job.get("name"))
             logger.info("获取任务列表成功", job_count=len(jobs))
             return jobs
         except Exception as e:
@@ -158,10 +164,18 @@ class JenkinsService:
             logger.error("获取构建详情失败", job_name=job_name, build_number=build_number, error=str(e))
             raise
     
-    def get_build_console_output(self, job_name: str, build_number: int) -> str:
-        """获取构建控制台输出"""
+    def get_build_console_output(self, job_name: str, build_number: int, start: Optional[int] = None) -> str:
+        """获取构建控制台输出
+
+        指定 start 时通过 logText/progressiveText 只获取从该字节偏移开始的新增输出。
+        """
         try:
-            console_output = self.server.get_build_console_output(job_name, build_number)
+            if start is None:
+                console_output = self.server.get_build_console_output(job_name, build_number)
+            else:
+                url = f"{self.server.server}{job_path(job_name)}/{build_number}/logText/progressiveText"
+                response = self.server.jenkins_request(requests.Request("GET", url, params={"start": start}))
+                console_output = response.text
             logger.info("获取构建控制台输出成功", job_name=job_name, build_number=build_number)
             return console_output
         except jenkins.NotFoundException:
@@ -187,6 +201,24 @@ class JenkinsService:
             logger.error("获取队列项信息失败", queue_id=queue_id, error=str(e))
             raise
     
+    def wait_for_build_start(
+        self, job_name: str, queue_id: int, timeout: float = 60, interval: float = 1
+    ) -> Optional[int]:
+        """等待队列项开始构建，返回构建号；超时或被取消时返回 None"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            queue_info = self.get_queue_item(queue_id)
+            executable = queue_info.get("executable")
+            if executable and executable.get("number") is not None:
+                logger.info("构建已开始", job_name=job_name, queue_id=queue_id, build_number=executable["number"])
+                return executable["number"]
+            if queue_info.get("cancelled"):
+                logger.warning("队列项已取消", job_name=job_name, queue_id=queue_id)
+                return None
+            time.sleep(interval)
+        logger.warning("等待构建开始超时", job_name=job_name, queue_id=queue_id, timeout=timeout)
+        return None
+    
     def delete_job(self, job_name: str) -> None:
         """删除任务"""
         try:
@@ -0,0 +1,264 @@
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple, Union
+from urllib.parse import quote, urlsplit
+
+import httpx
+import structlog
+from app.core import metrics, tracing
+from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.single_flight import SingleFlight
+
+logger = structlog.get_logger("jenkins_transport")
+
+# 计入熔断的上游状态码：Jenkins 重启/过载或前置代理找不到后端
+_UNAVAILABLE_STATUS = {502, 503, 504}
+
+# 保留上游验证器（ETag / Last-Modified）及对应响应的条目数
+_VALIDATOR_LIMIT = 512
+
+
+# 上游请求路径 -> 指标中的操作名（写操作按路径结尾区分）
+_JOB_PREFIX = r"(?:job/[^/]+/)+"
+_GET_OPERATIONS = (
+    (re.compile(rf"^{_JOB_PREFIX}[^/]+/wfapi/"), "get_pipeline"),
+    (re.compile(rf"^{_JOB_PREFIX}[^/]+/logText/progressiveText$"), "get_console_progressive"),
+    (re.compile(rf"^{_JOB_PREFIX}[^/]+/consoleText$"), "get_console"),
+    (re.compile(rf"^{_JOB_PREFIX}[^/]+/api/json$"), "get_build_info"),
+    (re.compile(rf"^{_JOB_PREFIX}api/json$"), "get_job_info"),
+    (re.compile(r"^queue/item/"), "get_queue_item"),
+    (re.compile(r"^queue/"), "get_queue"),
+    (re.compile(r"^computer/api/"), "get_nodes"),
+    (re.compile(r"^computer/"), "get_node_info"),
+    (re.compile(r"^pluginManager/"), "get_plugins"),
+    (re.compile(r"^(?:people|asynchPeople)/"), "get_people"),
+    (re.compile(r"^me/"), "get_current_user"),
+    (re.compile(r"^crumbIssuer/"), "get_crumb"),
+    (re.compile(r"^systemInfo$"), "get_system_info"),
+    (re.compile(r"^api/json$"), "get_root"),
+)
+_WRITE_OPERATIONS = (
+    ("/buildWithParameters", "build_job"),
+    ("/build", "build_job"),
+    ("/stop", "stop_build"),
+    ("/doDelete", "delete_job"),
+    ("/enable", "toggle_job"),
+    ("/disable", "toggle_job"),
+    ("/toggleOffline", "toggle_node"),
+)
+
+
+@lru_cache(maxsize=4096)
+def upstream_operation(method: str, path: str) -> str:
+    """把上游请求归类为有限的操作名，用作指标标签"""
+    path = path.strip("/")
+    if method == "GET":
+        for pattern, operation in _GET_OPERATIONS:
+            if pattern.search(path):
+                return operation
+        return "get_other"
+    if path.startswith("createItem"):
+        return "create_job"
+    for suffix, operation in _WRITE_OPERATIONS:
+        if path.endswith(suffix):
+            return operation
+    return "write_other"
+
+
+def job_path(job_name: str) -> str:
+    """将任务名转换为 Jenkins URL 路径，支持 'folder/job' 形式的文件夹任务"""
+    return "/".join(f"job/{quote(part, safe='')}" for part in job_name.split("/"))
+
+
+class JenkinsTransport:
+    """Jenkins 上游 HTTP 传输层
+
+    所有访问 Jenkins 的原始 HTTP 请求都经过这里，共享同一个 keep-alive 连接池：
+    按主机限制连接数、启用 gzip 压缩、统一超时和 CSRF crumb 处理，并记录连接池统计。
+    相同的并发 GET 请求会被合并为一次上游调用。
+    连续连接失败后熔断：之后的请求立即失败，直到后台探测确认 Jenkins 恢复。
+    上游响应带有 ETag 或 Last-Modified 时（如静态资源、部分插件端点），下次请求会带上
+    If-None-Match / If-Modified-Since，收到 304 时直接复用上次的响应。
+    """
+
+    def __init__(self, base_url: str, auth: Tuple[str, str], name: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        # 指标中的 controller 标签
+        self.metrics_label = name or urlsplit(self.base_url).netloc or self.base_url
+        # 每个 Jenkins 控制器一个传输层实例，因此这里的连接数限制即为按主机限制
+        self.limits = httpx.Limits(
+            max_connections=settings.JENKINS_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.JENKINS_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.JENKINS_POOL_KEEPALIVE_EXPIRY,
+        )
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            auth=auth,
+            limits=self.limits,
+            timeout=httpx.Timeout(
+                connect=settings.JENKINS_CONNECT_TIMEOUT,
+                read=settings.JENKINS_READ_TIMEOUT,
+                write=settings.JENKINS_READ_TIMEOUT,
+                pool=settings.JENKINS_POOL_TIMEOUT,
+            ),
+            headers={"Accept-Encoding": "gzip"},
+        )
+        # None 表示尚未探测，False 表示服务器未启用 CSRF 保护
+        self._crumb: Union[Dict[str, str], bool, None] = None
+        self.single_flight = SingleFlight()
+        self._validated: "OrderedDict[Tuple, httpx.Response]" = OrderedDict()
+        self.breaker = CircuitBreaker(
+            self.base_url,
+            self._probe,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            backoff_initial=settings.CIRCUIT_BACKOFF_INITIAL,
+            backoff_max=settings.CIRCUIT_BACKOFF_MAX,
+        )
+
+        self._requests = 0
+        self._in_flight = 0
+        self._errors = 0
+        self._connections_opened = 0
+        self._bytes_received = 0
+        self._conditional_requests = 0
+        self._not_modified = 0
+        self._bytes_saved = 0
+
+    async def aclose(self) -> None:
+        """停止熔断探测并关闭连接池"""
+        await self.breaker.aclose()
+        await self.client.aclose()
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """发送请求并检查状态码，网络层异常统一转换为 ConnectionError
+
+        只带查询参数的 GET 请求按 (path, params) 合并，并发调用方共享同一个响应。
+        """
+        # span 记在调用方的请求上：被合并的调用方记录的是等待共享响应的时间
+        with tracing.span("upstream", upstream_operation(method, path)):
+            if method == "GET" and set(kwargs) <= {"params"}:
+                key = (path, tuple(sorted((kwargs.get("params") or {}).items())))
+                return await self.single_flight.do(key, lambda: self._send_conditional(key, path, kwargs.get("params")))
+            return await self._send(method, path, **kwargs)
+
+    async def _send_conditional(self, key: Tuple, path: str, params: Optional[Dict[str, Any]]) -> httpx.Response:
+        """发送 GET 请求，上次响应带有验证器时改为条件请求"""
+        cached = self._validated.get(key)
+        headers = {}
+        if cached is not None:
+            if "ETag" in cached.headers:
+                headers["If-None-Match"] = cached.headers["ETag"]
+            if "Last-Modified" in cached.headers:
+                headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+            self._conditional_requests += 1
+
+        response = await self._send("GET", path, params=params, headers=headers)
+        if response.status_code == httpx.codes.NOT_MODIFIED and cached is not None:
+            self._not_modified += 1
+            self._bytes_saved += len(cached.content)
+            self._validated.move_to_end(key)
+            return cached
+
+        if "ETag" in response.headers or "Last-Modified" in response.headers:
+            self._validated[key] = response
+            self._validated.move_to_end(key)
+            while len(self._validated) > _VALIDATOR_LIMIT:
+                self._validated.popitem(last=False)
+        else:
+            self._validated.pop(key, None)
+        return response
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        if method != "GET":
+            kwargs["headers"] = {**await self._get_crumb_header(), **(kwargs.get("headers") or {})}
+
+        self.breaker.check()
+        operation = upstream_operation(method, path)
+        self._requests += 1
+        self._in_flight += 1
+        metrics.UPSTREAM_IN_FLIGHT.inc((self.metrics_label,))
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, extensions={"trace": self._trace}, **kwargs)
+        except httpx.TransportError as e:
+            self._errors += 1
+            metrics.UPSTREAM_DURATION.observe(time.perf_counter() - started, (self.metrics_label, operation, "error"))
+            error = ConnectionError(f"无法连接 Jenkins 服务器 {self.base_url}: {e}")
+            self.breaker.record_failure(error)
+            raise error from e
+        finally:
+            self._in_flight -= 1
+            metrics.UPSTREAM_IN_FLIGHT.dec((self.metrics_label,))
+
+        metrics.UPSTREAM_DURATION.observe(
+            time.perf_counter() - started, (self.metrics_label, operation, f"{response.status_code // 100}xx")
+        )
+        metrics.UPSTREAM_BYTES.inc((self.metrics_label, operation), response.num_bytes_downloaded)
+        self._bytes_received += response.num_bytes_downloaded
+        if response.status_code in _UNAVAILABLE_STATUS:
+            self.breaker.record_failure(ConnectionError(f"Jenkins 返回 {response.status_code}"))
+        else:
+            self.breaker.record_success()
+        if response.is_error:
+            self._errors += 1
+        # 304 只会出现在条件请求中，由调用方处理
+        if response.status_code != httpx.codes.NOT_MODIFIED:
+            response.raise_for_status()
+        return response
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        response = await self.request("GET", path, params=params)
+        with tracing.span("decode", upstream_operation("GET", path)):
+            return response.json()
+
+    async def _probe(self) -> None:
+        """熔断探测：绕过熔断检查请求最小的 api/json 投影，连接失败或 5xx 网关错误时抛出异常"""
+        response = await self.client.get("api/json", params={"tree": "mode"})
+        if response.status_code in _UNAVAILABLE_STATUS:
+            raise ConnectionError(f"Jenkins 返回 {response.status_code}")
+
+    async def _get_crumb_header(self) -> Dict[str, str]:
+        """获取 CSRF crumb 请求头，服务器未启用时返回空字典"""
+        if self._crumb is None:
+            try:
+                self._crumb = await self.get_json("crumbIssuer/api/json")
+            except httpx.HTTPStatusError:
+                self._crumb = False
+        if not self._crumb:
+            return {}
+        return {self._crumb["crumbRequestField"]: self._crumb["crumb"]}
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        # 只有新建 TCP 连接时才会触发 connect_tcp 事件，复用 keep-alive 连接不会
+        if event_name == "connection.connect_tcp.complete":
+            self._connections_opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """连接池统计信息"""
+        pool_connections = getattr(getattr(self.client._transport, "_pool", None), "connections", [])
+        idle = sum(1 for conn in pool_connections if conn.is_idle())
+        reused = max(self._requests - self._connections_opened, 0)
+        return {
+            "base_url": self.base_url,
+            "requests": self._requests,
+            "in_flight": self._in_flight,
+            "errors": self._errors,
+            "bytes_received": self._bytes_received,
+            "connections_opened": self._connections_opened,
+            "connection_reuse_ratio": round(reused / self._requests, 4) if self._requests else 0.0,
+            "conditional_requests": self._conditional_requests,
+            "not_modified": self._not_modified,
+            "bytes_saved": self._bytes_saved,
+            "circuit": self.breaker.stats(),
+            "pool": {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry,
+                "open_connections": len(pool_connections),
+                "idle_connections": idle,
+                "active_connections": len(pool_connections) - idle,
+            },
+        }
@@ -0,0 +1,96 @@
+"""
+Jenkins tree= 查询投影
+
+Jenkins REST API 的 tree 参数只返回指定字段，{M,N} 可以限定数组范围。
+这里集中定义各端点实际返回的最小字段集合，避免为了几个字段拉取整个对象。
+"""
+
+# 构建摘要字段（构建历史、任务最近构建等）
+BUILD_SUMMARY_FIELDS = "number,url,result,timestamp,duration,building,displayName"
+
+# 任务列表：按 depth 逐级增加字段，depth 越大包含的信息越多
+_JOB_LIST_FIELDS = {
+    0: "name,url,color,fullName",
+    1: (
+        "name,url,color,fullName,description,buildable,inQueue,"
+        f"lastBuild[{BUILD_SUMMARY_FIELDS}],healthReport[score,description]"
+    ),
+    2: (
+        "name,url,color,fullName,description,buildable,inQueue,"
+        f"lastBuild[{BUILD_SUMMARY_FIELDS}],healthReport[score,description],"
+        f"lastCompletedBuild[{BUILD_SUMMARY_FIELDS}],"
+        f"lastSuccessfulBuild[{BUILD_SUMMARY_FIELDS}],"
+        f"lastFailedBuild[{BUILD_SUMMARY_FIELDS}]"
+    ),
+}
+
+# 递归遍历文件夹：每层只需要名称（Jenkins 会自动附带 _class，用于区分文件夹与任务）
+FOLDER_CHILDREN_TREE = "jobs[name]"
+
+# 文件夹（或根）下各任务的最近构建号，构建历史同步按文件夹批量获取
+FOLDER_LAST_BUILDS_TREE = "jobs[name,lastBuild[number]]"
+
+# 任务参数定义
+JOB_PARAMETERS_TREE = (
+    "property[parameterDefinitions[name,type,description,defaultParameterValue[name,value],choices]]"
+)
+
+# 任务最近一次构建号
+JOB_LAST_BUILD_TREE = "lastBuild[number]"
+
+# 正在运行的构建：运行中的构建总是最新的几个，只看最近 RUNNING_BUILDS_SCAN 个
+RUNNING_BUILDS_SCAN = 50
+RUNNING_BUILDS_TREE = f"builds[number,building]{{0,{RUNNING_BUILDS_SCAN}}}"
+
+# 构建状态
+BUILD_STATUS_TREE = "number,building,result,duration,timestamp,url,estimatedDuration"
+
+# 构建队列
+QUEUE_TREE = (
+    "items[id,inQueueSince,why,blocked,buildable,stuck,params,"
+    "task[name,url,color],executable[number,url]]"
+)
+
+# 队列跟踪：只需要 id 和排队原因
+QUEUE_WATCH_TREE = "items[id,why,task[name]]"
+
+# 单个队列项：是否已开始构建或被取消
+QUEUE_ITEM_TREE = "id,cancelled,why,task[name],executable[number,url]"
+
+# 节点列表
+NODES_TREE = (
+    "busyExecutors,totalExecutors,"
+    "computer[displayName,description,idle,offline,offlineCauseReason,temporarilyOffline,"
+    "numExecutors,jnlpAgent,assignedLabels[name]]"
+)
+
+# 所有执行器上正在运行的构建（Pipeline 运行在 oneOffExecutors 上）
+_EXECUTABLE_FIELDS = "currentExecutable[number,url,fullDisplayName,timestamp,estimatedDuration]"
+EXECUTORS_TREE = f"computer[displayName,executors[{_EXECUTABLE_FIELDS}],oneOffExecutors[{_EXECUTABLE_FIELDS}]]"
+
+# 用户列表
+PEOPLE_TREE = "users[lastChange,project[name,url],user[id,fullName,absoluteUrl]]"
+
+# 插件列表
+PLUGINS_TREE = "plugins[shortName,longName,version,active,enabled,hasUpdate,pinned,bundled,url]"
+
+
+def jobs_tree(depth: int = 1) -> str:
+    """任务列表投影，depth 超出范围时取最近的级别"""
+    level = min(max(depth, 0), max(_JOB_LIST_FIELDS))
+    return f"jobs[{_JOB_LIST_FIELDS[level]}]"
+
+
+# Jenkins 的 builds 属性只包含最近 100 次构建，更早的需要通过 allBuilds 访问（会加载全部构建记录）
+RECENT_BUILDS_LIMIT = 100
+
+
+def job_builds_field(limit: int, offset: int = 0) -> str:
+    """覆盖第 offset 到 offset + limit 条构建所需的属性名"""
+    return "builds" if max(offset, 0) + max(limit, 0) <= RECENT_BUILDS_LIMIT else "allBuilds"
+
+
+def job_builds_tree(limit: int, offset: int = 0) -> str:
+    """任务构建历史投影，从第 offset 条（0 为最新）开始取 limit 条"""
+    offset = max(offset, 0)
+    return f"{job_builds_field(limit, offset)}[{BUILD_SUMMARY_FIELDS}]{{{offset},{offset + max(limit, 0)}}}"
@@ -0,0 +1,213 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING
+
+import httpx
+import structlog
+from app.core.config import settings
+from app.services import jenkins_tree
+from app.services.jenkins_transport import job_path
+
+if TYPE_CHECKING:
+    from app.services.async_jenkins_service import AsyncJenkinsService
+
+logger = structlog.get_logger("job_crawler")
+
+# 子项由分支索引/组织扫描自动生成的文件夹，内容变化比普通文件夹频繁
+_COMPUTED_FOLDER_CLASSES = {
+    "org.jenkinsci.plugins.workflow.multibranch.WorkflowMultiBranchProject",
+    "jenkins.branch.OrganizationFolder",
+}
+_FOLDER_CLASSES = {
+    "com.cloudbees.hudson.plugins.folder.Folder",
+    *_COMPUTED_FOLDER_CLASSES,
+}
+
+
+def _folder_kind(item_class: str) -> Optional[str]:
+    """返回 'computed' / 'folder'，不是文件夹时返回 None（按类名后缀兼容其他插件的文件夹类型）"""
+    if item_class in _COMPUTED_FOLDER_CLASSES or item_class.endswith("MultiBranchProject"):
+        return "computed"
+    if item_class in _FOLDER_CLASSES or item_class.endswith("Folder"):
+        return "folder"
+    return None
+
+
+class _Folder:
+    __slots__ = ("path", "kind", "jobs", "folders", "fetched_at")
+
+    def __init__(self, path: str, kind: str, jobs: List[str], folders: Dict[str, str], fetched_at: float):
+        self.path = path
+        self.kind = kind
+        self.jobs = jobs
+        # 子文件夹全名 -> 类型
+        self.folders = folders
+        self.fetched_at = fetched_at
+
+    def ttl(self) -> float:
+        if self.kind == "computed":
+            return settings.JOB_CRAWL_COMPUTED_FOLDER_TTL
+        return settings.JOB_CRAWL_FOLDER_TTL
+
+
+class JobCrawler:
+    """递归任务发现
+
+    从根开始按层并发遍历文件夹和多分支项目（并发数受 JOB_CRAWL_CONCURRENCY 限制），每层只请求子项名称，
+    最终得到所有任务全名的扁平列表。每个文件夹的子项单独缓存：刷新时只重新拉取超过各自 TTL 的文件夹
+    （多分支项目 TTL 更短），未过期的文件夹直接沿用缓存继续向下遍历；通过本服务创建/删除任务后，
+    对应的父文件夹立即标记为过期。列表过期后先返回旧结果，同时在后台刷新。
+    """
+
+    def __init__(self, jenkins: "AsyncJenkinsService"):
+        self.jenkins = jenkins
+        self._folders: Dict[str, _Folder] = {}
+        self._job_names: Optional[List[str]] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.version = 0
+        self.crawled_at: Optional[float] = None
+
+        self._crawls = 0
+        self._folders_fetched = 0
+        self._folders_reused = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+        self._last_elapsed_ms: Optional[float] = None
+
+    def invalidate(self, job_name: str) -> None:
+        """任务被创建或删除后，标记其父文件夹在下次遍历时重新拉取"""
+        parent = job_name.rpartition("/")[0]
+        folder = self._folders.get(parent)
+        if folder is not None:
+            folder.fetched_at = float("-inf")
+
+    def _is_due(self, now: float) -> bool:
+        return any(now - folder.fetched_at >= folder.ttl() for folder in self._folders.values())
+
+    async def _fetch_children(self, path: str) -> List[Dict[str, Any]]:
+        prefix = f"{job_path(path)}/" if path else ""
+        data = await self.jenkins._get_json(f"{prefix}api/json", params={"tree": jenkins_tree.FOLDER_CHILDREN_TREE})
+        return data.get("jobs", [])
+
+    async def crawl(self, force: bool = False) -> Dict[str, int]:
+        """遍历整个任务树，force 为 True 时忽略缓存重新拉取所有文件夹
+
+        根目录拉取失败时抛出异常；子文件夹拉取失败时沿用旧数据（没有旧数据则跳过该子树）。
+        """
+        async with self._lock:
+            started = time.monotonic()
+            semaphore = asyncio.Semaphore(settings.JOB_CRAWL_CONCURRENCY)
+            reachable: Set[str] = set()
+            counters = {"fetched": 0, "reused": 0, "changed": 0, "errors": 0}
+
+            async def visit(path: str, kind: str) -> None:
+                reachable.add(path)
+                folder = self._folders.get(path)
+                if force or folder is None or time.monotonic() - folder.fetched_at >= folder.ttl():
+                    try:
+                        async with semaphore:
+                            items = await self._fetch_children(path)
+                    except Exception as e:
+                        if not path:
+                            raise
+                        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404:
+                            # 文件夹已被删除，下次拉取父文件夹时会从列表中消失
+                            reachable.discard(path)
+                            return
+                        counters["errors"] += 1
+                        self._last_error = str(e)
+                        logger.warning("拉取文件夹子项失败", folder=path, error=str(e))
+                        if folder is None:
+                            return
+                    else:
+                        counters["fetched"] += 1
+                        prefix = f"{path}/" if path else ""
+                        jobs: List[str] = []
+                        folders: Dict[str, str] = {}
+                        for item in items:
+                            name = item.get("name")
+                            if not name:
+                                continue
+                            child_kind = _folder_kind(item.get("_class", ""))
+                            if child_kind is None:
+                                jobs.append(prefix + name)
+                            else:
+                                folders[prefix + name] = child_kind
+                        if folder is None or folder.jobs != jobs or folder.folders != folders:
+                            counters["changed"] += 1
+                        folder = _Folder(path, kind, jobs, folders, time.monotonic())
+                        self._folders[path] = folder
+                else:
+                    counters["reused"] += 1
+                await asyncio.gather(*(visit(child, child_kind) for child, child_kind in folder.folders.items()))
+
+            await visit("", "folder")
+
+            # 不再可达的文件夹（已删除或移动）从缓存中移除
+            for path in self._folders.keys() - reachable:
+                del self._folders[path]
+                counters["changed"] += 1
+
+            if counters["changed"]:
+                self.version += 1
+                self._job_names = None
+            self.crawled_at = time.time()
+            self._crawls += 1
+            self._folders_fetched += counters["fetched"]
+            self._folders_reused += counters["reused"]
+            self._errors += counters["errors"]
+            self._last_elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+            logger.info(
+                "任务树遍历完成",
+                folders=len(self._folders) - 1,
+                elapsed_ms=self._last_elapsed_ms,
+                **counters,
+            )
+            return counters
+
+    async def _crawl_in_background(self) -> None:
+        try:
+            await self.crawl()
+        except Exception as e:
+            self._errors += 1
+            self._last_error = str(e)
+            logger.warning("后台遍历任务树失败", error=str(e))
+
+    def job_names(self) -> List[str]:
+        """所有任务全名（不含文件夹），按名称排序"""
+        if self._job_names is None:
+            self._job_names = sorted(name for folder in self._folders.values() for name in folder.jobs)
+        return self._job_names
+
+    async def list_jobs(self, refresh: bool = False) -> Dict[str, Any]:
+        """返回所有任务全名；首次调用或 refresh 时同步遍历，缓存过期时先返回旧结果并在后台刷新"""
+        if refresh or "" not in self._folders:
+            await self.crawl(force=refresh)
+        elif self._is_due(time.monotonic()) and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._crawl_in_background())
+        return {
+            "jobs": self.job_names(),
+            "folders": len(self._folders) - 1,
+            "version": self.version,
+            "crawled_at": self.crawled_at,
+        }
+
+    async def aclose(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "folders": max(len(self._folders) - 1, 0),
+            "jobs": sum(len(folder.jobs) for folder in self._folders.values()),
+            "version": self.version,
+            "crawls": self._crawls,
+            "folders_fetched": self._folders_fetched,
+            "folders_reused": self._folders_reused,
+            "errors": self._errors,
+            "last_error": self._last_error,
+            "last_elapsed_ms": self._last_elapsed_ms,
+            "crawled_at": self.crawled_at,
+        }
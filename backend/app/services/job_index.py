@@ -0,0 +1,372 @@
+import asyncio
+import base64
+import bisect
+import json
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+
+import structlog
+from app.core.config import settings
+from app.services import jenkins_tree
+from app.services.jenkins_transport import job_path
+
+if TYPE_CHECKING:
+    from app.services.async_jenkins_service import AsyncJenkinsService
+
+logger = structlog.get_logger("job_index")
+
+# 任务状态由 Jenkins color 推导，*_anime 表示正在构建；文件夹等没有 color 的条目没有状态
+JOB_STATUSES = ("running", "failed", "unstable", "success", "aborted", "notbuilt", "disabled")
+_COLOR_STATUS = {
+    "blue": "success",
+    "green": "success",
+    "red": "failed",
+    "yellow": "unstable",
+    "aborted": "aborted",
+    "notbuilt": "notbuilt",
+    "grey": "notbuilt",
+    "disabled": "disabled",
+}
+_STATUS_ORDER = {status: i for i, status in enumerate(JOB_STATUSES)}
+
+# 排序字段：name 为任务全名，其余字段取自最近一次构建和健康报告
+SORT_FIELDS = ("name", "status", "last_build", "duration", "health")
+
+# 索引在任务列表中记录的字段深度，与前端任务列表一致
+_INDEX_DEPTH = 2
+DEFAULT_PAGE_SIZE = 50
+
+
+def job_status(color: Optional[str]) -> Optional[str]:
+    if not color:
+        return None
+    if color.endswith("_anime"):
+        return "running"
+    return _COLOR_STATUS.get(color)
+
+
+def parse_query(
+    search: Optional[str],
+    status: Optional[str],
+    sort: Optional[str],
+    cursor: Optional[str],
+    limit: Optional[int],
+) -> Dict[str, Any]:
+    """把接口查询参数转换为 JobIndex.query 的参数：status 逗号分隔，sort 前缀 - 表示倒序"""
+    sort = sort or "name"
+    return {
+        "search": search or None,
+        "statuses": [s.strip() for s in status.split(",") if s.strip()] if status else None,
+        "sort": sort.lstrip("-"),
+        "descending": sort.startswith("-"),
+        "cursor": cursor or None,
+        "limit": limit or DEFAULT_PAGE_SIZE,
+    }
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _Entry:
+    __slots__ = ("name", "lower", "job", "status", "keys")
+
+    def __init__(self, name: str, job: Dict[str, Any]):
+        self.name = name
+        self.lower = name.lower()
+        self.job = job
+        self.status = job_status(job.get("color"))
+        last_build = job.get("lastBuild") or {}
+        health = job.get("healthReport") or []
+        # 每个排序字段的取值，缺失时排在升序的最前面；全名作为第二关键字保证顺序唯一
+        self.keys = {
+            "name": self.lower,
+            "status": _STATUS_ORDER.get(self.status, len(JOB_STATUSES)),
+            "last_build": last_build.get("timestamp") or 0,
+            "duration": last_build.get("duration") or 0,
+            "health": health[0].get("score", -1) if health else -1,
+        }
+
+
+class JobIndex:
+    """任务列表内存索引
+
+    后台定期按任务树遍历器（JobCrawler）得到的全名列表，逐个文件夹拉取任务列表（与任务列表接口共用响应缓存），
+    与索引逐条比较，只更新新增、变化和删除的任务，文件夹和多分支项目中的任务也包含在内；
+    任务名按三元组（trigram）建立倒排索引用于子串搜索，各排序字段的有序序列在索引变化后按需重建。
+    分页使用游标（上一页最后一条的排序键），索引在翻页之间更新也不会重复或遗漏。
+    查询只读内存，不访问 Jenkins。
+    """
+
+    def __init__(self, jenkins: "AsyncJenkinsService"):
+        self.jenkins = jenkins
+        self._entries: Dict[str, _Entry] = {}
+        self._trigram_index: Dict[str, Set[str]] = {}
+        # 排序字段 -> (索引版本, 升序排序键, 对应的任务名)
+        self._orders: Dict[str, Tuple[int, List[Tuple[Any, str]], List[str]]] = {}
+        # 文件夹全名 -> 上次拉取到的任务列表对象（响应缓存未过期时为同一个对象）
+        self._sources: Dict[str, List[Dict[str, Any]]] = {}
+        self.version = 0
+        self.indexed_at: Optional[float] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._refreshes = 0
+        self._changes = 0
+        self._queries = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+
+    def ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def request_refresh(self) -> None:
+        """写操作之后调用，让后台尽快刷新而不必等到下个周期"""
+        self._wakeup.set()
+
+    async def wait_ready(self, timeout: float) -> None:
+        """等待首次建立索引"""
+        if self._ready.is_set():
+            return
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._last_error = str(e)
+                logger.warning("任务索引刷新失败，下个周期重试", error=str(e))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.JOB_INDEX_REFRESH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _fetch_folders(self) -> Dict[str, Any]:
+        """文件夹全名 -> (文件夹内的任务名集合, 任务列表或异常)，根目录为空字符串"""
+        listing = await self.jenkins.job_crawler.list_jobs()
+        by_folder: Dict[str, Set[str]] = {"": set()}
+        for full_name in listing["jobs"]:
+            folder, _, name = full_name.rpartition("/")
+            by_folder.setdefault(folder, set()).add(name)
+
+        semaphore = asyncio.Semaphore(settings.JOB_CRAWL_CONCURRENCY)
+
+        async def fetch(folder: str) -> List[Dict[str, Any]]:
+            prefix = f"{job_path(folder)}/" if folder else ""
+            async with semaphore:
+                data = await self.jenkins._get_cached_json(
+                    "jobs", f"{prefix}api/json", params={"tree": jenkins_tree.jobs_tree(_INDEX_DEPTH)}
+                )
+            return data.get("jobs", [])
+
+        folders = list(by_folder)
+        results = await asyncio.gather(*(fetch(folder) for folder in folders), return_exceptions=True)
+        return {folder: (by_folder[folder], result) for folder, result in zip(folders, results)}
+
+    async def refresh_once(self) -> Dict[str, int]:
+        """拉取所有文件夹的任务列表并增量更新索引，返回新增、更新、删除的任务数
+
+        根目录拉取失败时抛出异常；子文件夹拉取失败时保留该文件夹中已索引的任务。
+        """
+        fetched = await self._fetch_folders()
+        root_error = fetched[""][1]
+        if isinstance(root_error, BaseException):
+            raise root_error
+        self._refreshes += 1
+        self.indexed_at = time.time()
+
+        added = updated = 0
+        seen: Set[str] = set()
+        sources: Dict[str, List[Dict[str, Any]]] = {}
+        for folder, (names, jobs) in fetched.items():
+            prefix = f"{folder}/" if folder else ""
+            if isinstance(jobs, BaseException):
+                self._errors += 1
+                self._last_error = str(jobs)
+                logger.warning("拉取文件夹任务列表失败，沿用已索引的任务", folder=folder, error=str(jobs))
+                seen.update(prefix + name for name in names if prefix + name in self._entries)
+                if folder in self._sources:
+                    sources[folder] = self._sources[folder]
+                continue
+            sources[folder] = jobs
+            # 响应缓存未过期时返回的是同一个列表对象，该文件夹的任务没有变化
+            unchanged = jobs is self._sources.get(folder)
+            for job in jobs:
+                name = job.get("name")
+                if name not in names:
+                    # 子文件夹或遍历之后才出现的条目
+                    continue
+                full_name = prefix + name
+                seen.add(full_name)
+                if unchanged and full_name in self._entries:
+                    continue
+                job.setdefault("fullname", job.get("fullName") or full_name)
+                entry = self._entries.get(full_name)
+                if entry is None:
+                    self._entries[full_name] = _Entry(full_name, job)
+                    for trigram in _trigrams(full_name.lower()):
+                        self._trigram_index.setdefault(trigram, set()).add(full_name)
+                    added += 1
+                elif entry.job != job:
+                    self._entries[full_name] = _Entry(full_name, job)
+                    updated += 1
+        self._sources = sources
+
+        removed_names = self._entries.keys() - seen
+        for name in removed_names:
+            entry = self._entries.pop(name)
+            for trigram in _trigrams(entry.lower):
+                names = self._trigram_index.get(trigram)
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del self._trigram_index[trigram]
+
+        self._ready.set()
+        changes = {"added": added, "updated": updated, "removed": len(removed_names)}
+        if added or updated or removed_names:
+            self.version += 1
+            self._changes += added + updated + len(removed_names)
+            logger.info("任务索引已更新", jobs=len(self._entries), **changes)
+        return changes
+
+    # -------------------------------------------------------------------------
+    # 查询
+    # -------------------------------------------------------------------------
+
+    def _search(self, text: str) -> Set[str]:
+        """子串搜索：三个字符以上先用三元组倒排索引求交集缩小候选，再逐个确认"""
+        text = text.lower()
+        if len(text) < 3:
+            return {name for name, entry in self._entries.items() if text in entry.lower}
+        postings = sorted((self._trigram_index.get(t, set()) for t in _trigrams(text)), key=len)
+        candidates = set(postings[0])
+        for names in postings[1:]:
+            candidates &= names
+            if not candidates:
+                break
+        return {name for name in candidates if text in self._entries[name].lower}
+
+    def _order(self, sort: str) -> Tuple[List[Tuple[Any, str]], List[str]]:
+        cached = self._orders.get(sort)
+        if cached is not None and cached[0] == self.version:
+            return cached[1], cached[2]
+        pairs = sorted((entry.keys[sort], name) for name, entry in self._entries.items())
+        names = [name for _, name in pairs]
+        self._orders[sort] = (self.version, pairs, names)
+        return pairs, names
+
+    @staticmethod
+    def _encode_cursor(sort: str, descending: bool, key: Tuple[Any, str]) -> str:
+        raw = json.dumps([sort, descending, key[0], key[1]], ensure_ascii=False, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, str]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            cursor_sort, cursor_desc, value, name = json.loads(base64.urlsafe_b64decode(padded))
+        except (ValueError, TypeError) as e:
+            raise ValueError("无效的分页游标") from e
+        if cursor_sort != sort or cursor_desc != descending:
+            raise ValueError("分页游标与当前排序方式不一致")
+        return value, name
+
+    def query(
+        self,
+        search: Optional[str] = None,
+        statuses: Optional[Sequence[str]] = None,
+        sort: str = "name",
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """按名称子串和状态过滤、排序后返回一页任务
+
+        status_counts 为搜索结果（状态过滤之前）中各状态的任务数。参数无效时抛出 ValueError。
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"不支持的排序字段: {sort}，可选: {', '.join(SORT_FIELDS)}")
+        unknown = set(statuses or ()) - set(JOB_STATUSES)
+        if unknown:
+            raise ValueError(f"不支持的状态: {', '.join(sorted(unknown))}，可选: {', '.join(JOB_STATUSES)}")
+        self._queries += 1
+
+        matched: Optional[Set[str]] = self._search(search) if search else None
+        candidates = self._entries.keys() if matched is None else matched
+        status_counts = {status: 0 for status in JOB_STATUSES}
+        for name in candidates:
+            status = self._entries[name].status
+            if status is not None:
+                status_counts[status] += 1
+        if statuses:
+            wanted = set(statuses)
+            matched = {name for name in candidates if self._entries[name].status in wanted}
+        total = len(self._entries) if matched is None else len(matched)
+
+        pairs, names = self._order(sort)
+        if cursor:
+            key = self._decode_cursor(cursor, sort, descending)
+            try:
+                start = bisect.bisect_left(pairs, key) - 1 if descending else bisect.bisect_right(pairs, key)
+            except TypeError as e:
+                raise ValueError("无效的分页游标") from e
+        else:
+            start = len(pairs) - 1 if descending else 0
+        positions: Iterator[int] = iter(range(start, -1, -1)) if descending else iter(range(start, len(pairs)))
+
+        page: List[int] = []
+        has_more = False
+        for i in positions:
+            if matched is not None and names[i] not in matched:
+                continue
+            if len(page) == limit:
+                has_more = True
+                break
+            page.append(i)
+
+        return {
+            "items": [self._entries[names[i]].job for i in page],
+            "total": total,
+            "next_cursor": self._encode_cursor(sort, descending, pairs[page[-1]]) if has_more else None,
+            "status_counts": status_counts,
+            "version": self.version,
+            "indexed_at": self.indexed_at,
+        }
+
+    async def page(self, **query: Any) -> Dict[str, Any]:
+        """确保后台刷新已启动，首次建立索引时等待，然后从内存中查询"""
+        self.ensure_started()
+        await self.wait_ready(timeout=10)
+        if not self._ready.is_set():
+            raise ConnectionError(self._last_error or "任务索引尚未建立，请稍后重试")
+        return self.query(**query)
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "jobs": len(self._entries),
+            "trigrams": len(self._trigram_index),
+            "version": self.version,
+            "refreshes": self._refreshes,
+            "changes": self._changes,
+            "queries": self._queries,
+            "errors": self._errors,
+            "last_error": self._last_error,
+            "indexed_at": self.indexed_at,
+        }
@@ -0,0 +1,189 @@
+import asyncio
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, List, Optional, TYPE_CHECKING
+
+import httpx
+import structlog
+from fastapi import HTTPException
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.services.async_jenkins_service import AsyncJenkinsService
+
+logger = structlog.get_logger("log_search")
+
+# 单行返回的最大字符数，避免超长行（如压缩后的 JS）撑大响应
+_MAX_LINE_CHARS = 1000
+
+
+def _clip(line: str) -> str:
+    return line if len(line) <= _MAX_LINE_CHARS else line[:_MAX_LINE_CHARS] + "…"
+
+
+def scan_log(content: bytes, pattern: str, flags: int, context: int, max_matches: int) -> Dict[str, Any]:
+    """在一份日志中查找匹配行（在进程池中执行，需为模块级函数）"""
+    regex = re.compile(pattern, flags)
+    text = content.decode("utf-8", errors="replace")
+    # 先整体搜索一次，绝大多数不含匹配的日志无需按行切分
+    if regex.search(text) is None:
+        return {"matches": [], "truncated": False}
+
+    lines = text.splitlines()
+    matches: List[Dict[str, Any]] = []
+    for index, line in enumerate(lines):
+        if regex.search(line) is None:
+            continue
+        if len(matches) >= max_matches:
+            return {"matches": matches, "truncated": True}
+        matches.append({
+            "line_number": index + 1,
+            "line": _clip(line),
+            "before": [_clip(l) for l in lines[max(index - context, 0):index]],
+            "after": [_clip(l) for l in lines[index + 1:index + 1 + context]],
+        })
+    return {"matches": matches, "truncated": False}
+
+
+class BuildLogSearch:
+    """跨构建控制台日志搜索
+
+    在限定并发下获取一段构建范围内的日志（已完成构建优先使用本地日志存储），
+    交给进程池做正则扫描，避免大日志的匹配阻塞事件循环；每个构建扫描完成后立即产出结果。
+    单个构建的扫描超过 LOG_SEARCH_SCAN_TIMEOUT（如回溯爆炸的正则）时跳过该构建并重建进程池：
+    进程池无法中止正在执行的调用，只能终止卡住的工作进程，否则后续所有搜索都会排队等待。
+    """
+
+    def __init__(self, jenkins: "AsyncJenkinsService"):
+        self.jenkins = jenkins
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._searches = 0
+        self._builds_scanned = 0
+        self._bytes_scanned = 0
+        self._scan_timeouts = 0
+        self._pool_recycles = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # 使用 spawn 避免在带有后台线程的进程中 fork
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.LOG_SEARCH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _recycle_pool(self, pool: ProcessPoolExecutor) -> None:
+        """丢弃卡住的进程池并终止其工作进程，下次扫描时创建新的进程池
+
+        同一进程池上其他正在执行的扫描会以 BrokenProcessPool 结束，对应构建标记为 skipped。
+        """
+        if self._pool is not pool:
+            # 已被其他超时的扫描回收
+            return
+        self._pool = None
+        self._pool_recycles += 1
+        # 不取消排队中的任务：工作进程终止后它们以 BrokenProcessPool 结束，而不是让等待方收到 CancelledError
+        pool.shutdown(wait=False)
+        terminate = getattr(pool, "terminate_workers", None)
+        if terminate is not None:
+            terminate()
+        else:
+            # Python 3.14 之前没有公开的终止接口
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+        logger.warning("日志扫描超时，已重建扫描进程池", recycles=self._pool_recycles)
+
+    async def search(
+        self,
+        job_name: str,
+        build_numbers: List[int],
+        pattern: str,
+        ignore_case: bool = False,
+        context: int = 2,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """按构建完成顺序产出事件: match（某个构建的匹配结果）、skipped（构建不存在或读取失败）、end（汇总）"""
+        self._searches += 1
+        flags = re.IGNORECASE if ignore_case else 0
+        semaphore = asyncio.Semaphore(settings.LOG_SEARCH_FETCH_CONCURRENCY)
+        loop = asyncio.get_running_loop()
+        timeout = settings.LOG_SEARCH_SCAN_TIMEOUT
+
+        async def scan_build(build_number: int) -> Dict[str, Any]:
+            # 信号量同时限制 Jenkins 并发请求数和内存中驻留的日志数
+            async with semaphore:
+                try:
+                    content, _ = await self.jenkins.get_build_console_bytes(job_name, build_number)
+                except HTTPException as e:
+                    return {"build_number": build_number, "error": e.detail}
+                except (httpx.HTTPError, ConnectionError) as e:
+                    logger.warning("获取构建日志失败，跳过", job_name=job_name, build_number=build_number, error=str(e))
+                    return {"build_number": build_number, "error": str(e)}
+                pool = self._get_pool()
+                try:
+                    result = await asyncio.wait_for(
+                        loop.run_in_executor(
+                            pool, scan_log, content, pattern, flags, context, settings.LOG_SEARCH_MAX_MATCHES_PER_BUILD
+                        ),
+                        timeout,
+                    )
+                except asyncio.TimeoutError:
+                    self._scan_timeouts += 1
+                    logger.warning("构建日志扫描超时，跳过", job_name=job_name, build_number=build_number, pattern=pattern)
+                    self._recycle_pool(pool)
+                    return {"build_number": build_number, "error": f"扫描超过 {timeout:g} 秒，已中止"}
+                except BrokenProcessPool:
+                    return {"build_number": build_number, "error": "扫描进程因其他超时的搜索被终止，请重试"}
+            self._builds_scanned += 1
+            self._bytes_scanned += len(content)
+            return {"build_number": build_number, "bytes": len(content), **result}
+
+        started = time.monotonic()
+        tasks = {asyncio.ensure_future(scan_build(n)): n for n in build_numbers}
+        summary = {"scanned": 0, "skipped": 0, "matched_builds": 0, "total_matches": 0, "bytes_scanned": 0}
+        try:
+            for done in asyncio.as_completed(list(tasks)):
+                result = await done
+                if "error" in result:
+                    summary["skipped"] += 1
+                    yield {"event": "skipped", "data": {"build_number": result["build_number"], "reason": result["error"]}}
+                    continue
+
+                summary["scanned"] += 1
+                summary["bytes_scanned"] += result["bytes"]
+                if result["matches"]:
+                    summary["matched_builds"] += 1
+                    summary["total_matches"] += len(result["matches"])
+                    yield {
+                        "event": "match",
+                        "data": {
+                            "job_name": job_name,
+                            "build_number": result["build_number"],
+                            "matches": result["matches"],
+                            "truncated": result["truncated"],
+                        },
+                    }
+            summary["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+            logger.info("构建日志搜索完成", job_name=job_name, pattern=pattern, **summary)
+            yield {"event": "end", "data": summary}
+        finally:
+            # 客户端中途断开时取消尚未完成的获取
+            for task in tasks:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "searches": self._searches,
+            "builds_scanned": self._builds_scanned,
+            "bytes_scanned": self._bytes_scanned,
+            "pool_started": self._pool is not None,
+            "scan_timeouts": self._scan_timeouts,
+            "pool_recycles": self._pool_recycles,
+        }
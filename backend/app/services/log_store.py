@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from app.core.config import settings
+
+logger = structlog.get_logger("log_store")
+
+_DATA_SUFFIX = ".logz"
+_INDEX_SUFFIX = ".idx"
+# 同一条目的访问时间最多每隔这么久写回磁盘一次（仅用于重启后恢复 LRU 顺序，不需要精确）
+_ATIME_UPDATE_INTERVAL = 300.0
+
+
+class _StoredLog:
+    __slots__ = ("key", "size", "block_size", "offsets", "compressed_size", "touched_at")
+
+    def __init__(self, key: str, size: int, block_size: int, offsets: List[int], compressed_size: int):
+        self.key = key
+        self.size = size
+        self.block_size = block_size
+        # offsets[i] 为第 i 个压缩块在数据文件中的起始位置，最后一个元素为文件总长度
+        self.offsets = offsets
+        self.compressed_size = compressed_size
+        # 最近一次写回访问时间的时刻（monotonic），刚加载或写入时视为刚更新过
+        self.touched_at = time.monotonic()
+
+
+class BuildLogStore:
+    """已完成构建控制台日志的本地存储
+
+    已完成构建的日志不会再变化，首次下载后写入本地磁盘，之后不再消耗 Jenkins 带宽。
+    日志按固定大小分块、逐块 zlib 压缩存放，并带有块偏移索引：读取任意字节区间时只需
+    mmap 数据文件并解压覆盖该区间的几个块，从而支持 HTTP Range 请求。
+    总占用（压缩后）超过 max_bytes 时按最近访问时间 LRU 淘汰。
+
+    启动时通过 ensure_loaded() 在线程中扫描磁盘上的索引；size() / contains() 供事件循环直接调用，
+    只查内存中的索引、不加锁，索引尚未加载完成时视为未存储（调用方回源 Jenkins）。
+    """
+
+    def __init__(self, root: str, max_bytes: int, block_size: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self._entries: "OrderedDict[str, _StoredLog]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(base_url: str, job_name: str, build_number: int) -> str:
+        return hashlib.sha1(f"{base_url}|{job_name}|{build_number}".encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        # 按前两位分目录，避免单个目录文件过多
+        directory = self.root / key[:2]
+        return directory / f"{key}{_DATA_SUFFIX}", directory / f"{key}{_INDEX_SUFFIX}"
+
+    async def ensure_loaded(self) -> None:
+        """在线程中加载磁盘索引（应用启动时调用），已加载时立即返回"""
+        if not self._loaded:
+            await asyncio.to_thread(self._ensure_loaded)
+
+    def _ensure_loaded(self) -> None:
+        """首次使用时扫描磁盘，按数据文件访问时间重建 LRU 顺序（阻塞 IO，请在线程中调用）"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            found = []
+            for index_path in self.root.glob(f"*/*{_INDEX_SUFFIX}"):
+                data_path = index_path.with_suffix(_DATA_SUFFIX)
+                try:
+                    meta = json.loads(index_path.read_text())
+                    stored = _StoredLog(index_path.stem, meta["size"], meta["block_size"], meta["offsets"], meta["offsets"][-1])
+                    found.append((data_path.stat().st_atime, stored))
+                except (OSError, ValueError, KeyError):
+                    # 不完整的条目（如写入时进程退出）直接清理
+                    index_path.unlink(missing_ok=True)
+                    data_path.unlink(missing_ok=True)
+            for _, stored in sorted(found, key=lambda pair: pair[0]):
+                self._entries[stored.key] = stored
+                self._total_bytes += stored.compressed_size
+            self._loaded = True
+            logger.info("构建日志存储已加载", root=str(self.root), entries=len(self._entries), total_bytes=self._total_bytes)
+
+    def contains(self, key: str) -> bool:
+        return key in self._entries
+
+    def size(self, key: str) -> Optional[int]:
+        # 不加锁：单次字典查找在 GIL 下是原子的，写线程持锁期间也不会阻塞事件循环
+        stored = self._entries.get(key)
+        return stored.size if stored else None
+
+    def put(self, key: str, content: bytes) -> None:
+        """写入一份完整日志（阻塞 IO，请在线程中调用）"""
+        self._ensure_loaded()
+        data_path, index_path = self._paths(key)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+
+        offsets = [0]
+        tmp_data = data_path.with_suffix(".tmp")
+        with open(tmp_data, "wb") as f:
+            for pos in range(0, len(content), self.block_size):
+                block = zlib.compress(content[pos:pos + self.block_size], 6)
+                f.write(block)
+                offsets.append(offsets[-1] + len(block))
+        os.replace(tmp_data, data_path)
+        # 索引最后写入，索引存在即代表数据完整
+        tmp_index = index_path.with_suffix(".idxtmp")
+        tmp_index.write_text(json.dumps({"size": len(content), "block_size": self.block_size, "offsets": offsets}))
+        os.replace(tmp_index, index_path)
+
+        stored = _StoredLog(key, len(content), self.block_size, offsets, offsets[-1])
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.compressed_size
+            self._entries[key] = stored
+            self._total_bytes += stored.compressed_size
+            self._writes += 1
+            evicted = self._evict_locked()
+        for old_key in evicted:
+            self._remove_files(old_key)
+
+    def read(self, key: str, start: int = 0, end: Optional[int] = None) -> Optional[bytes]:
+        """读取 [start, end) 字节区间，不存在时返回 None（阻塞 IO，请在线程中调用）"""
+        self._ensure_loaded()
+        with self._lock:
+            stored = self._entries.get(key)
+            if stored is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+        end = stored.size if end is None else min(end, stored.size)
+        if start >= end:
+            return b""
+        data_path, _ = self._paths(key)
+        first_block = start // stored.block_size
+        last_block = (end - 1) // stored.block_size
+        parts = []
+        try:
+            with open(data_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for block in range(first_block, last_block + 1):
+                    parts.append(zlib.decompress(mm[stored.offsets[block]:stored.offsets[block + 1]]))
+        except (OSError, ValueError, zlib.error) as e:
+            # 文件被外部删除或损坏，丢弃该条目，调用方会回源重新下载
+            logger.warning("构建日志读取失败，已移除", key=key, error=str(e))
+            self._discard(key)
+            return None
+        # 更新访问时间，重启后据此恢复 LRU 顺序；轮询同一日志时不必每次都写元数据
+        now = time.monotonic()
+        if now - stored.touched_at >= _ATIME_UPDATE_INTERVAL:
+            stored.touched_at = now
+            try:
+                os.utime(data_path)
+            except OSError:
+                pass
+        content = b"".join(parts)
+        base = first_block * stored.block_size
+        return content[start - base:end - base]
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            stored = self._entries.pop(key, None)
+            if stored is not None:
+                self._total_bytes -= stored.compressed_size
+        self._remove_files(key)
+
+    def _evict_locked(self) -> List[str]:
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, stored = self._entries.popitem(last=False)
+            self._total_bytes -= stored.compressed_size
+            self._evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def _remove_files(self, key: str) -> None:
+        data_path, index_path = self._paths(key)
+        index_path.unlink(missing_ok=True)
+        data_path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        raw_bytes = sum(stored.size for stored in self._entries.values())
+        return {
+            "root": str(self.root),
+            "entries": len(self._entries),
+            "total_bytes": self._total_bytes,
+            "raw_bytes": raw_bytes,
+            "max_bytes": self.max_bytes,
+            "compression_ratio": round(self._total_bytes / raw_bytes, 4) if raw_bytes else 0.0,
+            "hits": self._hits,
+            "misses": self._misses,
+            "writes": self._writes,
+            "evictions": self._evictions,
+        }
+
+
+# 所有 Jenkins 服务实例共享同一个本地日志存储
+build_log_store = BuildLogStore(
+    settings.LOG_STORE_DIR,
+    max_bytes=settings.LOG_STORE_MAX_BYTES,
+    block_size=settings.LOG_STORE_BLOCK_SIZE,
+)
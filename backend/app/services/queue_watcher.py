@@ -0,0 +1,167 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+import structlog
+from fastapi import HTTPException
+from app.core.config import settings
+from app.services import jenkins_tree
+
+if TYPE_CHECKING:
+    from app.services.async_jenkins_service import AsyncJenkinsService
+
+logger = structlog.get_logger("queue_watcher")
+
+# 已解析结果保留的条目数，方便晚到的调用方直接拿到结果
+_RESOLVED_LIMIT = 1024
+
+
+class _PendingItem:
+    __slots__ = ("queue_id", "job_name", "since", "state", "future", "changed")
+
+    def __init__(self, queue_id: int, job_name: Optional[str]):
+        self.queue_id = queue_id
+        self.job_name = job_name
+        self.since = time.monotonic()
+        self.state: Dict[str, Any] = {"queue_id": queue_id, "job_name": job_name, "status": "waiting", "why": None}
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.changed = asyncio.Event()
+
+    def update(self, **fields: Any) -> None:
+        new_state = {**self.state, **fields}
+        if new_state != self.state:
+            self.state = new_state
+            self.changed.set()
+            self.changed = asyncio.Event()
+
+
+class QueueWatcher:
+    """队列项 → 构建号解析器
+
+    build_job 返回的 queue_id 注册到这里后，由一个后台任务统一跟踪：每个周期只请求一次
+    /queue/api/json 获取所有仍在排队的项目；已离开队列的项目再单独读取一次 queue item，
+    从 executable.number 得到构建号（或发现已取消）。调用方可以 await 结果或订阅状态变化。
+    """
+
+    def __init__(self, jenkins: "AsyncJenkinsService"):
+        self.jenkins = jenkins
+        self._pending: Dict[int, _PendingItem] = {}
+        self._resolved: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._sweeps = 0
+        self._item_fetches = 0
+
+    def watch(self, queue_id: int, job_name: Optional[str] = None) -> Optional[_PendingItem]:
+        """开始跟踪队列项，已解析过的队列项返回 None"""
+        if queue_id in self._resolved:
+            return None
+        item = self._pending.get(queue_id)
+        if item is None:
+            item = _PendingItem(queue_id, job_name)
+            self._pending[queue_id] = item
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._run())
+        return item
+
+    def get_state(self, queue_id: int) -> Optional[Dict[str, Any]]:
+        if queue_id in self._resolved:
+            return self._resolved[queue_id]
+        item = self._pending.get(queue_id)
+        return item.state if item else None
+
+    async def wait_for_build(self, queue_id: int, job_name: Optional[str] = None, timeout: float = 60) -> Dict[str, Any]:
+        """等待队列项开始构建，超时返回当前状态（status 为 waiting）"""
+        item = self.watch(queue_id, job_name)
+        if item is None:
+            return self._resolved[queue_id]
+        try:
+            return await asyncio.wait_for(asyncio.shield(item.future), timeout)
+        except asyncio.TimeoutError:
+            return item.state
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while self._pending:
+            try:
+                await self._sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("队列跟踪失败，下个周期重试", error=str(e), pending=len(self._pending))
+            if self._pending:
+                await asyncio.sleep(settings.QUEUE_WATCH_INTERVAL)
+
+    async def _sweep(self) -> None:
+        self._sweeps += 1
+        queue = await self.jenkins.get_queue_info(tree=jenkins_tree.QUEUE_WATCH_TREE)
+        queued = {item["id"]: item for item in queue.get("items", [])}
+
+        left = []
+        now = time.monotonic()
+        for queue_id, item in list(self._pending.items()):
+            if queue_id in queued:
+                entry = queued[queue_id]
+                item.update(
+                    why=entry.get("why"),
+                    job_name=item.job_name or (entry.get("task") or {}).get("name"),
+                )
+            elif now - item.since > settings.QUEUE_WATCH_MAX_WAIT:
+                self._resolve(item, status="expired")
+            else:
+                left.append(item)
+
+        # 离开队列的项目只需要读一次自身详情即可拿到构建号
+        results = await asyncio.gather(*(self._fetch_left_item(item) for item in left), return_exceptions=True)
+        for item, result in zip(left, results):
+            if isinstance(result, Exception):
+                logger.warning("读取队列项失败", queue_id=item.queue_id, error=str(result))
+
+    async def _fetch_left_item(self, item: _PendingItem) -> None:
+        self._item_fetches += 1
+        try:
+            info = await self.jenkins.get_queue_item(item.queue_id, tree=jenkins_tree.QUEUE_ITEM_TREE)
+        except HTTPException as e:
+            if e.status_code == 404:
+                # 队列项在 Jenkins 中只保留约 5 分钟
+                self._resolve(item, status="expired")
+                return
+            raise
+        job_name = item.job_name or (info.get("task") or {}).get("name")
+        executable = info.get("executable")
+        if executable and executable.get("number") is not None:
+            self._resolve(
+                item,
+                status="started",
+                job_name=job_name,
+                build_number=executable["number"],
+                url=executable.get("url"),
+                why=None,
+            )
+        elif info.get("cancelled"):
+            self._resolve(item, status="cancelled", job_name=job_name, why=info.get("why"))
+        else:
+            # 刚离开等待列表、还未分配到执行器，下个周期再看
+            item.update(why=info.get("why"), job_name=job_name)
+
+    def _resolve(self, item: _PendingItem, **fields: Any) -> None:
+        item.update(**fields)
+        self._pending.pop(item.queue_id, None)
+        self._resolved[item.queue_id] = item.state
+        while len(self._resolved) > _RESOLVED_LIMIT:
+            self._resolved.popitem(last=False)
+        if not item.future.done():
+            item.future.set_result(item.state)
+        logger.info("队列项已解析", **item.state)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "resolved_cached": len(self._resolved),
+            "sweeps": self._sweeps,
+            "item_fetches": self._item_fetches,
+        }
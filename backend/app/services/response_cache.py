@@ -0,0 +1,184 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import structlog
+from app.core import tracing
+
+logger = structlog.get_logger("response_cache")
+
+Loader = Callable[[], Awaitable[Any]]
+
+# 当前请求使用过期缓存的记录：中间件为每个请求放入一个列表，Jenkins 不可用而返回旧值时追加该值的年龄（秒）。
+# 放入的是可变对象，接口在子任务中运行时追加的内容中间件同样可见
+_stale_ages: ContextVar[Optional[List[float]]] = ContextVar("stale_ages", default=None)
+
+
+def track_stale() -> List[float]:
+    """开始记录当前请求是否返回了过期缓存，返回记录列表"""
+    ages: List[float] = []
+    _stale_ages.set(ages)
+    return ages
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "refreshing", "etag")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.stored_at = time.monotonic()
+        self.refreshing = False
+        # 值的 ETag，首次用于响应时计算，随条目一起替换或移除
+        self.etag: Optional[str] = None
+
+
+class ResponseCache:
+    """进程内响应缓存
+
+    - 每个端点类别（category）有独立 TTL，条目按 (category, *key) 区分，key 一般为查询参数
+    - 过期后的 stale_ttl 窗口内先返回旧值，并在后台刷新（stale-while-revalidate）
+    - 条目总数超过 max_entries 时按 LRU 淘汰
+    - 写操作之后调用 invalidate 主动失效
+    - 加载时 Jenkins 不可用（ConnectionError）且有旧值时返回旧值，并通过 track_stale 标记当前请求
+    - 缓存值的 ETag 保存在条目上（etag），条目存在期间重复请求无需重新序列化
+    """
+
+    def __init__(self, ttls: Dict[str, float], stale_ttl: float, max_entries: int):
+        self.ttls = ttls
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, ...], _Entry]" = OrderedDict()
+        # 缓存值的 id -> 条目键；条目持有值的引用，条目移除前 id 不会被复用
+        self._keys_by_value: Dict[int, Tuple[Hashable, ...]] = {}
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._stale_on_error = 0
+
+    async def get_or_load(self, category: str, key: Tuple[Hashable, ...], loader: Loader) -> Any:
+        """读取缓存，未命中时调用 loader 加载并写入"""
+        ttl = self.ttls.get(category, 0)
+        if ttl <= 0:
+            return await loader()
+
+        cache_key = (category, *key)
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age < ttl:
+                self._hits += 1
+                tracing.count("cache_hit")
+                self._entries.move_to_end(cache_key)
+                return entry.value
+            if age < ttl + self.stale_ttl:
+                self._stale_hits += 1
+                tracing.count("cache_stale")
+                self._entries.move_to_end(cache_key)
+                if not entry.refreshing:
+                    entry.refreshing = True
+                    task = asyncio.create_task(self._refresh(cache_key, entry, loader))
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return entry.value
+
+        self._misses += 1
+        tracing.count("cache_miss")
+        try:
+            value = await loader()
+        except ConnectionError as e:
+            if entry is None:
+                raise
+            self._stale_on_error += 1
+            age = time.monotonic() - entry.stored_at
+            ages = _stale_ages.get()
+            if ages is not None:
+                ages.append(age)
+            logger.warning("Jenkins 不可用，返回过期缓存", key=str(cache_key), age_seconds=round(age, 1), error=str(e))
+            return entry.value
+        self._store(cache_key, value)
+        return value
+
+    def peek(self, category: str, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        """不论是否过期，返回已缓存的值，不存在时返回 None"""
+        entry = self._entries.get((category, *key))
+        return entry.value if entry is not None else None
+
+    def etag(self, value: Any, compute: Callable[[Any], str]) -> str:
+        """value 为缓存中的值时返回条目上的 ETag（首次调用 compute 计算），否则直接计算"""
+        cache_key = self._keys_by_value.get(id(value))
+        entry = self._entries.get(cache_key) if cache_key is not None else None
+        if entry is None or entry.value is not value:
+            return compute(value)
+        if entry.etag is None:
+            entry.etag = compute(value)
+        return entry.etag
+
+    def invalidate(self, category: str, *key_prefix: Hashable) -> int:
+        """失效某个类别下（可选地限定 key 前缀）的所有条目，返回失效数量"""
+        prefix = (category, *key_prefix)
+        stale_keys = [k for k in self._entries if k[:len(prefix)] == prefix]
+        for k in stale_keys:
+            self._forget(self._entries.pop(k))
+        self._invalidations += len(stale_keys)
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_value.clear()
+
+    async def _refresh(self, cache_key: Tuple[Hashable, ...], entry: _Entry, loader: Loader) -> None:
+        try:
+            value = await loader()
+        except Exception as e:
+            self._refresh_errors += 1
+            entry.refreshing = False
+            logger.warning("缓存后台刷新失败", key=str(cache_key), error=str(e))
+            return
+        self._refreshes += 1
+        # 刷新期间条目可能已被失效或淘汰，此时丢弃结果，避免写回旧数据
+        if self._entries.get(cache_key) is entry:
+            self._store(cache_key, value)
+
+    def _store(self, cache_key: Tuple[Hashable, ...], value: Any) -> None:
+        previous = self._entries.pop(cache_key, None)
+        if previous is not None:
+            self._forget(previous)
+        self._entries[cache_key] = _Entry(value)
+        self._keys_by_value[id(value)] = cache_key
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._forget(evicted)
+            self._evictions += 1
+
+    def _forget(self, entry: _Entry) -> None:
+        """条目移除后清理值 id 的映射（同一个值仍缓存在其他键下时保留）"""
+        cache_key = self._keys_by_value.get(id(entry.value))
+        if cache_key is not None and cache_key not in self._entries:
+            del self._keys_by_value[id(entry.value)]
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        lookups = self._hits + self._stale_hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "hit_ratio": round((self._hits + self._stale_hits) / lookups, 4) if lookups else 0.0,
+            "background_refreshes": self._refreshes,
+            "refresh_errors": self._refresh_errors,
+            "stale_on_error": self._stale_on_error,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+            "ttls": self.ttls,
+            "stale_ttl": self.stale_ttl,
+        }
@@ -0,0 +1,57 @@
+from typing import Dict, Iterator, TYPE_CHECKING
+
+from app.core.metrics import sample_lines
+
+if TYPE_CHECKING:
+    from app.services.async_jenkins_service import AsyncJenkinsService
+
+# 缓存查找结果 -> ResponseCache.stats() 中的字段
+_CACHE_RESULTS = (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses"), ("stale_on_error", "stale_on_error"))
+
+
+def jenkins_metrics(services: Dict[str, "AsyncJenkinsService"]) -> Iterator[str]:
+    """从各控制器的统计信息生成抓取时指标：缓存命中率、请求合并、熔断状态和连接池"""
+    stats = {name: service.get_upstream_stats() for name, service in services.items()}
+    cache = {name: s["cache"] for name, s in stats.items()}
+    transport = {name: s["transport"] for name, s in stats.items()}
+
+    yield from sample_lines(
+        "jenkins_cache_lookups_total", "响应缓存查找次数", "counter",
+        (
+            ({"controller": name, "result": result}, c[key])
+            for name, c in cache.items()
+            for result, key in _CACHE_RESULTS
+        ),
+    )
+    yield from sample_lines(
+        "jenkins_cache_hit_ratio", "响应缓存命中率（含过期命中）", "gauge",
+        (({"controller": name}, c["hit_ratio"]) for name, c in cache.items()),
+    )
+    yield from sample_lines(
+        "jenkins_cache_entries", "响应缓存条目数", "gauge",
+        (({"controller": name}, c["entries"]) for name, c in cache.items()),
+    )
+    yield from sample_lines(
+        "jenkins_single_flight_merged_total", "合并到同一上游请求的并发 GET 数", "counter",
+        (({"controller": name}, s["single_flight"]["merged"]) for name, s in stats.items()),
+    )
+    yield from sample_lines(
+        "jenkins_conditional_not_modified_total", "上游条件请求返回 304 的次数", "counter",
+        (({"controller": name}, t["not_modified"]) for name, t in transport.items()),
+    )
+    yield from sample_lines(
+        "jenkins_circuit_open", "熔断是否打开（1 为打开）", "gauge",
+        (({"controller": name}, 1 if t["circuit"]["state"] == "open" else 0) for name, t in transport.items()),
+    )
+    yield from sample_lines(
+        "jenkins_circuit_rejected_total", "熔断期间直接拒绝的上游请求数", "counter",
+        (({"controller": name}, t["circuit"]["rejected"]) for name, t in transport.items()),
+    )
+    yield from sample_lines(
+        "jenkins_pool_connections", "上游连接池中的连接数", "gauge",
+        (
+            ({"controller": name, "state": state}, t["pool"][f"{state}_connections"])
+            for name, t in transport.items()
+            for state in ("active", "idle")
+        ),
+    )
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """合并相同 key 的并发调用
+
+    同一时刻相同 key 只会真正执行一次，其余调用方等待并共享同一个结果（或异常）。
+    实际调用在独立的 Task 中运行，某个调用方被取消（如客户端断开）不会影响其他调用方。
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._executions = 0
+        self._merged = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            self._executions += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self._merged += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 所有调用方都已取消时，避免出现 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """合并统计信息"""
+        total = self._executions + self._merged
+        return {
+            "executions": self._executions,
+            "merged": self._merged,
+            "merge_ratio": round(self._merged / total, 4) if total else 0.0,
+            "in_flight": len(self._calls),
+        }
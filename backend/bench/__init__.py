@@ -0,0 +1 @@
+# Jenkins Admin Backend 压测工具：模拟 Jenkins 控制器与基准测试脚本
@@ -0,0 +1,650 @@
+#!/usr/bin/env python3
+"""
+模拟 Jenkins 控制器（ASGI 应用）
+
+用于在没有真实 Jenkins 的环境下压测后端。数据由随机种子确定性生成，规模和延迟通过环境变量配置：
+
+    FAKE_JENKINS_JOBS            任务数（默认 200）
+    FAKE_JENKINS_FOLDERS         文件夹数 N，每 N+1 个任务中一个留在根目录、其余平均分到各文件夹（默认 0）
+    FAKE_JENKINS_HISTORY         每个任务的历史构建数（默认 50）
+    FAKE_JENKINS_LOG_LINES       每个构建的日志行数（默认 2000，每行约 100 字节）
+    FAKE_JENKINS_RUNNING_EVERY   每隔多少个任务有一个正在运行的构建，0 表示没有（默认 10）
+    FAKE_JENKINS_BUILD_DURATION  运行中/新触发构建的持续时间（秒，默认 60）
+    FAKE_JENKINS_QUEUE_DELAY     触发后在队列中等待的时间（秒，默认 2）
+    FAKE_JENKINS_NODES           代理节点数（默认 10）
+    FAKE_JENKINS_PLUGINS         插件数（默认 150）
+    FAKE_JENKINS_LATENCY_MS      每个请求注入的固定延迟（毫秒，默认 0）
+    FAKE_JENKINS_JITTER_MS       在固定延迟上叠加的随机延迟上限（毫秒，默认 0）
+    FAKE_JENKINS_SEED            随机种子（默认 0）
+
+启动: uvicorn bench.fake_jenkins:app --port 18080
+/_fake/stats 返回按操作分类的请求计数（不计入统计、不注入延迟），/_fake/reset 清零计数。
+"""
+import asyncio
+import os
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from bench.harness import fake_job_name
+
+VERSION = "2.440.3"
+_HEADERS = {"X-Jenkins": VERSION}
+_RESULTS = ("SUCCESS", "SUCCESS", "SUCCESS", "SUCCESS", "SUCCESS", "SUCCESS", "FAILURE", "UNSTABLE", "ABORTED")
+_COLORS = {"SUCCESS": "blue", "FAILURE": "red", "UNSTABLE": "yellow", "ABORTED": "aborted", None: "notbuilt"}
+_STAGES = ("Checkout", "Build", "Test", "Package", "Deploy")
+_LINE_PADDING = "x" * 48
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+@dataclass
+class FakeConfig:
+    jobs: int = 200
+    folders: int = 0
+    history: int = 50
+    log_lines: int = 2000
+    running_every: int = 10
+    build_duration: float = 60.0
+    queue_delay: float = 2.0
+    nodes: int = 10
+    plugins: int = 150
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeConfig":
+        return cls(
+            jobs=_env_int("FAKE_JENKINS_JOBS", cls.jobs),
+            folders=_env_int("FAKE_JENKINS_FOLDERS", cls.folders),
+            history=_env_int("FAKE_JENKINS_HISTORY", cls.history),
+            log_lines=_env_int("FAKE_JENKINS_LOG_LINES", cls.log_lines),
+            running_every=_env_int("FAKE_JENKINS_RUNNING_EVERY", cls.running_every),
+            build_duration=_env_float("FAKE_JENKINS_BUILD_DURATION", cls.build_duration),
+            queue_delay=_env_float("FAKE_JENKINS_QUEUE_DELAY", cls.queue_delay),
+            nodes=_env_int("FAKE_JENKINS_NODES", cls.nodes),
+            plugins=_env_int("FAKE_JENKINS_PLUGINS", cls.plugins),
+            latency_ms=_env_float("FAKE_JENKINS_LATENCY_MS", cls.latency_ms),
+            jitter_ms=_env_float("FAKE_JENKINS_JITTER_MS", cls.jitter_ms),
+            seed=_env_int("FAKE_JENKINS_SEED", cls.seed),
+        )
+
+
+@dataclass
+class FakeBuild:
+    number: int
+    started: float
+    duration: float
+    result: str
+    aborted_at: Optional[float] = None
+
+    def building(self, now: float) -> bool:
+        return self.aborted_at is None and now < self.started + self.duration
+
+    def current_result(self, now: float) -> Optional[str]:
+        if self.aborted_at is not None:
+            return "ABORTED"
+        return None if self.building(now) else self.result
+
+    def elapsed(self, now: float) -> float:
+        end = self.aborted_at if self.aborted_at is not None else self.started + self.duration
+        return max(min(now, end) - self.started, 0.0)
+
+    def progress(self, now: float) -> float:
+        if not self.building(now):
+            return 1.0
+        return self.elapsed(now) / self.duration if self.duration else 1.0
+
+
+@dataclass
+class FakeJob:
+    full_name: str
+    builds: Dict[int, FakeBuild] = field(default_factory=dict)
+    disabled: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.full_name.rpartition("/")[2]
+
+    def last(self) -> Optional[FakeBuild]:
+        return self.builds[max(self.builds)] if self.builds else None
+
+
+@dataclass
+class QueueItem:
+    id: int
+    job: str
+    queued_at: float
+    parameters: Dict[str, str]
+    build_number: Optional[int] = None
+    cancelled: bool = False
+
+
+class FakeJenkins:
+    """模拟控制器的状态：任务、构建、队列"""
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.started = time.time()
+        self.jobs: Dict[str, FakeJob] = {}
+        self.queue: Dict[int, QueueItem] = {}
+        self._next_queue_id = 1000
+        self.requests: Counter = Counter()
+
+        now = self.started
+        for i in range(config.jobs):
+            job = FakeJob(fake_job_name(i, config.folders))
+            for n in range(1, config.history + 1):
+                age = (config.history - n + 1) * 3600 + self.rng.uniform(0, 600)
+                job.builds[n] = FakeBuild(n, now - age, self.rng.uniform(60, 900), self.rng.choice(_RESULTS))
+            if config.running_every and i % config.running_every == 0:
+                n = config.history + 1
+                job.builds[n] = FakeBuild(n, now - self.rng.uniform(0, config.build_duration / 2), config.build_duration, "SUCCESS")
+            self.jobs[job.full_name] = job
+
+    # ------------------------------------------------------------------
+    # 状态推进
+    # ------------------------------------------------------------------
+
+    def advance(self, now: float) -> None:
+        """等待时间已到的队列项开始构建"""
+        for item in self.queue.values():
+            if item.build_number is None and not item.cancelled and now - item.queued_at >= self.config.queue_delay:
+                job = self.jobs.get(item.job)
+                if job is None:
+                    item.cancelled = True
+                    continue
+                number = (max(job.builds) if job.builds else 0) + 1
+                job.builds[number] = FakeBuild(number, now, self.config.build_duration, self.rng.choice(_RESULTS))
+                item.build_number = number
+
+    def enqueue(self, job_name: str, parameters: Dict[str, str]) -> QueueItem:
+        self._next_queue_id += 1
+        item = QueueItem(self._next_queue_id, job_name, time.time(), parameters)
+        self.queue[item.id] = item
+        return item
+
+    def folders(self) -> List[str]:
+        return sorted({name.rpartition("/")[0] for name in self.jobs if "/" in name})
+
+
+# ----------------------------------------------------------------------
+# JSON 视图
+# ----------------------------------------------------------------------
+
+def _base_url(request: Request) -> str:
+    return str(request.base_url).rstrip("/")
+
+
+def _job_url(base: str, full_name: str) -> str:
+    return base + "".join(f"/job/{part}" for part in full_name.split("/")) + "/"
+
+
+def _build_summary(base: str, job: FakeJob, build: FakeBuild, now: float) -> Dict[str, Any]:
+    return {
+        "_class": "hudson.model.FreeStyleBuild",
+        "number": build.number,
+        "url": f"{_job_url(base, job.full_name)}{build.number}/",
+        "result": build.current_result(now),
+        "timestamp": int(build.started * 1000),
+        "duration": 0 if build.building(now) else int(build.elapsed(now) * 1000),
+        "building": build.building(now),
+        "displayName": f"#{build.number}",
+    }
+
+
+def _job_color(job: FakeJob, now: float) -> str:
+    if job.disabled:
+        return "disabled"
+    last = job.last()
+    if last is None:
+        return "notbuilt"
+    if last.building(now):
+        previous = job.builds.get(last.number - 1)
+        return _COLORS[previous.current_result(now) if previous else None] + "_anime"
+    return _COLORS[last.current_result(now)]
+
+
+def _last_matching(job: FakeJob, now: float, results: Tuple[str, ...]) -> Optional[FakeBuild]:
+    for number in sorted(job.builds, reverse=True):
+        if job.builds[number].current_result(now) in results:
+            return job.builds[number]
+    return None
+
+
+def _job_entry(base: str, job: FakeJob, now: float, detailed: bool) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {
+        "_class": "hudson.model.FreeStyleProject",
+        "name": job.name,
+        "fullName": job.full_name,
+        "url": _job_url(base, job.full_name),
+        "color": _job_color(job, now),
+    }
+    if not detailed:
+        return entry
+    last = job.last()
+    completed = _last_matching(job, now, ("SUCCESS", "FAILURE", "UNSTABLE", "ABORTED"))
+    success = _last_matching(job, now, ("SUCCESS",))
+    failed = _last_matching(job, now, ("FAILURE",))
+    recent = [b.current_result(now) for b in list(job.builds.values())[-5:]]
+    score = 100 - 20 * sum(1 for r in recent if r == "FAILURE")
+    entry.update({
+        "description": f"Synthetic job {job.full_name} used for backend benchmarks",
+        "buildable": not job.disabled,
+        "inQueue": any(item.job == job.full_name and item.build_number is None for item in FAKE.queue.values()),
+        "lastBuild": _build_summary(base, job, last, now) if last else None,
+        "lastCompletedBuild": _build_summary(base, job, completed, now) if completed else None,
+        "lastSuccessfulBuild": _build_summary(base, job, success, now) if success else None,
+        "lastFailedBuild": _build_summary(base, job, failed, now) if failed else None,
+        "healthReport": [{"score": score, "description": f"Build stability: {100 - score} % failed recently."}],
+    })
+    return entry
+
+
+_RANGE = re.compile(r"(allBuilds|builds)\[[^\]]*\]\{(\d+),(\d+)\}")
+
+
+def _builds_range(tree: str) -> Tuple[str, int, Optional[int]]:
+    """tree 中请求的构建列表字段（builds 或 allBuilds）和区间"""
+    match = _RANGE.search(tree)
+    if match:
+        return match.group(1), int(match.group(2)), int(match.group(3))
+    return "builds", 0, None
+
+
+@lru_cache(maxsize=512)
+def _log_text(job_name: str, number: int, lines: int) -> bytes:
+    """确定性生成的构建日志，约 100 字节一行，每 50 行一个 WARNING，每 400 行一个 ERROR"""
+    out = []
+    for i in range(lines):
+        level = "ERROR" if i % 400 == 399 else "WARNING" if i % 50 == 49 else "INFO"
+        out.append(f"[{i:06d}] {level} {job_name} #{number} step {i % 37}: synthetic output {_LINE_PADDING}\n")
+    return "".join(out).encode("utf-8")
+
+
+def _visible_log(job: FakeJob, build: FakeBuild, now: float) -> bytes:
+    """运行中的构建只返回按进度已经"输出"的部分"""
+    lines = FAKE.config.log_lines
+    if build.building(now):
+        lines = int(lines * build.progress(now))
+    return _log_text(job.full_name, build.number, lines)
+
+
+# ----------------------------------------------------------------------
+# 路由
+# ----------------------------------------------------------------------
+
+FAKE = FakeJenkins(FakeConfig.from_env())
+
+_JOB_PATH = re.compile(r"^/((?:job/[^/]+/)+)(.*)$")
+
+
+def _split_job_path(path: str) -> Optional[Tuple[str, str]]:
+    """/job/a/job/b/12/api/json -> ("a/b", "12/api/json")"""
+    match = _JOB_PATH.match(path)
+    if not match:
+        return None
+    parts = [unquote(p) for p in match.group(1).split("/") if p and p != "job"]
+    return "/".join(parts), match.group(2)
+
+
+def _not_found() -> Response:
+    return Response(status_code=404, headers=_HEADERS)
+
+
+def _json(data: Any) -> JSONResponse:
+    return JSONResponse(data, headers=_HEADERS)
+
+
+def _root(request: Request, folder: Optional[str] = None) -> Response:
+    now = time.time()
+    base = _base_url(request)
+    tree = request.query_params.get("tree", "")
+    if tree == "mode":
+        return _json({"_class": "hudson.model.Hudson", "mode": "NORMAL"})
+    detailed = "lastBuild" in tree or request.query_params.get("depth") not in (None, "0")
+    prefix = f"{folder}/" if folder else ""
+    entries: List[Dict[str, Any]] = []
+    if not folder:
+        for name in FAKE.folders():
+            entries.append({"_class": "com.cloudbees.hudson.plugins.folder.Folder", "name": name, "fullName": name, "url": _job_url(base, name)})
+    for full_name, job in FAKE.jobs.items():
+        if full_name.startswith(prefix) and "/" not in full_name[len(prefix):]:
+            entries.append(_job_entry(base, job, now, detailed))
+    body: Dict[str, Any] = {"jobs": entries}
+    if not folder:
+        body.update({"_class": "hudson.model.Hudson", "mode": "NORMAL", "nodeDescription": "fake controller", "numExecutors": 2})
+    else:
+        body.update({"_class": "com.cloudbees.hudson.plugins.folder.Folder", "name": folder.rpartition("/")[2], "fullName": folder})
+    return _json(body)
+
+
+def _job_info(request: Request, job: FakeJob) -> Response:
+    now = time.time()
+    base = _base_url(request)
+    field_name, start, end = _builds_range(request.query_params.get("tree", ""))
+    numbers = sorted(job.builds, reverse=True)[start:end]
+    info = _job_entry(base, job, now, detailed=True)
+    info.update({
+        field_name: [_build_summary(base, job, job.builds[n], now) for n in numbers],
+        "nextBuildNumber": (max(job.builds) if job.builds else 0) + 1,
+        "property": [{
+            "_class": "hudson.model.ParametersDefinitionProperty",
+            "parameterDefinitions": [
+                {"name": "BRANCH", "type": "StringParameterDefinition", "description": "分支",
+                 "defaultParameterValue": {"name": "BRANCH", "value": "main"}},
+                {"name": "ENV", "type": "ChoiceParameterDefinition", "description": "环境",
+                 "defaultParameterValue": {"name": "ENV", "value": "dev"}, "choices": ["dev", "staging", "prod"]},
+            ],
+        }],
+    })
+    return _json(info)
+
+
+def _build_response(request: Request, job: FakeJob, build: FakeBuild, rest: str) -> Response:
+    now = time.time()
+    if rest == "api/json":
+        FAKE.requests["build_info"] += 1
+        info = _build_summary(_base_url(request), job, build, now)
+        info.update({"estimatedDuration": int(build.duration * 1000), "fullDisplayName": f"{job.full_name} #{build.number}", "actions": []})
+        return _json(info)
+    if rest == "consoleText":
+        FAKE.requests["console"] += 1
+        return Response(_visible_log(job, build, now), media_type="text/plain; charset=utf-8", headers=_HEADERS)
+    if rest == "logText/progressiveText":
+        FAKE.requests["console_progressive"] += 1
+        text = _visible_log(job, build, now)
+        start = int(request.query_params.get("start", 0))
+        return Response(
+            text[start:],
+            media_type="text/plain; charset=utf-8",
+            headers={**_HEADERS, "X-Text-Size": str(len(text)), "X-More-Data": "true" if build.building(now) else "false"},
+        )
+    if rest == "wfapi/describe":
+        FAKE.requests["wfapi"] += 1
+        progress = build.progress(now)
+        stages = []
+        for i, stage in enumerate(_STAGES):
+            done = (i + 1) / len(_STAGES) <= progress
+            current = not done and i / len(_STAGES) <= progress
+            status = "SUCCESS" if done else "IN_PROGRESS" if current else "NOT_EXECUTED"
+            if done and i == len(_STAGES) - 1 and build.current_result(now) == "FAILURE":
+                status = "FAILED"
+            stages.append({"id": str(i + 6), "name": stage, "status": status,
+                           "startTimeMillis": int((build.started + build.duration * i / len(_STAGES)) * 1000),
+                           "durationMillis": int(build.duration / len(_STAGES) * 1000)})
+        return _json({"id": str(build.number), "name": f"#{build.number}", "status": build.current_result(now) or "IN_PROGRESS",
+                      "startTimeMillis": int(build.started * 1000), "durationMillis": int(build.elapsed(now) * 1000), "stages": stages})
+    if rest == "wfapi/log":
+        FAKE.requests["wfapi"] += 1
+        text = _visible_log(job, build, now)[-4096:].decode("utf-8", errors="replace")
+        return _json({"nodeId": "1", "nodeStatus": "SUCCESS", "length": len(text), "hasMore": build.building(now), "text": text})
+    return _not_found()
+
+
+async def _job_route(request: Request) -> Response:
+    split = _split_job_path(request.url.path)
+    if split is None:
+        return _not_found()
+    name, rest = split
+    job = FAKE.jobs.get(name)
+    if job is None:
+        if name in FAKE.folders() and rest == "api/json":
+            FAKE.requests["folder"] += 1
+            return _root(request, folder=name)
+        return _not_found()
+
+    if request.method == "POST":
+        return await _job_write(request, job, rest)
+    if rest == "api/json":
+        FAKE.requests["job_info"] += 1
+        return _job_info(request, job)
+    number, _, build_rest = rest.partition("/")
+    if number == "lastBuild":
+        build = job.last()
+    elif number.isdigit():
+        build = job.builds.get(int(number))
+    else:
+        return _not_found()
+    if build is None:
+        return _not_found()
+    return _build_response(request, job, build, build_rest)
+
+
+async def _job_write(request: Request, job: FakeJob, rest: str) -> Response:
+    FAKE.requests["write"] += 1
+    if rest in ("build", "buildWithParameters"):
+        if job.disabled:
+            return Response(status_code=409, headers=_HEADERS)
+        form = await request.form() if rest == "buildWithParameters" else {}
+        item = FAKE.enqueue(job.full_name, {k: str(v) for k, v in dict(form).items()})
+        return Response(status_code=201, headers={**_HEADERS, "Location": f"{_base_url(request)}/queue/item/{item.id}/"})
+    if rest in ("enable", "disable"):
+        job.disabled = rest == "disable"
+        return Response(status_code=200, headers=_HEADERS)
+    if rest == "doDelete":
+        del FAKE.jobs[job.full_name]
+        return Response(status_code=200, headers=_HEADERS)
+    number, _, action = rest.partition("/")
+    if action == "stop" and number.isdigit() and int(number) in job.builds:
+        build = job.builds[int(number)]
+        if build.building(time.time()):
+            build.aborted_at = time.time()
+        return Response(status_code=200, headers=_HEADERS)
+    return _not_found()
+
+
+async def root_api(request: Request) -> Response:
+    FAKE.requests["root"] += 1
+    return _root(request)
+
+
+async def queue_api(request: Request) -> Response:
+    FAKE.requests["queue"] += 1
+    base = _base_url(request)
+    items = [
+        {
+            "id": item.id,
+            "inQueueSince": int(item.queued_at * 1000),
+            "why": "Waiting for next available executor",
+            "blocked": False,
+            "buildable": True,
+            "stuck": False,
+            "params": "".join(f"\n{k}={v}" for k, v in item.parameters.items()),
+            "task": {"name": item.job.rpartition("/")[2], "url": _job_url(base, item.job), "color": "blue"},
+        }
+        for item in FAKE.queue.values()
+        if item.build_number is None and not item.cancelled
+    ]
+    return _json({"_class": "hudson.model.Queue", "items": items})
+
+
+async def queue_item_api(request: Request) -> Response:
+    FAKE.requests["queue_item"] += 1
+    item = FAKE.queue.get(int(request.path_params["queue_id"]))
+    if item is None:
+        return _not_found()
+    base = _base_url(request)
+    body: Dict[str, Any] = {
+        "id": item.id,
+        "cancelled": item.cancelled,
+        "why": None if item.build_number else "Waiting for next available executor",
+        "task": {"name": item.job.rpartition("/")[2], "url": _job_url(base, item.job)},
+        "executable": None,
+    }
+    if item.build_number is not None:
+        body["executable"] = {"number": item.build_number, "url": f"{_job_url(base, item.job)}{item.build_number}/"}
+    return _json(body)
+
+
+def _running(now: float) -> List[Tuple[FakeJob, FakeBuild]]:
+    return [(job, build) for job in FAKE.jobs.values() for build in [job.last()] if build is not None and build.building(now)]
+
+
+async def computer_api(request: Request) -> Response:
+    FAKE.requests["computer"] += 1
+    now = time.time()
+    base = _base_url(request)
+    running = _running(now)
+    names = ["built-in"] + [f"agent-{i:02d}" for i in range(FAKE.config.nodes)]
+    computers = []
+    for index, name in enumerate(names):
+        assigned = running[index::len(names)]
+        executors = [
+            {"currentExecutable": {
+                "number": build.number,
+                "url": f"{_job_url(base, job.full_name)}{build.number}/",
+                "fullDisplayName": f"{job.full_name} #{build.number}",
+                "timestamp": int(build.started * 1000),
+                "estimatedDuration": int(build.duration * 1000),
+            }}
+            for job, build in assigned
+        ]
+        computers.append({
+            "_class": "hudson.slaves.SlaveComputer" if index else "hudson.model.Hudson$MasterComputer",
+            "displayName": name,
+            "description": "synthetic build agent",
+            "idle": not executors,
+            "offline": False,
+            "offlineCauseReason": "",
+            "temporarilyOffline": False,
+            "numExecutors": max(len(executors), 2),
+            "jnlpAgent": bool(index),
+            "assignedLabels": [{"name": name}, {"name": "linux"}],
+            "executors": executors,
+            "oneOffExecutors": [],
+        })
+    busy = len(running)
+    return _json({"busyExecutors": busy, "totalExecutors": sum(c["numExecutors"] for c in computers), "computer": computers})
+
+
+async def node_api(request: Request) -> Response:
+    FAKE.requests["node"] += 1
+    return _json({"displayName": request.path_params["name"], "offline": False, "idle": True, "numExecutors": 2})
+
+
+async def node_toggle(request: Request) -> Response:
+    FAKE.requests["write"] += 1
+    return Response(status_code=200, headers=_HEADERS)
+
+
+async def plugins_api(request: Request) -> Response:
+    FAKE.requests["plugins"] += 1
+    return _json({"plugins": [
+        {"shortName": f"plugin-{i:03d}", "longName": f"Synthetic Plugin {i}", "version": f"1.{i % 10}.{i % 7}",
+         "active": True, "enabled": True, "hasUpdate": i % 9 == 0, "pinned": False, "bundled": i % 4 == 0,
+         "url": f"https://plugins.jenkins.io/plugin-{i:03d}"}
+        for i in range(FAKE.config.plugins)
+    ]})
+
+
+async def people_api(request: Request) -> Response:
+    FAKE.requests["people"] += 1
+    return _json({"users": [
+        {"lastChange": int(FAKE.started * 1000), "project": None,
+         "user": {"id": f"user{i}", "fullName": f"User {i}", "absoluteUrl": f"{_base_url(request)}/user/user{i}"}}
+        for i in range(20)
+    ]})
+
+
+async def me_api(request: Request) -> Response:
+    FAKE.requests["me"] += 1
+    return _json({"id": "admin", "fullName": "Administrator", "absoluteUrl": f"{_base_url(request)}/user/admin"})
+
+
+async def crumb_api(request: Request) -> Response:
+    FAKE.requests["crumb"] += 1
+    return _json({"crumb": "fake-crumb", "crumbRequestField": "Jenkins-Crumb"})
+
+
+async def system_info(request: Request) -> Response:
+    FAKE.requests["system_info"] += 1
+    rows = "".join(f"<tr><td>prop.{i}</td><td>value-{i}</td></tr>" for i in range(200))
+    return Response(f"<html><body><table>{rows}</table></body></html>", media_type="text/html", headers=_HEADERS)
+
+
+async def create_item(request: Request) -> Response:
+    FAKE.requests["write"] += 1
+    name = request.query_params.get("name")
+    if not name or name in FAKE.jobs:
+        return Response(status_code=400, headers=_HEADERS)
+    FAKE.jobs[name] = FakeJob(name)
+    return Response(status_code=200, headers=_HEADERS)
+
+
+async def fake_stats(request: Request) -> Response:
+    return JSONResponse({"requests": dict(FAKE.requests), "total": sum(FAKE.requests.values()),
+                         "jobs": len(FAKE.jobs), "queue": len(FAKE.queue)})
+
+
+async def fake_reset(request: Request) -> Response:
+    FAKE.requests.clear()
+    return JSONResponse({"status": "ok"})
+
+
+class _LatencyMiddleware:
+    """推进队列状态并注入延迟（/_fake/ 控制接口除外）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith("/_fake/"):
+            FAKE.advance(time.time())
+            delay = FAKE.config.latency_ms + FAKE.rng.uniform(0, FAKE.config.jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+        await self.app(scope, receive, send)
+
+
+routes = [
+    Route("/api/json", root_api),
+    Route("/queue/api/json", queue_api),
+    Route("/queue/item/{queue_id:int}/api/json", queue_item_api),
+    Route("/computer/api/json", computer_api),
+    Route("/computer/{name}/api/json", node_api),
+    Route("/computer/{name}/toggleOffline", node_toggle, methods=["POST"]),
+    Route("/pluginManager/api/json", plugins_api),
+    Route("/people/api/json", people_api),
+    Route("/asynchPeople/api/json", people_api),
+    Route("/me/api/json", me_api),
+    Route("/crumbIssuer/api/json", crumb_api),
+    Route("/systemInfo", system_info),
+    Route("/createItem", create_item, methods=["POST"]),
+    Route("/job/{path:path}", _job_route, methods=["GET", "POST"]),
+    Route("/_fake/stats", fake_stats),
+    Route("/_fake/reset", fake_reset, methods=["POST"]),
+]
+
+app = Starlette(routes=routes)
+app.add_middleware(_LatencyMiddleware)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="模拟 Jenkins 控制器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
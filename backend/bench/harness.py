@@ -0,0 +1,214 @@
+"""
+压测进程管理
+
+在本地端口上分别启动模拟 Jenkins 和后端（各自独立的 uvicorn 进程），后端使用临时目录中的
+构建历史数据库和日志存储，互不影响开发环境的 data/ 目录。
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class FakeJenkinsOptions:
+    jobs: int = 200
+    folders: int = 0
+    history: int = 50
+    log_lines: int = 2000
+    running_every: int = 10
+    build_duration: float = 60.0
+    queue_delay: float = 2.0
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+
+    def env(self) -> Dict[str, str]:
+        return {
+            "FAKE_JENKINS_JOBS": str(self.jobs),
+            "FAKE_JENKINS_FOLDERS": str(self.folders),
+            "FAKE_JENKINS_HISTORY": str(self.history),
+            "FAKE_JENKINS_LOG_LINES": str(self.log_lines),
+            "FAKE_JENKINS_RUNNING_EVERY": str(self.running_every),
+            "FAKE_JENKINS_BUILD_DURATION": str(self.build_duration),
+            "FAKE_JENKINS_QUEUE_DELAY": str(self.queue_delay),
+            "FAKE_JENKINS_LATENCY_MS": str(self.latency_ms),
+            "FAKE_JENKINS_JITTER_MS": str(self.jitter_ms),
+        }
+
+
+def fake_job_name(index: int, folders: int) -> str:
+    """模拟 Jenkins 中第 index 个任务的全名：每 folders+1 个任务中第一个留在根目录，其余依次放入各文件夹"""
+    slot = index % (folders + 1)
+    return f"job-{index:05d}" if slot == 0 else f"folder-{slot - 1:03d}/job-{index:05d}"
+
+
+def top_level_jobs(args, count: int) -> List[str]:
+    """前 count 个根目录下的任务名
+
+    后端的任务和构建接口把 {job_name} 当作单个路径段，文件夹中的任务（a/b）无法通过路径参数访问，
+    压测只能选根目录下的任务；一个都没有时直接报错，而不是把 404 当成接口耗时。
+    """
+    names = [fake_job_name(i, args.folders) for i in range(0, args.jobs, args.folders + 1)][:count]
+    if not names:
+        raise SystemExit(f"--jobs {args.jobs} --folders {args.folders} 下根目录没有任务，无法填充 job_name 路径参数")
+    return names
+
+
+def add_fake_arguments(parser) -> None:
+    """模拟 Jenkins 的规模和延迟参数（基准测试和负载回放共用）"""
+    group = parser.add_argument_group("模拟 Jenkins")
+    group.add_argument("--jenkins-url", help="使用已有的 Jenkins（或模拟 Jenkins），不再启动模拟进程")
+    group.add_argument("--fake-port", type=int, default=18080)
+    group.add_argument("--jobs", type=int, default=FakeJenkinsOptions.jobs, help="任务数")
+    group.add_argument("--folders", type=int, default=FakeJenkinsOptions.folders, help="文件夹数，每 N+1 个任务中有一个留在根目录")
+    group.add_argument("--history", type=int, default=FakeJenkinsOptions.history, help="每个任务的历史构建数")
+    group.add_argument("--log-lines", type=int, default=FakeJenkinsOptions.log_lines, help="每个构建的日志行数")
+    group.add_argument("--running-every", type=int, default=FakeJenkinsOptions.running_every, help="每隔多少个任务有一个运行中的构建")
+    group.add_argument("--build-duration", type=float, default=FakeJenkinsOptions.build_duration, help="新构建的持续时间（秒）")
+    group.add_argument("--queue-delay", type=float, default=FakeJenkinsOptions.queue_delay, help="触发后在队列中的等待时间（秒）")
+    group.add_argument("--latency-ms", type=float, default=FakeJenkinsOptions.latency_ms, help="每个 Jenkins 请求注入的延迟（毫秒）")
+    group.add_argument("--jitter-ms", type=float, default=FakeJenkinsOptions.jitter_ms, help="叠加的随机延迟上限（毫秒）")
+
+    group = parser.add_argument_group("后端")
+    group.add_argument("--backend-url", help="压测已运行的后端，不再启动后端进程")
+    group.add_argument("--backend-port", type=int, default=18000)
+    group.add_argument("--backend-env", action="append", default=[], metavar="KEY=VALUE", help="传给后端进程的额外环境变量")
+
+
+def fake_options(args) -> FakeJenkinsOptions:
+    return FakeJenkinsOptions(
+        jobs=args.jobs,
+        folders=args.folders,
+        history=args.history,
+        log_lines=args.log_lines,
+        running_every=args.running_every,
+        build_duration=args.build_duration,
+        queue_delay=args.queue_delay,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+    )
+
+
+@dataclass
+class Stack:
+    """压测环境：模拟 Jenkins 与后端的地址和进程，fake 表示 Jenkins 是本工具启动的模拟进程（提供 /_fake/stats）"""
+
+    jenkins_url: str
+    backend_url: str
+    fake: bool = False
+    backend_pid: Optional[int] = None
+    processes: List[subprocess.Popen] = field(default_factory=list)
+    workdir: Optional[str] = None
+
+    def close(self) -> None:
+        for process in reversed(self.processes):
+            process.terminate()
+        for process in reversed(self.processes):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def __enter__(self) -> "Stack":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _spawn(args: List[str], env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    log = open(log_path, "wb")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *args],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def wait_until_ready(url: str, process: Optional[subprocess.Popen] = None, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"进程已退出（exit {process.returncode}）: {url}")
+        try:
+            if httpx.get(url, timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{timeout} 秒内未就绪: {url}")
+
+
+def start_stack(args) -> Stack:
+    """按命令行参数启动（或复用）模拟 Jenkins 和后端，返回后等待两者都就绪"""
+    workdir = tempfile.mkdtemp(prefix="jenkins-admin-bench-")
+    stack = Stack(jenkins_url=args.jenkins_url or f"http://127.0.0.1:{args.fake_port}", backend_url="", workdir=workdir)
+    try:
+        if not args.jenkins_url:
+            fake = _spawn(
+                ["bench.fake_jenkins:app", "--port", str(args.fake_port), "--log-level", "warning"],
+                fake_options(args).env(),
+                os.path.join(workdir, "fake_jenkins.log"),
+            )
+            stack.processes.append(fake)
+            stack.fake = True
+            wait_until_ready(f"{stack.jenkins_url}/_fake/stats", fake)
+
+        if args.backend_url:
+            stack.backend_url = args.backend_url.rstrip("/")
+        else:
+            env = {
+                "JENKINS_URL": stack.jenkins_url,
+                "HISTORY_DB_PATH": os.path.join(workdir, "build_history.db"),
+                "LOG_STORE_DIR": os.path.join(workdir, "build_logs"),
+                "LOG_LEVEL": "WARNING",
+            }
+            env.update(item.split("=", 1) for item in args.backend_env)
+            backend = _spawn(
+                ["app.main:app", "--port", str(args.backend_port), "--log-level", "warning", "--no-access-log"],
+                env,
+                os.path.join(workdir, "backend.log"),
+            )
+            stack.processes.append(backend)
+            stack.backend_url = f"http://127.0.0.1:{args.backend_port}"
+            stack.backend_pid = backend.pid
+        wait_until_ready(f"{stack.backend_url}/health/readiness", timeout=60.0)
+    except BaseException:
+        stack.close()
+        raise
+    return stack
+
+
+def fake_request_counts(stack: Stack) -> Optional[Dict[str, int]]:
+    """模拟 Jenkins 自启动以来按操作分类的请求数；使用外部 Jenkins 时返回 None"""
+    if not stack.fake:
+        return None
+    return httpx.get(f"{stack.jenkins_url}/_fake/stats", timeout=5.0).json()["requests"]
+
+
+
+def process_rss_bytes(pid: Optional[int]) -> Optional[int]:
+    """进程常驻内存（读取 /proc，仅 Linux）"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+仪表盘轮询负载回放
+
+按前端 use-jenkins-pro hook 的请求节奏模拟 K 个同时打开的浏览器标签页，压测后端：
+
+  - 打开页面：服务器信息、任务列表第一页、构建历史
+  - 每 30 秒：刷新构建队列和构建历史
+  - 触发构建后每 3 秒查询一次任务详情（depth=2），直到 lastBuild 变为新的构建号（最多 20 次）
+  - 找到构建号后每 2 秒查询一次构建状态和完整控制台输出，直到构建结束（最多 5 分钟）
+  - 构建结束后等待 --think-time 秒，再选一个任务触发下一次构建
+
+与浏览器的 setInterval 一致，定时请求按固定节拍发出，上一轮未返回时下一轮照常发出。
+--hunt wait 改用后端的队列长轮询接口代替 3 秒轮询，便于对比两种方式的上游放大倍数。
+
+    cd backend
+    python -m bench.replay_dashboard --sessions 50 --duration 120
+    python -m bench.replay_dashboard --sessions 200 --latency-ms 30 --build-duration 20 --json replay.json
+
+输出后端延迟 p50/p99（整体及按请求类型，只统计成功响应，整体不含队列长轮询）、上游放大倍数（模拟 Jenkins 收到的请求数 / 后端收到的请求数，
+包含后端自身的后台同步请求）以及后端进程的内存增长。
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.services.health_prober import percentile
+from bench.harness import Stack, add_fake_arguments, fake_request_counts, process_rss_bytes, start_stack, top_level_jobs
+
+JOBS_PAGE_SIZE = 50
+REFRESH_INTERVAL = 30.0
+HUNT_INTERVAL = 3.0
+HUNT_MAX_ATTEMPTS = 20
+MONITOR_INTERVAL = 2.0
+MONITOR_MAX_SECONDS = 300.0
+# 长轮询请求的耗时是等待构建开始的时间，不计入整体延迟
+LONG_POLL_KINDS = ("wait",)
+
+
+@dataclass
+class Recorder:
+    """按请求类型记录请求数、后端延迟和错误数，延迟只统计成功响应"""
+
+    counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    builds_started: int = 0
+    builds_finished: int = 0
+    hunts_failed: int = 0
+
+    @property
+    def requests(self) -> int:
+        return sum(self.counts.values())
+
+    async def request(self, client: httpx.AsyncClient, kind: str, method: str, url: str, **kwargs) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+            body = response.json() if ok else None
+        except (httpx.HTTPError, ValueError):
+            ok, body = False, None
+        self.counts[kind] += 1
+        if ok:
+            self.latencies[kind].append(time.perf_counter() - started)
+        else:
+            self.errors[kind] += 1
+        return body
+
+
+def _latency_summary(values: List[float]) -> Dict[str, Any]:
+    values = sorted(values)
+    return {
+        "samples": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2) if values else None,
+        "p99_ms": round(percentile(values, 99) * 1000, 2) if values else None,
+        "max_ms": round(values[-1] * 1000, 2) if values else None,
+    }
+
+
+class Ticker:
+    """模拟 setInterval：每 interval 秒启动一次 callback，不等待上一次完成；callback 返回 True 时停止"""
+
+    def __init__(self, interval: float, callback: Callable[[], Awaitable[bool]]):
+        self.interval = interval
+        self.callback = callback
+        self.done = asyncio.Event()
+        self._pending: set = set()
+
+    async def _tick(self) -> None:
+        if await self.callback():
+            self.done.set()
+
+    async def run(self, max_seconds: Optional[float] = None) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_seconds if max_seconds else None
+        next_tick = loop.time() + self.interval
+        try:
+            while not self.done.is_set():
+                try:
+                    await asyncio.wait_for(self.done.wait(), max(next_tick - loop.time(), 0))
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                if deadline is not None and loop.time() >= deadline:
+                    break
+                task = asyncio.create_task(self._tick())
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+                next_tick += self.interval
+        finally:
+            for task in list(self._pending):
+                task.cancel()
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+class DashboardSession:
+    """一个浏览器标签页"""
+
+    def __init__(self, index: int, client: httpx.AsyncClient, recorder: Recorder, jobs: List[str], args):
+        self.index = index
+        self.client = client
+        self.recorder = recorder
+        self.jobs = jobs
+        self.args = args
+        self.rng = random.Random(args.seed + index)
+
+    async def get(self, kind: str, url: str, **params) -> Optional[Dict[str, Any]]:
+        return await self.recorder.request(self.client, kind, "GET", url, params=params or None)
+
+    async def refresh(self) -> bool:
+        await asyncio.gather(
+            self.get("queue", "/jenkins-pro/queue"),
+            self.get("history", "/jenkins-pro/history", building="false", page_size=20),
+        )
+        return False
+
+    async def last_build_number(self, job: str) -> Optional[int]:
+        body = await self.get("hunt", f"/jenkins/job/{job}", depth=2)
+        last = ((body or {}).get("data") or {}).get("lastBuild") or {}
+        return last.get("number")
+
+    async def hunt(self, job: str, baseline: Optional[int], queue_id: Optional[int]) -> Optional[int]:
+        """触发后找到新构建号"""
+        if self.args.hunt == "wait":
+            if queue_id is None:
+                return None
+            body = await self.get("wait", f"/jenkins-pro/queue/item/{queue_id}/build", job_name=job, timeout=60)
+            data = (body or {}).get("data") or {}
+            return data.get("build_number") if data.get("status") == "started" else None
+
+        found: Dict[str, int] = {}
+        attempts = 0
+
+        async def attempt() -> bool:
+            nonlocal attempts
+            attempts += 1
+            number = await self.last_build_number(job)
+            if number is not None and (baseline is None or number > baseline):
+                found.setdefault("number", number)
+                return True
+            return attempts >= HUNT_MAX_ATTEMPTS
+
+        await Ticker(HUNT_INTERVAL, attempt).run()
+        return found.get("number")
+
+    async def monitor(self, job: str, number: int) -> None:
+        """构建运行期间每 2 秒查询状态和完整控制台输出"""
+
+        async def poll() -> bool:
+            status = await self.get("status", f"/jenkins/build/{job}/{number}/status")
+            await self.get("console", f"/jenkins/build/{job}/{number}/console")
+            data = (status or {}).get("data") or {}
+            return bool(data) and not data.get("building", True)
+
+        await Ticker(MONITOR_INTERVAL, poll).run(MONITOR_MAX_SECONDS)
+
+    async def build_cycle(self) -> None:
+        job = self.rng.choice(self.jobs)
+        baseline = await self.last_build_number(job) if self.args.hunt == "poll" else None
+        body = await self.recorder.request(self.client, "trigger", "POST", f"/jenkins/build/{job}", json={"parameters": {}})
+        queue_id = ((body or {}).get("data") or {}).get("queue_id")
+        number = await self.hunt(job, baseline, queue_id)
+        if number is None:
+            self.recorder.hunts_failed += 1
+            return
+        self.recorder.builds_started += 1
+        await self.monitor(job, number)
+        self.recorder.builds_finished += 1
+
+    async def run(self) -> None:
+        await asyncio.sleep(self.rng.uniform(0, self.args.ramp_up))
+        await asyncio.gather(
+            self.get("info", "/jenkins/info"),
+            self.get("jobs", "/jenkins/jobs", limit=JOBS_PAGE_SIZE),
+            self.get("history", "/jenkins-pro/history", building="false", page_size=20),
+        )
+        refresher = asyncio.create_task(Ticker(REFRESH_INTERVAL, self.refresh).run())
+        try:
+            while True:
+                await self.build_cycle()
+                await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.args.think_time)
+        finally:
+            refresher.cancel()
+            await asyncio.gather(refresher, return_exceptions=True)
+
+
+async def sample_memory(pid: Optional[int], interval: float, samples: List[Any], started: float) -> None:
+    while True:
+        rss = process_rss_bytes(pid)
+        if rss is not None:
+            samples.append((round(time.monotonic() - started, 1), rss))
+        await asyncio.sleep(interval)
+
+
+def _job_names(args) -> List[str]:
+    # 任务详情、触发和构建接口的 {job_name} 是单个路径段，只能选根目录下的任务
+    return top_level_jobs(args, args.job_pool or args.sessions)
+
+
+async def run(args) -> Dict[str, Any]:
+    with start_stack(args) as stack:
+        pid = args.backend_pid or stack.backend_pid
+        recorder = Recorder()
+        memory: List[Any] = []
+        async with httpx.AsyncClient(
+            base_url=stack.backend_url,
+            timeout=120.0,
+            limits=httpx.Limits(max_connections=args.sessions * 4, max_keepalive_connections=args.sessions * 4),
+        ) as client:
+            jobs = _job_names(args)
+            upstream_before = fake_request_counts(stack)
+            started = time.monotonic()
+            sampler = asyncio.create_task(sample_memory(pid, args.memory_interval, memory, started))
+            sessions = [asyncio.create_task(DashboardSession(i, client, recorder, jobs, args).run()) for i in range(args.sessions)]
+            await asyncio.sleep(args.duration)
+            elapsed = time.monotonic() - started
+            for task in sessions:
+                task.cancel()
+            await asyncio.gather(*sessions, return_exceptions=True)
+            upstream_after = fake_request_counts(stack)
+            sampler.cancel()
+            await asyncio.gather(sampler, return_exceptions=True)
+            rss = process_rss_bytes(pid)
+            if rss is not None:
+                memory.append((round(time.monotonic() - started, 1), rss))
+
+        return report(args, stack, recorder, elapsed, upstream_before, upstream_after, memory)
+
+
+def report(args, stack: Stack, recorder: Recorder, elapsed: float, before, after, memory) -> Dict[str, Any]:
+    all_latencies = [v for kind, values in recorder.latencies.items() if kind not in LONG_POLL_KINDS for v in values]
+    result: Dict[str, Any] = {
+        "sessions": args.sessions,
+        "duration_seconds": round(elapsed, 1),
+        "hunt": args.hunt,
+        "requests": recorder.requests,
+        "errors": sum(recorder.errors.values()),
+        "rps": round(recorder.requests / elapsed, 1) if elapsed else None,
+        "latency": _latency_summary(all_latencies),
+        "by_kind": {
+            kind: {**_latency_summary(recorder.latencies.get(kind, [])), "requests": count, "errors": recorder.errors.get(kind, 0)}
+            for kind, count in sorted(recorder.counts.items())
+        },
+        "builds": {"started": recorder.builds_started, "finished": recorder.builds_finished, "hunts_failed": recorder.hunts_failed},
+    }
+    if before is not None and after is not None:
+        delta = {op: after.get(op, 0) - before.get(op, 0) for op in after}
+        upstream = sum(delta.values())
+        result["upstream"] = {
+            "requests": upstream,
+            "per_client_request": round(upstream / recorder.requests, 3) if recorder.requests else None,
+            "by_operation": {op: count for op, count in sorted(delta.items()) if count},
+        }
+    if memory:
+        values = [rss for _, rss in memory]
+        result["memory"] = {
+            "start_bytes": values[0],
+            "end_bytes": values[-1],
+            "peak_bytes": max(values),
+            "growth_bytes": values[-1] - values[0],
+            "samples": memory,
+        }
+    return result
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    mb = 1024 * 1024
+    print(f"会话 {result['sessions']}，时长 {result['duration_seconds']} 秒，构建号查找方式 {result['hunt']}")
+    print(f"后端请求 {result['requests']}（{result['rps']} rps），错误 {result['errors']}")
+    latency = result["latency"]
+    print(f"后端延迟 p50 {latency['p50_ms']} ms, p99 {latency['p99_ms']} ms, max {latency['max_ms']} ms")
+    print(f"\n{'kind':<10} {'req':>7} {'err':>5} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for kind, s in result["by_kind"].items():
+        print(f"{kind:<10} {s['requests']:>7} {s['errors']:>5} {s['p50_ms'] or 0:>9.2f} {s['p99_ms'] or 0:>9.2f} {s['max_ms'] or 0:>9.2f}")
+    builds = result["builds"]
+    print(f"\n构建 开始 {builds['started']}，监控到结束 {builds['finished']}，未找到构建号 {builds['hunts_failed']}")
+    upstream = result.get("upstream")
+    if upstream:
+        print(f"上游请求 {upstream['requests']}，放大倍数 {upstream['per_client_request']}（Jenkins 请求 / 后端请求）")
+        for op, count in upstream["by_operation"].items():
+            print(f"  {op:<22} {count:>7}")
+    memory = result.get("memory")
+    if memory:
+        print(
+            f"后端内存 {memory['start_bytes'] / mb:.1f} MB -> {memory['end_bytes'] / mb:.1f} MB"
+            f"（峰值 {memory['peak_bytes'] / mb:.1f} MB，增长 {memory['growth_bytes'] / mb:+.1f} MB）"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="仪表盘轮询负载回放（模拟 Jenkins）")
+    add_fake_arguments(parser)
+    parser.set_defaults(build_duration=30.0)
+    group = parser.add_argument_group("回放")
+    group.add_argument("-k", "--sessions", type=int, default=20, help="同时打开的浏览器标签页数")
+    group.add_argument("-d", "--duration", type=float, default=120.0, help="回放时长（秒）")
+    group.add_argument("--ramp-up", type=float, default=10.0, help="各会话在该时间内随机错开启动（秒）")
+    group.add_argument("--think-time", type=float, default=10.0, help="构建结束到触发下一次构建的平均间隔（秒）")
+    group.add_argument("--job-pool", type=int, help="会话从前 N 个任务中随机选择触发，默认等于会话数")
+    group.add_argument("--hunt", choices=("poll", "wait"), default="poll", help="poll: 每 3 秒查询任务详情；wait: 队列长轮询接口")
+    group.add_argument("--memory-interval", type=float, default=5.0, help="后端内存采样间隔（秒）")
+    group.add_argument("--backend-pid", type=int, help="配合 --backend-url 指定后端进程号以采样内存")
+    group.add_argument("--seed", type=int, default=0)
+    group.add_argument("--json", dest="json_path", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "result": result}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
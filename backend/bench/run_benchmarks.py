@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+后端接口基准测试
+
+启动模拟 Jenkins（bench/fake_jenkins.py）和后端，从后端的 OpenAPI 文档中枚举所有 GET 接口，
+逐个以固定并发压测，输出吞吐量、p50/p99/最大延迟（只统计成功响应，错误响应单独计数），以及每个后端请求平均触发的 Jenkins 请求数。
+
+    cd backend
+    python -m bench.run_benchmarks                                   # 默认规模
+    python -m bench.run_benchmarks --jobs 2000 --latency-ms 50 -c 32  # 大实例 + 慢 Jenkins
+    python -m bench.run_benchmarks --include console --json out.json  # 只测日志相关接口
+
+只压测只读接口：写接口（触发、停止、删除等）会改变模拟 Jenkins 的状态，影响后续接口的结果。
+SSE 事件流和等待队列项开始构建的长轮询接口耗时取决于构建进度而非后端性能，列为跳过。
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.services.health_prober import percentile
+from bench.harness import Stack, add_fake_arguments, fake_request_counts, start_stack, top_level_jobs
+
+# 不压测的接口及原因
+SKIPPED = (
+    (re.compile(r"/stream$"), "SSE 事件流"),
+    (re.compile(r"/queue/item/\{queue_id\}/build$"), "长轮询，需要先触发构建"),
+    (re.compile(r"^/metrics$"), "Prometheus 抓取接口"),
+)
+
+# 必填查询参数的取值
+REQUIRED_QUERY = {
+    "pattern": "ERROR",
+}
+
+
+@dataclass
+class Endpoint:
+    template: str
+    url: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Result:
+    endpoint: str
+    requests: int = 0
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+    # 只含成功响应（2xx/3xx）的耗时，错误响应单独计数，不计入接口延迟
+    latencies: List[float] = field(default_factory=list)
+    elapsed: float = 0.0
+    upstream_calls: Optional[int] = None
+    skipped: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        if self.skipped:
+            return {"endpoint": self.endpoint, "skipped": self.skipped}
+        latencies = sorted(self.latencies)
+        return {
+            "endpoint": self.endpoint,
+            "requests": self.requests,
+            "errors": self.errors,
+            "statuses": self.statuses,
+            "rps": round(self.requests / self.elapsed, 1) if self.elapsed else None,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+            "upstream_per_request": round(self.upstream_calls / self.requests, 3)
+            if self.upstream_calls is not None and self.requests else None,
+        }
+
+
+def discover_endpoints(openapi: Dict[str, Any], args) -> List[Any]:
+    """按 OpenAPI 文档生成要压测的接口：填入路径参数和必填查询参数，返回 Endpoint 或 (路径, 跳过原因)"""
+    finished_build = args.history
+    path_values = {
+        # 第二个根目录任务：默认配置下没有运行中的构建，finished_build 已结束
+        "job_name": top_level_jobs(args, 2)[-1],
+        "build_number": str(finished_build),
+        "node_name": "agent-00",
+    }
+    endpoints: List[Any] = []
+    for template, methods in sorted(openapi["paths"].items()):
+        operation = methods.get("get")
+        if operation is None:
+            continue
+        if args.include and not re.search(args.include, template):
+            continue
+        reason = next((why for pattern, why in SKIPPED if pattern.search(template)), None)
+        if reason:
+            endpoints.append((template, reason))
+            continue
+        url = template
+        params: Dict[str, Any] = {}
+        missing = None
+        for parameter in operation.get("parameters", []):
+            name = parameter["name"]
+            if parameter["in"] == "path":
+                if name not in path_values:
+                    missing = name
+                    break
+                url = url.replace("{" + name + "}", path_values[name])
+            elif parameter["in"] == "query" and parameter.get("required"):
+                if name not in REQUIRED_QUERY:
+                    missing = name
+                    break
+                params[name] = REQUIRED_QUERY[name]
+        if missing:
+            endpoints.append((template, f"无法填充参数 {missing}"))
+            continue
+        if "console/search" in template:
+            # 只搜索最近几次构建，避免单次请求扫描全部历史
+            params["from_build"] = max(finished_build - 4, 1)
+        endpoints.append(Endpoint(template, url, params))
+    return endpoints
+
+
+async def bench_endpoint(client: httpx.AsyncClient, stack: Stack, endpoint: Endpoint, args) -> Result:
+    result = Result(endpoint.template)
+
+    async def one(record: bool) -> None:
+        started = time.perf_counter()
+        try:
+            response = await client.get(endpoint.url, params=endpoint.params)
+            await response.aread()
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        if not record:
+            return
+        result.requests += 1
+        result.statuses[status] = result.statuses.get(status, 0) + 1
+        if status == 0 or status >= 400:
+            result.errors += 1
+        else:
+            result.latencies.append(time.perf_counter() - started)
+
+    for _ in range(args.warmup):
+        await one(record=False)
+
+    before = fake_request_counts(stack)
+    remaining = args.requests
+    deadline = time.monotonic() + args.duration if args.duration else None
+
+    async def worker() -> None:
+        nonlocal remaining
+        while True:
+            if deadline is not None:
+                if time.monotonic() >= deadline:
+                    return
+            elif remaining <= 0:
+                return
+            else:
+                remaining -= 1
+            await one(record=True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    result.elapsed = time.perf_counter() - started
+
+    after = fake_request_counts(stack)
+    if before is not None and after is not None:
+        result.upstream_calls = sum(after.values()) - sum(before.values())
+    return result
+
+
+def print_table(results: List[Result]) -> None:
+    header = f"{'endpoint':<64} {'req':>6} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'up/req':>7}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        s = result.summary()
+        if result.skipped:
+            print(f"{s['endpoint']:<64} skipped: {s['skipped']}")
+            continue
+        upstream = "-" if s["upstream_per_request"] is None else f"{s['upstream_per_request']:.2f}"
+        print(
+            f"{s['endpoint']:<64} {s['requests']:>6} {s['errors']:>5} {s['rps'] or 0:>9.1f} "
+            f"{s['p50_ms'] or 0:>9.2f} {s['p99_ms'] or 0:>9.2f} {s['max_ms'] or 0:>9.2f} {upstream:>7}"
+        )
+
+
+async def run(args) -> List[Result]:
+    with start_stack(args) as stack:
+        async with httpx.AsyncClient(
+            base_url=stack.backend_url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency),
+        ) as client:
+            openapi = (await client.get("/openapi.json")).json()
+            results: List[Result] = []
+            for endpoint in discover_endpoints(openapi, args):
+                if isinstance(endpoint, tuple):
+                    template, reason = endpoint
+                    results.append(Result(template, skipped=reason))
+                    continue
+                result = await bench_endpoint(client, stack, endpoint, args)
+                results.append(result)
+                if not args.quiet:
+                    s = result.summary()
+                    print(f"  {s['endpoint']}: {s['rps']} rps, p99 {s['p99_ms']} ms, 错误 {s['errors']}", file=sys.stderr)
+            return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="后端接口基准测试（模拟 Jenkins）")
+    add_fake_arguments(parser)
+    group = parser.add_argument_group("压测")
+    group.add_argument("-c", "--concurrency", type=int, default=8, help="每个接口的并发请求数")
+    group.add_argument("-n", "--requests", type=int, default=200, help="每个接口的请求数")
+    group.add_argument("-d", "--duration", type=float, help="每个接口的压测时长（秒），指定后忽略 --requests")
+    group.add_argument("--warmup", type=int, default=5, help="每个接口正式计时前的预热请求数")
+    group.add_argument("--timeout", type=float, default=60.0, help="单个请求超时（秒）")
+    group.add_argument("--include", help="只压测路径匹配该正则的接口")
+    group.add_argument("--json", dest="json_path", help="将结果写入 JSON 文件")
+    group.add_argument("-q", "--quiet", action="store_true", help="不输出逐个接口的进度")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": [r.summary() for r in results]}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
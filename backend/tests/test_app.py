@@ -0,0 +1,7 @@
+from app.core.metrics import MetricsMiddleware
+from app.main import create_app
+
+
+def test_metrics_middleware_is_outermost():
+    # user_middleware[0] 包裹其余所有中间件，指标才能计入压缩、日志和追踪的耗时
+    assert create_app().user_middleware[0].cls is MetricsMiddleware
@@ -0,0 +1,144 @@
+import math
+import random
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from app.services.build_analytics import RESULT_CODES, _PERCENTILES, _group_percentiles, _recoveries
+
+S, F, U, A = (RESULT_CODES[r] for r in ("SUCCESS", "FAILURE", "UNSTABLE", "ABORTED"))
+
+
+def _reference_percentiles(groups: List[int], values: List[int], n_groups: int) -> List[List[float]]:
+    """逐组排序后线性插值（与 numpy.percentile 默认方法一致），负值按 0 处理"""
+    by_group: Dict[int, List[int]] = {g: [] for g in range(n_groups)}
+    for g, v in zip(groups, values):
+        by_group[g].append(max(v, 0))
+    rows = []
+    for g in range(n_groups):
+        ordered = sorted(by_group[g])
+        row = []
+        for q in _PERCENTILES:
+            if not ordered:
+                row.append(math.nan)
+                continue
+            pos = (len(ordered) - 1) * q
+            lower, upper = math.floor(pos), math.ceil(pos)
+            row.append(ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower))
+        rows.append(row)
+    return rows
+
+
+def _reference_recoveries(rows: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int]]:
+    """rows 为按任务、开始时间排序的 (任务, 结果, 开始时间, 耗时)；只看 SUCCESS/FAILURE"""
+    out = []
+    current_job = None
+    failing_since = None
+    for job, result, timestamp, duration in rows:
+        if result not in (S, F):
+            continue
+        if job != current_job:
+            current_job, failing_since = job, None
+        if result == F:
+            if failing_since is None:
+                failing_since = timestamp
+        elif failing_since is not None:
+            out.append((job, timestamp + duration - failing_since))
+            failing_since = None
+    return out
+
+
+def _percentiles(groups: List[int], values: List[int], n_groups: int) -> np.ndarray:
+    return _group_percentiles(np.array(groups, dtype=np.int64), np.array(values, dtype=np.int64), n_groups)
+
+
+def _recovered(rows: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int]]:
+    jobs, ms = _recoveries(
+        np.array([row[0] for row in rows], dtype=np.int32),
+        np.array([row[1] for row in rows], dtype=np.int8),
+        np.array([row[2] for row in rows], dtype=np.int64),
+        np.array([row[3] for row in rows], dtype=np.int64),
+    )
+    return list(zip(jobs.tolist(), ms.tolist()))
+
+
+# -----------------------------------------------------------------------------
+# 分组分位数
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize(
+    "groups,values,n_groups",
+    [
+        ([0], [1234], 1),                                  # 单个构建
+        ([0, 1, 2], [30, 10, 20], 3),                      # 每组一个构建
+        ([0, 0, 2], [5, 7, 9], 4),                         # 中间和末尾的空分组
+        ([1, 0, 1, 0, 1, 0], [9, 1, 8, 2, 7, 3], 2),       # 两组交错出现
+        ([0, 0, 0, 0], [4, 4, 4, 4], 1),                   # 全部相同
+        ([0, 0, 1], [-5, 10, 0], 2),                       # 负值（时钟回拨）按 0 处理
+    ],
+)
+def test_group_percentiles_match_reference(groups, values, n_groups):
+    np.testing.assert_allclose(_percentiles(groups, values, n_groups), _reference_percentiles(groups, values, n_groups))
+
+
+def test_group_percentiles_empty_input_is_all_nan():
+    assert np.isnan(_percentiles([], [], 3)).all()
+
+
+def test_group_percentiles_match_reference_on_random_interleaved_groups():
+    rng = random.Random(7)
+    for _ in range(50):
+        n_groups = rng.randint(1, 12)
+        size = rng.randint(1, 200)
+        groups = [rng.randrange(n_groups) for _ in range(size)]
+        values = [rng.choice((rng.randint(0, 50), rng.randint(0, 3_600_000))) for _ in range(size)]
+        np.testing.assert_allclose(
+            _percentiles(groups, values, n_groups), _reference_percentiles(groups, values, n_groups)
+        )
+
+
+# -----------------------------------------------------------------------------
+# 恢复时间
+# -----------------------------------------------------------------------------
+
+def test_single_build_has_no_recovery():
+    assert _recovered([(0, S, 0, 10)]) == []
+    assert _recovered([(0, F, 0, 10)]) == []
+
+
+def test_failures_without_a_later_success_never_recover():
+    rows = [(0, F, 0, 10), (0, F, 100, 10), (0, A, 200, 10), (0, F, 300, 10)]
+    assert _recovered(rows) == []
+
+
+def test_recovery_spans_first_failure_to_end_of_next_success():
+    rows = [
+        (0, S, 0, 5),
+        (0, F, 100, 5),
+        (0, U, 150, 5),     # 不稳定和中止不打断、也不结束失败区间
+        (0, F, 200, 5),
+        (0, A, 250, 5),
+        (0, S, 300, 40),
+        (0, F, 400, 5),
+        (0, S, 500, 10),
+    ]
+    assert _recovered(rows) == [(0, 240), (0, 110)] == _reference_recoveries(rows)
+
+
+def test_failure_streak_does_not_carry_across_jobs():
+    # 任务 0 以失败结束，任务 1 以成功开始：不是一次恢复
+    rows = [(0, S, 0, 1), (0, F, 10, 1), (1, S, 20, 1), (1, F, 30, 1), (1, S, 40, 1)]
+    assert _recovered(rows) == [(1, 11)]
+
+
+def test_recoveries_match_reference_on_interleaved_jobs():
+    rng = random.Random(11)
+    outcomes = (S, S, F, F, U, A)
+    for _ in range(50):
+        # 多个任务的构建在时间上交错，按 (任务, 开始时间) 排序后输入
+        timeline = []
+        for t in range(rng.randint(0, 120)):
+            timeline.append((rng.randrange(6), rng.choice(outcomes), t * 60_000, rng.randint(1_000, 90_000)))
+        rows = sorted(timeline, key=lambda row: (row[0], row[2]))
+        assert _recovered(rows) == _reference_recoveries(rows)
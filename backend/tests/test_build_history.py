@@ -0,0 +1,116 @@
+import asyncio
+import re
+from typing import Dict, List
+
+import pytest
+
+from app.core.config import settings
+from app.services.build_history import BuildHistoryStore, BuildHistorySync
+
+
+class _Crawler:
+    def __init__(self, jenkins: "_Jenkins"):
+        self.jenkins = jenkins
+
+    async def list_jobs(self):
+        return {"jobs": sorted(self.jenkins.builds)}
+
+
+class _Jenkins:
+    """只实现同步用到的接口：按文件夹列出任务的 lastBuild，按位置分页返回构建（最新在前）"""
+
+    url = "http://jenkins.test"
+
+    def __init__(self, builds: Dict[str, List[int]]):
+        self.builds = builds
+        self.job_crawler = _Crawler(self)
+        self.requests: List[str] = []
+
+    async def _get_json(self, path, params=None):
+        folder = "/".join(re.findall(r"job/([^/]+)", path))
+        jobs = []
+        for full_name, numbers in self.builds.items():
+            parent, _, name = full_name.rpartition("/")
+            if parent == folder and numbers:
+                jobs.append({"name": name, "lastBuild": {"number": max(numbers)}})
+        return {"jobs": jobs}
+
+    async def get_job_builds(self, job_name, limit=10, offset=0):
+        self.requests.append(f"{job_name}{{{offset},{offset + limit}}}")
+        newest_first = sorted(self.builds[job_name], reverse=True)
+        return [
+            {"number": n, "result": "SUCCESS", "building": False, "timestamp": n * 1000, "duration": 1}
+            for n in newest_first[offset:offset + limit]
+        ]
+
+
+def _stored(store: BuildHistoryStore, job_name: str) -> List[int]:
+    items = store.query(_Jenkins.url, job_name=job_name, limit=10_000)["items"]
+    return sorted(item["number"] for item in items)
+
+
+def _sync(sync: BuildHistorySync) -> Dict[str, int]:
+    return asyncio.run(sync.sync_once())
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_SYNC_MAX_BUILDS_PER_JOB", 10)
+
+
+def test_syncs_jobs_inside_folders():
+    jenkins = _Jenkins({"a": [1, 2, 3], "team/b": [1, 2], "team/svc/main": [1], "empty": []})
+    store = BuildHistoryStore(":memory:")
+    _sync(BuildHistorySync(jenkins, store))
+    assert _stored(store, "a") == [1, 2, 3]
+    assert _stored(store, "team/b") == [1, 2]
+    assert _stored(store, "team/svc/main") == [1]
+
+
+def test_backfills_gap_before_advancing_watermark(small_pages):
+    jenkins = _Jenkins({"job": list(range(1, 36))})
+    store = BuildHistoryStore(":memory:")
+    sync = BuildHistorySync(jenkins, store)
+
+    result = _sync(sync)
+    assert result["jobs_backfilling"] == 1
+    assert _stored(store, "job") == list(range(26, 36))
+    assert store.get_sync_state(_Jenkins.url)["job"].watermark == 0
+
+    for _ in range(5):
+        result = _sync(sync)
+    assert result["jobs_backfilling"] == 0
+    assert _stored(store, "job") == list(range(1, 36))
+    assert store.get_sync_state(_Jenkins.url)["job"] == (35, None, None)
+
+
+def test_backfill_survives_new_and_deleted_builds(small_pages):
+    numbers = list(range(1, 41))
+    jenkins = _Jenkins({"job": numbers})
+    store = BuildHistoryStore(":memory:")
+    sync = BuildHistorySync(jenkins, store)
+    _sync(sync)  # 31..40，缺口 1..30
+
+    numbers.extend(range(41, 45))  # 回填期间又有新构建
+    numbers.remove(35)  # 已拉取的构建在 Jenkins 中被删除
+    numbers.remove(12)  # 缺口中的构建被删除
+    for _ in range(8):
+        _sync(sync)
+
+    expected = sorted(set(range(1, 45)) - {12})
+    assert _stored(store, "job") == expected
+    assert store.get_sync_state(_Jenkins.url)["job"].backfill_top is None
+
+
+def test_restarts_backfill_when_new_builds_exceed_page(small_pages):
+    numbers = list(range(1, 26))
+    jenkins = _Jenkins({"job": numbers})
+    store = BuildHistoryStore(":memory:")
+    sync = BuildHistorySync(jenkins, store)
+    _sync(sync)
+
+    numbers.extend(range(26, 61))  # 一个周期内超过单次上限的新构建
+    for _ in range(12):
+        _sync(sync)
+    assert _stored(store, "job") == list(range(1, 61))
+    assert store.get_sync_state(_Jenkins.url)["job"].watermark == 60
@@ -0,0 +1,36 @@
+import asyncio
+
+from app.services.build_stream import BuildStreamHub
+
+
+class _Jenkins:
+    async def get_build_status(self, job_name, build_number):
+        return {"building": True, "result": None, "duration": 0, "estimatedDuration": 1000, "timestamp": 1}
+
+    async def get_build_console_chunk(self, job_name, build_number, start=0):
+        return {"text": "", "offset": start, "more_data": True}
+
+
+def test_resubscribe_while_last_watch_is_cancelling_gets_a_live_watch():
+    async def scenario():
+        hub = BuildStreamHub(_Jenkins())
+        first = hub.subscribe("job", 1)
+        await asyncio.sleep(0)
+        old_task = hub._watches[("job", 1)].task
+
+        hub.unsubscribe("job", 1, first)
+        # EventSource 重连：在旧轮询器的取消生效之前重新订阅
+        second = hub.subscribe("job", 1)
+        await asyncio.gather(old_task, return_exceptions=True)
+
+        watch = hub._watches[("job", 1)]
+        assert watch.task is not old_task and not watch.task.done()
+        assert second in watch.subscribers
+        events = [second.queue.get_nowait() for _ in range(second.queue.qsize())]
+        assert None not in events
+
+        hub.unsubscribe("job", 1, second)
+        await asyncio.gather(watch.task, return_exceptions=True)
+        assert hub._watches == {}
+
+    asyncio.run(scenario())
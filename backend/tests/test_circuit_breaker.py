@@ -0,0 +1,124 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpenError
+
+_sleep = asyncio.sleep
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(circuit_breaker.random, "uniform", lambda low, high: 1.0)
+
+
+class _Probe:
+    """按预设结果依次返回的探测函数：True 成功，False 抛出 ConnectionError"""
+
+    def __init__(self, outcomes: List[bool]):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if not self.outcomes.pop(0):
+            raise ConnectionError("probe failed")
+
+
+def _breaker(probe, threshold: int = 3) -> CircuitBreaker:
+    return CircuitBreaker("jenkins", probe, failure_threshold=threshold, backoff_initial=0.01, backoff_max=0.04)
+
+
+async def _until(predicate, timeout: float = 2.0) -> None:
+    async def wait():
+        while not predicate():
+            await _sleep(0.005)
+    await asyncio.wait_for(wait(), timeout)
+
+
+def test_opens_after_consecutive_failures_and_rejects_requests():
+    async def scenario():
+        breaker = _breaker(_Probe([False] * 10))
+        breaker.record_failure(ConnectionError("refused"))
+        breaker.record_failure(ConnectionError("refused"))
+        # 中间一次成功清零连续失败计数
+        breaker.record_success()
+        breaker.record_failure(ConnectionError("refused"))
+        breaker.record_failure(ConnectionError("refused"))
+        assert breaker.state == CLOSED
+        breaker.check()
+
+        breaker.record_failure(ConnectionError("timed out"))
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError, match="timed out"):
+            breaker.check()
+        stats = breaker.stats()
+        assert stats["opens"] == 1 and stats["rejected"] == 1
+        await breaker.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_probe_failures_back_off_then_successful_probe_closes(monkeypatch):
+    delays: List[float] = []
+
+    async def recording_sleep(delay, *args):
+        delays.append(delay)
+        await _sleep(0)
+
+    monkeypatch.setattr(circuit_breaker.asyncio, "sleep", recording_sleep)
+
+    async def scenario():
+        probe = _Probe([False, False, False, True])
+        breaker = _breaker(probe, threshold=1)
+        breaker.record_failure(ConnectionError("refused"))
+        assert breaker.state == OPEN
+        await _until(lambda: breaker.state == CLOSED)
+
+        assert probe.calls == 4
+        # 指数退避并封顶于 backoff_max
+        assert delays == pytest.approx([0.01, 0.02, 0.04, 0.04])
+        breaker.check()
+        assert breaker.stats()["probes"] == 4 and breaker.stats()["open_seconds"] is None
+        await breaker.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_request_success_while_open_closes_and_stops_probing():
+    async def scenario():
+        probe = _Probe([False] * 100)
+        breaker = _breaker(probe, threshold=1)
+        breaker.record_failure(ConnectionError("refused"))
+        await _until(lambda: probe.calls >= 1)
+
+        # 熔断打开前已发出的请求成功返回
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        await asyncio.wait_for(breaker._probe_task, 1.0)
+        calls = probe.calls
+        await asyncio.sleep(0.1)
+        assert probe.calls == calls
+
+        # 关闭后重新从零计数，再次达到阈值时重新打开并启动新的探测
+        breaker.record_failure(ConnectionError("refused"))
+        assert breaker.state == OPEN and breaker.stats()["opens"] == 2
+        await breaker.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_failures_while_open_do_not_restart_probe_or_count():
+    async def scenario():
+        breaker = _breaker(_Probe([False] * 100), threshold=1)
+        breaker.record_failure(ConnectionError("refused"))
+        task = breaker._probe_task
+        breaker.record_failure(ConnectionError("reset"))
+        assert breaker._probe_task is task
+        assert breaker.stats()["opens"] == 1 and breaker.stats()["last_error"] == "reset"
+        await breaker.aclose()
+        assert task.cancelled()
+
+    asyncio.run(scenario())
@@ -0,0 +1,216 @@
+import asyncio
+import re
+from typing import Dict, List
+
+import pytest
+
+from app.services.job_index import JOB_STATUSES, JobIndex, parse_query
+
+
+class _Crawler:
+    def __init__(self, jenkins: "_Jenkins"):
+        self.jenkins = jenkins
+
+    async def list_jobs(self):
+        return {"jobs": sorted(self.jenkins.jobs)}
+
+
+class _Jenkins:
+    """按文件夹返回任务列表：jobs 为 任务全名 -> 任务字段（color、lastBuild 等）"""
+
+    def __init__(self, jobs: Dict[str, Dict]):
+        self.jobs = jobs
+        self.job_crawler = _Crawler(self)
+        self.fail_folders: set = set()
+
+    async def _get_cached_json(self, category, path, params=None):
+        folder = "/".join(re.findall(r"job/([^/]+)", path))
+        if folder in self.fail_folders:
+            raise ConnectionError(f"folder {folder} unavailable")
+        items = []
+        children = set()
+        for full_name, fields in self.jobs.items():
+            parent, _, name = full_name.rpartition("/")
+            if parent == folder:
+                items.append({"name": name, **fields})
+            elif full_name.startswith(f"{folder}/" if folder else ""):
+                # 子文件夹本身也出现在父文件夹的任务列表中（没有 color）
+                children.add(full_name[len(folder) + 1 if folder else 0:].split("/")[0])
+        items.extend({"name": name} for name in sorted(children))
+        return {"jobs": items}
+
+
+def _job(color: str = "blue", timestamp: int = 0, duration: int = 0, score: int = 100) -> Dict:
+    return {
+        "color": color,
+        "lastBuild": {"number": 1, "timestamp": timestamp, "duration": duration},
+        "healthReport": [{"score": score}],
+    }
+
+
+def _index(jobs: Dict[str, Dict]) -> JobIndex:
+    index = JobIndex(_Jenkins(jobs))
+    asyncio.run(index.refresh_once())
+    return index
+
+
+def _all_pages(index: JobIndex, limit: int, **query) -> List[str]:
+    names: List[str] = []
+    cursor = None
+    while True:
+        page = index.query(cursor=cursor, limit=limit, **query)
+        names.extend(job["fullname"] for job in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return names
+
+
+_COLORS = ("blue", "red", "yellow", "aborted", "notbuilt", "disabled", "blue_anime")
+
+
+def _fleet(count: int) -> Dict[str, Dict]:
+    return {
+        f"svc-{i:03d}": _job(_COLORS[i % len(_COLORS)], timestamp=(i * 7) % 13, duration=(i * 5) % 11, score=(i * 3) % 4 * 25)
+        for i in range(count)
+    }
+
+
+# -----------------------------------------------------------------------------
+# 参数解析与校验
+# -----------------------------------------------------------------------------
+
+def test_parse_query_defaults_and_splits_status_list():
+    assert parse_query(None, None, None, None, None) == {
+        "search": None, "statuses": None, "sort": "name", "descending": False, "cursor": None, "limit": 50,
+    }
+    query = parse_query("api", " failed, running ,,", "-last_build", "", 20)
+    assert query["statuses"] == ["failed", "running"]
+    assert query["sort"] == "last_build" and query["descending"] is True
+    assert query["cursor"] is None and query["limit"] == 20
+
+
+@pytest.mark.parametrize(
+    "search,status,sort,cursor",
+    [
+        (None, None, "color", None),
+        (None, "failed,broken", None, None),
+        (None, None, None, "not-a-cursor!"),
+    ],
+)
+def test_invalid_query_parameters_raise_value_error(search, status, sort, cursor):
+    index = _index(_fleet(5))
+    with pytest.raises(ValueError):
+        index.query(**parse_query(search, status, sort, cursor, None))
+
+
+def test_cursor_is_bound_to_its_sort_order():
+    index = _index(_fleet(10))
+    cursor = index.query(**parse_query(None, None, "-health", None, 3))["next_cursor"]
+    with pytest.raises(ValueError):
+        index.query(**parse_query(None, None, "health", cursor, 3))
+    with pytest.raises(ValueError):
+        index.query(**parse_query(None, None, "name", cursor, 3))
+
+
+# -----------------------------------------------------------------------------
+# 游标分页
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("sort", ["name", "-name", "status", "-last_build", "duration", "-health"])
+def test_cursor_pages_round_trip_to_full_ordering(sort):
+    jobs = _fleet(23)
+    index = _index(jobs)
+    query = parse_query(None, None, sort, None, None)
+
+    single = [job["fullname"] for job in index.query(**{**query, "limit": 100})["items"]]
+    assert sorted(single) == sorted(jobs)
+    for limit in (1, 4, 7):
+        assert _all_pages(index, limit, **{k: v for k, v in query.items() if k not in ("cursor", "limit")}) == single
+
+
+def test_paging_is_stable_while_index_refreshes_between_pages():
+    jenkins = _Jenkins(_fleet(20))
+    index = JobIndex(jenkins)
+    asyncio.run(index.refresh_once())
+
+    first = index.query(sort="name", limit=8)
+    seen = [job["fullname"] for job in first["items"]]
+    # 翻页之间：删除已返回和未返回的任务、在游标前后各新增任务、修改一个未返回任务的状态
+    del jenkins.jobs["svc-002"]
+    del jenkins.jobs["svc-015"]
+    jenkins.jobs["svc-000a"] = _job()
+    jenkins.jobs["svc-012a"] = _job()
+    jenkins.jobs["svc-010"] = _job("red")
+    asyncio.run(index.refresh_once())
+
+    cursor = first["next_cursor"]
+    while cursor:
+        page = index.query(sort="name", limit=8, cursor=cursor)
+        seen.extend(job["fullname"] for job in page["items"])
+        cursor = page["next_cursor"]
+
+    assert len(seen) == len(set(seen))
+    assert seen == sorted(seen)
+    # 游标之后仍存在的任务一个不少，游标之前新增的任务不会插进后续页
+    after_cursor = [name for name in jenkins.jobs if name > "svc-007"]
+    assert set(after_cursor) <= set(seen)
+    assert "svc-000a" not in seen and "svc-015" not in seen
+
+
+# -----------------------------------------------------------------------------
+# 名称搜索
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("text", ["e", "SV", "c-0", "vc-01", "-00", "api", "Backend", "ckend/ap", "zzz", "svc-0099"])
+def test_search_matches_case_insensitive_substrings(text):
+    jobs = {**_fleet(30), "team/backend/api": _job(), "team/Backend-Tools": _job("red")}
+    index = _index(jobs)
+    found = {job["fullname"] for job in index.query(search=text, limit=500)["items"]}
+    assert found == {name for name in jobs if text.lower() in name.lower()}
+
+
+def test_search_index_drops_removed_jobs():
+    jenkins = _Jenkins(_fleet(5))
+    index = JobIndex(jenkins)
+    asyncio.run(index.refresh_once())
+    del jenkins.jobs["svc-003"]
+    asyncio.run(index.refresh_once())
+
+    assert [job["fullname"] for job in index.query(search="c-003")["items"]] == []
+    assert not any("svc-003" in names for names in index._trigram_index.values())
+
+
+# -----------------------------------------------------------------------------
+# 文件夹中的任务
+# -----------------------------------------------------------------------------
+
+def test_index_includes_nested_jobs_in_results_and_status_counts():
+    jobs = {
+        "root-ok": _job("blue"),
+        "team/api": _job("red"),
+        "team/web": _job("blue_anime"),
+        "team/mono/main": _job("red"),
+        "team/mono/feature-x": _job("yellow"),
+    }
+    index = _index(jobs)
+    page = index.query(limit=100)
+
+    assert sorted(job["fullname"] for job in page["items"]) == sorted(jobs)
+    assert page["total"] == len(jobs)
+    assert page["status_counts"] == {**dict.fromkeys(JOB_STATUSES, 0), "success": 1, "failed": 2, "running": 1, "unstable": 1}
+    assert [job["fullname"] for job in index.query(statuses=["failed"])["items"]] == ["team/api", "team/mono/main"]
+
+
+def test_failed_folder_keeps_previously_indexed_jobs():
+    jenkins = _Jenkins({"root": _job(), "team/api": _job("red"), "team/web": _job()})
+    index = JobIndex(jenkins)
+    asyncio.run(index.refresh_once())
+
+    jenkins.fail_folders.add("team")
+    changes = asyncio.run(index.refresh_once())
+    assert changes["removed"] == 0
+    assert index.query(statuses=["failed"])["total"] == 1
+
+    jenkins.fail_folders = {""}
+    with pytest.raises(ConnectionError):
+        asyncio.run(index.refresh_once())
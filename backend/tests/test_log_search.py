@@ -0,0 +1,48 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from app.core.config import settings
+from app.services.log_search import BuildLogSearch
+
+
+class _Jenkins:
+    def __init__(self, logs: Dict[int, bytes]):
+        self.logs = logs
+
+    async def get_build_console_bytes(self, job_name, build_number):
+        return self.logs[build_number], True
+
+
+def _search(searcher: BuildLogSearch, builds: List[int], pattern: str) -> List[dict]:
+    async def collect():
+        return [event async for event in searcher.search("job", builds, pattern)]
+    return asyncio.run(collect())
+
+
+@pytest.fixture
+def searcher(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_SEARCH_WORKERS", 1)
+    monkeypatch.setattr(settings, "LOG_SEARCH_SCAN_TIMEOUT", 3.0)
+    logs = {1: b"ok\nERROR one\n", 2: b"a" * 40 + b"!\n"}
+    searcher = BuildLogSearch(_Jenkins(logs))
+    yield searcher
+    asyncio.run(searcher.aclose())
+
+
+def test_catastrophic_pattern_is_skipped_and_pool_recovers(searcher):
+    # 先完成一次正常搜索，启动进程池
+    events = _search(searcher, [1], "ERROR")
+    assert events[0]["event"] == "match"
+    first_pool = searcher._pool
+
+    events = _search(searcher, [2], r"(a+)+$")
+    assert [e["event"] for e in events] == ["skipped", "end"]
+    assert "秒" in events[0]["data"]["reason"]
+    assert searcher.stats()["scan_timeouts"] == 1
+    assert searcher._pool is None and not any(p.is_alive() for p in (first_pool._processes or {}).values())
+
+    # 卡住的工作进程已被终止，后续搜索在新的进程池中正常执行
+    events = _search(searcher, [1], "ERROR")
+    assert events[0]["event"] == "match" and events[-1]["data"]["scanned"] == 1
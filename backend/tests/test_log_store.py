@@ -0,0 +1,38 @@
+import asyncio
+import os
+
+from app.services import log_store
+from app.services.log_store import BuildLogStore
+
+
+def _store(tmp_path):
+    return BuildLogStore(str(tmp_path), max_bytes=1 << 20, block_size=16)
+
+
+def test_size_does_not_scan_disk_until_loaded(tmp_path):
+    _store(tmp_path).put("a" * 40, b"x" * 100)
+
+    store = _store(tmp_path)
+    assert store.size("a" * 40) is None
+    asyncio.run(store.ensure_loaded())
+    assert store.size("a" * 40) == 100
+
+
+def test_ranged_reads_touch_atime_once_per_interval(tmp_path, monkeypatch):
+    store = _store(tmp_path)
+    key = "b" * 40
+    store.put(key, bytes(range(100)))
+    calls = []
+    monkeypatch.setattr(log_store.os, "utime", lambda path: calls.append(path))
+    clock = [1000.0]
+    monkeypatch.setattr(log_store.time, "monotonic", lambda: clock[0])
+    store._entries[key].touched_at = clock[0]
+
+    for start in range(0, 100, 10):
+        assert store.read(key, start, start + 10) == bytes(range(start, start + 10))
+    assert calls == []
+
+    clock[0] += log_store._ATIME_UPDATE_INTERVAL
+    store.read(key, 0, 10)
+    store.read(key, 10, 20)
+    assert len(calls) == 1 and os.path.basename(calls[0]).startswith(key)
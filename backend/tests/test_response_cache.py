@@ -0,0 +1,58 @@
+import asyncio
+from typing import List
+
+from app.services.response_cache import ResponseCache
+
+
+def _counting_etag(calls: List[object]):
+    def compute(value):
+        calls.append(value)
+        return f'"{len(calls)}"'
+    return compute
+
+
+def test_etag_is_computed_once_per_cache_entry():
+    async def scenario():
+        cache = ResponseCache({"jobs": 60}, stale_ttl=0, max_entries=10)
+        calls: List[object] = []
+        compute = _counting_etag(calls)
+        jobs = await cache.get_or_load("jobs", ("a",), lambda: asyncio.sleep(0, [{"name": "x"}]))
+
+        assert cache.etag(jobs, compute) == cache.etag(jobs, compute) == '"1"'
+        assert len(calls) == 1
+
+        # 不在缓存中的值（内容相同也一样）每次都重新计算
+        cache.etag([{"name": "x"}], compute)
+        assert len(calls) == 2
+
+        # 条目失效后，即使调用方仍持有旧对象也不再复用旧 ETag
+        cache.invalidate("jobs")
+        assert cache.etag(jobs, compute) == '"3"'
+        assert cache._keys_by_value == {}
+
+    asyncio.run(scenario())
+
+
+def test_replaced_and_evicted_entries_drop_their_etag():
+    async def scenario():
+        cache = ResponseCache({"jobs": 60}, stale_ttl=0, max_entries=2)
+        calls: List[object] = []
+        compute = _counting_etag(calls)
+        values = {}
+        for key in ("a", "b"):
+            values[key] = await cache.get_or_load("jobs", (key,), lambda key=key: asyncio.sleep(0, [key]))
+            cache.etag(values[key], compute)
+
+        cache._store(("jobs", "a"), ["a2"])
+        assert cache.peek("jobs", ("a",)) == ["a2"]
+        cache.etag(values["a"], compute)
+        assert len(calls) == 3
+
+        await cache.get_or_load("jobs", ("c",), lambda: asyncio.sleep(0, ["c"]))
+        # 容量为 2："b" 被淘汰，映射只保留仍在缓存中的两个值
+        assert cache.peek("jobs", ("b",)) is None
+        assert len(cache._keys_by_value) == 2
+        cache.etag(values["b"], compute)
+        assert len(calls) == 4
+
+    asyncio.run(scenario())
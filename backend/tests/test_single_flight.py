@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_with_same_key_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+        release = asyncio.Event()
+
+        async def fetch(tag):
+            calls.append(tag)
+            await release.wait()
+            return {"tag": tag}
+
+        waiters = [asyncio.create_task(flight.do("jobs", lambda i=i: fetch(i))) for i in range(5)]
+        other = asyncio.create_task(flight.do("nodes", lambda: fetch("nodes")))
+        await asyncio.sleep(0)
+        assert flight.stats()["in_flight"] == 2
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == [0, "nodes"]
+        assert all(result is results[0] for result in results)
+        assert (await other) == {"tag": "nodes"}
+        assert flight.stats() == {"executions": 2, "merged": 4, "merge_ratio": 0.6667, "in_flight": 0}
+
+        # 调用结束后相同 key 重新执行
+        assert (await flight.do("jobs", lambda: fetch("again"))) == {"tag": "again"}
+        assert calls[-1] == "again"
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        finished = []
+
+        async def fetch():
+            await release.wait()
+            finished.append(True)
+            return "ok"
+
+        first = asyncio.create_task(flight.do("k", fetch))
+        second = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "ok"
+        assert first.cancelled()
+        assert finished == [True]
+
+    asyncio.run(scenario())
+
+
+def test_call_keeps_running_after_every_waiter_is_cancelled():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        finished = []
+
+        async def fetch():
+            await release.wait()
+            finished.append(True)
+            raise RuntimeError("upstream failed")
+
+        waiter = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        # 结果无人接收：任务照常结束并从表中移除，异常已被取出，不会报 "never retrieved"
+        assert finished == [True]
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_exception_is_raised_to_every_waiter():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def fetch():
+            calls.append(True)
+            await release.wait()
+            raise ConnectionError("Jenkins down")
+
+        waiters = [asyncio.create_task(flight.do("k", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert len(calls) == 1
+        assert all(isinstance(r, ConnectionError) and str(r) == "Jenkins down" for r in results)
+        assert flight.stats()["in_flight"] == 0
+        # 失败不会被缓存，下一次调用重新执行
+        with pytest.raises(ConnectionError):
+            await flight.do("k", fetch)
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
@@ -137,6 +137,72 @@ export interface ConsoleOutput {
 	output_length: number;
 }
 
+// 增量控制台输出接口
+export interface ConsoleChunk extends ConsoleOutput {
+	start: number;
+	offset: number;
+	more_data: boolean;
+}
+
+// 队列项解析结果接口
+export interface QueuedBuild {
+	queue_id: number;
+	job_name: string | null;
+	status: "waiting" | "started" | "cancelled" | "expired";
+	why: string | null;
+	build_number?: number;
+	url?: string;
+}
+
+// 构建历史记录接口（来自后端增量同步的历史库）
+export interface BuildHistoryRecord {
+	job_name: string;
+	number: number;
+	result: "SUCCESS" | "FAILURE" | "UNSTABLE" | "ABORTED" | "NOT_BUILT" | null;
+	building: boolean;
+	timestamp: number;
+	duration: number;
+	url?: string;
+	display_name?: string;
+}
+
+// 构建历史查询参数
+export interface BuildHistoryQuery {
+	job_name?: string;
+	result?: string;
+	building?: boolean;
+	since?: number;
+	until?: number;
+	page?: number;
+	page_size?: number;
+}
+
+// 构建历史分页结果
+export interface BuildHistoryPage {
+	items: BuildHistoryRecord[];
+	total: number;
+	page: number;
+	page_size: number;
+	synced_at: number | null;
+}
+
+// 任务列表查询参数（服务端索引过滤、排序、游标分页）
+export interface JobQuery {
+	search?: string;
+	status?: string;
+	sort?: string;
+	cursor?: string;
+	limit?: number;
+}
+
+// 任务列表分页结果
+export interface JobPage extends ApiResponse<JenkinsJob[]> {
+	total: number;
+	next_cursor: string | null;
+	status_counts: Record<string, number>;
+	indexed_at: number | null;
+}
+
 // Pipeline阶段接口
 export interface PipelineStageInfo {
 	id: string;
@@ -293,9 +359,12 @@ export enum JenkinsApi {
 	Build = "/jenkins/build/{jobName}",
 	BuildInfo = "/jenkins/build/{jobName}/{buildNumber}",
 	BuildConsole = "/jenkins/build/{jobName}/{buildNumber}/console",
+	BuildConsoleProgressive = "/jenkins/build/{jobName}/{buildNumber}/console/progressive",
 	BuildStatus = "/jenkins/build/{jobName}/{buildNumber}/status",
 	BuildStop = "/jenkins/build/{jobName}/{buildNumber}/stop",
 	BuildReplay = "/jenkins/build/{jobName}/{buildNumber}/replay",
+	QueuedBuild = "/jenkins-pro/queue/item/{queueId}/build",
+	BuildHistory = "/jenkins-pro/history",
 
 	// Pipeline相关
 	PipelineRun = "/jenkins/job/{jobName}/{buildNumber}/wfapi/describe",
@@ -332,6 +401,13 @@ const getJobs = (depth: number = 1) =>
 		params: { depth },
 	});
 
+// 分页查询任务列表（由后端内存索引过滤和排序，不访问 Jenkins）
+const queryJobs = (query: JobQuery = {}) =>
+	apiClient.get<JobPage>({
+		url: JenkinsApi.Jobs,
+		params: query,
+	});
+
 // 获取指定任务信息
 const getJobInfo = (jobName: string, depth: number = 1) =>
 	apiClient.get<ApiResponse<JenkinsJob>>({
@@ -358,6 +434,21 @@ const getBuildConsole = (jobName: string, buildNumber: number) =>
 		url: JenkinsApi.BuildConsole.replace("{jobName}", jobName).replace("{buildNumber}", buildNumber.toString()),
 	});
 
+// 增量获取构建控制台输出（start 为上次返回的 offset）
+const getBuildConsoleProgressive = (jobName: string, buildNumber: number, start = 0) =>
+	apiClient.get<ApiResponse<ConsoleChunk>>({
+		url: JenkinsApi.BuildConsoleProgressive.replace("{jobName}", jobName).replace("{buildNumber}", buildNumber.toString()),
+		params: { start },
+	});
+
+// 等待队列项开始构建，返回构建号（超时时 status 为 waiting）
+const waitForQueuedBuild = (queueId: number, jobName?: string, timeout = 30) =>
+	apiClient.get<ApiResponse<QueuedBuild>>({
+		url: JenkinsApi.QueuedBuild.replace("{queueId}", queueId.toString()),
+		params: { job_name: jobName, timeout },
+		timeout: (timeout + 5) * 1000,
+	});
+
 // 获取构建状态
 const getBuildStatus = (jobName: string, buildNumber: number) =>
 	apiClient.get<ApiResponse<BuildStatus>>({
@@ -372,6 +463,13 @@ const getBuildQueue = () =>
 		url: JenkinsApi.Queue,
 	});
 
+// 获取所有任务的构建历史（分页、可过滤）
+const getBuildHistory = (query: BuildHistoryQuery = {}) =>
+	apiClient.get<ApiResponse<BuildHistoryPage>>({
+		url: JenkinsApi.BuildHistory,
+		params: query,
+	});
+
 // 获取任务参数定义
 const getJobParameters = (jobName: string) =>
 	apiClient.get<ApiResponse<JobConfigInfo>>({
@@ -477,15 +575,19 @@ export default {
 	// 原有API
 	getServerInfo,
 	getJobs,
+	queryJobs,
 	getJobInfo,
 	triggerBuild,
 	getBuildInfo,
 	getBuildConsole,
+	getBuildConsoleProgressive,
 	getBuildStatus,
+	waitForQueuedBuild,
 
 	// 新增API - 构建和队列管理
 	getBuildQueue,
 	getJobBuilds,
+	getBuildHistory,
 	stopBuild,
 
 	// 新增API - Pipeline相关
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
 import { toast } from "sonner";
 import jenkinsService, {
 	type JenkinsJob,
@@ -119,6 +119,31 @@ export interface ParameterizedBuildConfig {
 	values: Record<string, string | boolean>;
 }
 
+// 任务列表每页数量
+const JOBS_PAGE_SIZE = 50;
+
+// 补充任务卡片展示需要的字段
+function enhanceJob(job: JenkinsJob): EnhancedJenkinsJob {
+	return {
+		...job,
+		isRunning: job.color?.includes("anime") || false,
+		lastBuildDuration: job.lastBuild ?
+			`${Math.round((job.lastBuild.duration || 0) / 60000 * 10) / 10}分钟` : "未知",
+		healthScore: job.healthReport?.[0]?.score || 0,
+		description: `${job.name} 构建任务`
+	};
+}
+
+// 将毫秒时间戳格式化为相对时间（如 "5分钟前"）
+function formatTimeAgo(timestamp: number): string {
+	const minutes = Math.floor((Date.now() - timestamp) / 60000);
+	if (minutes < 1) return "刚刚";
+	if (minutes < 60) return `${minutes}分钟前`;
+	const hours = Math.floor(minutes / 60);
+	if (hours < 24) return `${hours}小时前`;
+	return `${Math.floor(hours / 24)}天前`;
+}
+
 export function useJenkinsPro() {
 	// 基础状态
 	const [serverInfo, setServerInfo] = useState<JenkinsServerInfo | null>(null);
@@ -200,9 +225,13 @@ export function useJenkinsPro() {
 	]);
 	const [unreadAlerts, setUnreadAlerts] = useState<number>(1);
 
-	// 搜索和过滤状态
+	// 搜索和过滤状态（由后端任务索引过滤、分页）
 	const [searchQuery, setSearchQuery] = useState("");
 	const [statusFilter, setStatusFilter] = useState<string>("all");
+	const [jobsCursor, setJobsCursor] = useState<string | null>(null);
+	const [jobsTotal, setJobsTotal] = useState<number>(0);
+	// 只采用最近一次任务查询的结果，避免快速输入时旧响应覆盖新结果
+	const jobsRequestRef = useRef(0);
 
 	// 加载状态管理
 	const setLoadingState = useCallback((key: string, isLoading: boolean) => {
@@ -248,55 +277,66 @@ export function useJenkinsPro() {
 		}
 	}, [setLoadingState, handleError]);
 
-	// 获取任务列表
-	const fetchJobs = useCallback(async () => {
-		setLoadingState("jobs", true);
+	// 获取任务列表（传入游标时加载下一页并追加）
+	const fetchJobs = useCallback(async (cursor?: string) => {
+		const requestId = ++jobsRequestRef.current;
+		const search = searchQuery.trim();
+		setLoadingState(cursor ? "moreJobs" : "jobs", true);
 		setError(null);
 		try {
-			const response = await jenkinsService.getJobs(2);
+			const response = await jenkinsService.queryJobs({
+				search: search || undefined,
+				status: statusFilter === "all" ? undefined : statusFilter,
+				cursor,
+				limit: JOBS_PAGE_SIZE,
+			});
+			if (requestId !== jobsRequestRef.current) return;
 			if (response.status === "success" && response.data) {
-				// 增强任务数据
-				const enhancedJobs: EnhancedJenkinsJob[] = response.data.map(job => ({
-					...job,
-					isRunning: job.color?.includes("anime") || false,
-					lastBuildDuration: job.lastBuild ? 
-						`${Math.round((job.lastBuild.duration || 0) / 60000 * 10) / 10}分钟` : "未知",
-					healthScore: job.healthReport?.[0]?.score || 0,
-					description: `${job.name} 构建任务`
-				}));
-
-				setJobs(enhancedJobs);
+				const enhancedJobs = response.data.map(enhanceJob);
+				setJobs(prev => (cursor ? [...prev, ...enhancedJobs] : enhancedJobs));
+				setJobsCursor(response.next_cursor);
+				setJobsTotal(response.total);
 				// 保存原始 JSON 数据用于显示
 				setJobsRaw(JSON.stringify(response, null, 2));
 
-				// 更新系统统计
-				const activeBuilds = enhancedJobs.filter(job => job.isRunning).length;
-				const successfulJobs = enhancedJobs.filter(job => 
-					job.color === "blue" || job.color === "green"
-				).length;
-				const successRate = enhancedJobs.length > 0 ? 
-					Math.round((successfulJobs / enhancedJobs.length) * 100 * 10) / 10 : 0;
-
-				setSystemStats(prev => ({
-					...prev,
-					totalJobs: enhancedJobs.length,
-					activeBuilds,
-					successRate,
-					averageBuildTime: "4.2分钟" // 可以从实际数据计算
-				}));
+				// 未搜索时 status_counts 覆盖全部任务，据此更新系统统计
+				if (!search) {
+					const counts = response.status_counts;
+					const totalJobs = Object.values(counts).reduce((sum, n) => sum + n, 0);
+					const successRate = totalJobs > 0 ?
+						Math.round(((counts.success || 0) / totalJobs) * 100 * 10) / 10 : 0;
+
+					setSystemStats(prev => ({
+						...prev,
+						totalJobs,
+						activeBuilds: counts.running || 0,
+						successRate,
+						averageBuildTime: "4.2分钟" // 可以从实际数据计算
+					}));
+				}
 
-				toast.success(`获取到 ${enhancedJobs.length} 个任务`);
+				if (!cursor && !search && statusFilter === "all") {
+					toast.success(`获取到 ${response.total} 个任务`);
+				}
 			} else {
 				handleError(response, response.message || "获取任务列表失败");
 				setJobsRaw(JSON.stringify(response, null, 2));
 			}
 		} catch (error: any) {
+			if (requestId !== jobsRequestRef.current) return;
 			handleError(error, "获取任务列表失败");
 			setJobsRaw(JSON.stringify({ error: error.message }, null, 2));
 		} finally {
-			setLoadingState("jobs", false);
+			setLoadingState(cursor ? "moreJobs" : "jobs", false);
 		}
-	}, [setLoadingState, handleError]);
+	}, [searchQuery, statusFilter, setLoadingState, handleError]);
+
+	// 加载下一页任务
+	const loadMoreJobs = useCallback(() => {
+		if (jobsCursor) {
+			fetchJobs(jobsCursor);
+		}
+	}, [jobsCursor, fetchJobs]);
 
 	// 触发构建
 	const triggerBuild = useCallback(async (jobName: string, parameters?: BuildParams) => {
@@ -671,49 +711,26 @@ export function useJenkinsPro() {
 		}
 	}, [setLoadingState, handleError]);
 
-	// 获取构建历史（模拟数据）
+	// 获取构建历史（后端历史库，只取已结束的构建）
 	const fetchBuildHistory = useCallback(async () => {
 		setLoadingState("buildHistory", true);
 		try {
-			// 模拟构建历史数据
-			const mockHistory: BuildHistoryItem[] = [
-				{
-					jobName: "frontend-build",
-					buildNumber: 145,
-					status: "success",
-					duration: "1.2分钟",
-					timestamp: "5分钟前"
-				},
-				{
-					jobName: "backend-deploy",
-					buildNumber: 89,
-					status: "success",
-					duration: "3.1分钟",
-					timestamp: "15分钟前"
-				},
-				{
-					jobName: "test-automation",
-					buildNumber: 234,
-					status: "failed",
-					duration: "2.8分钟",
-					timestamp: "1小时前"
-				},
-				{
-					jobName: "security-scan",
-					buildNumber: 67,
-					status: "unstable",
-					duration: "8.5分钟",
-					timestamp: "2小时前"
-				},
-				{
-					jobName: "performance-test",
-					buildNumber: 23,
-					status: "success",
-					duration: "12.3分钟",
-					timestamp: "4小时前"
-				}
-			];
-			setBuildHistory(mockHistory);
+			const response = await jenkinsService.getBuildHistory({ building: false, page_size: 20 });
+			const statusMap: Record<string, BuildHistoryItem["status"]> = {
+				SUCCESS: "success",
+				FAILURE: "failed",
+				UNSTABLE: "unstable",
+				ABORTED: "aborted",
+			};
+			const history: BuildHistoryItem[] = (response.data?.items || []).map((record) => ({
+				jobName: record.job_name,
+				buildNumber: record.number,
+				status: statusMap[record.result || ""] || "aborted",
+				duration: `${Math.round((record.duration / 60000) * 10) / 10}分钟`,
+				timestamp: formatTimeAgo(record.timestamp),
+				url: record.url,
+			}));
+			setBuildHistory(history);
 		} catch (error: any) {
 			handleError(error, "获取构建历史失败");
 		} finally {
@@ -813,19 +830,6 @@ ${alert.buildNumber ? `**构建号**: #${alert.buildNumber}` : ''}
 			toast.success('告警配置已更新');
 		}, []);
 
-	// 查找最新构建号
-	const findLatestBuildNumber = useCallback(async (jobName: string) => {
-		try {
-			const response = await jenkinsService.getJobInfo(jobName, 2);
-			if (response.status === "success" && response.data && response.data.lastBuild) {
-				return response.data.lastBuild.number;
-			}
-		} catch (error) {
-			console.error("获取最新构建号失败:", error);
-		}
-		return null;
-	}, []);
-
 	// 实时构建监控
 	const startRealTimeMonitoring = useCallback(async (jobName: string, buildNum: number) => {
 		setRealTimeBuildNumber(buildNum);
@@ -869,11 +873,7 @@ ${alert.buildNumber ? `**构建号**: #${alert.buildNumber}` : ''}
 
 		setLoadingState("realTimeBuild", true);
 		try {
-			// 1. 先获取当前最新构建号作为基准
-			const currentBuildNumber = await findLatestBuildNumber(targetJob);
-			console.log("触发前最新构建号:", currentBuildNumber);
-
-			// 2. 触发普通构建
+			// 1. 触发普通构建
 			const response = await jenkinsService.triggerBuild(targetJob, parameters || buildParams);
 			console.log("实时构建触发响应:", response);
 
@@ -881,34 +881,22 @@ ${alert.buildNumber ? `**构建号**: #${alert.buildNumber}` : ''}
 				const { job_name, queue_id } = response.data;
 				toast.success(`任务 "${job_name}" 构建已触发，队列ID: ${queue_id}`);
 
-				// 3. 轮询查找新的构建号
-				let attempts = 0;
-				const maxAttempts = 20; // 最多尝试20次（1分钟）
-
-				const findNewBuildInterval = setInterval(async () => {
-					attempts++;
-					const latestBuildNumber = await findLatestBuildNumber(targetJob);
+				// 2. 由后端跟踪队列项，直到分配到构建号
+				const queued = await jenkinsService.waitForQueuedBuild(queue_id, job_name, 60);
+				const buildNumberFound = queued.data?.build_number;
 
-					console.log(`尝试 ${attempts}: 当前最新构建号 ${latestBuildNumber}, 基准构建号 ${currentBuildNumber}`);
-
-					// 如果找到新的构建号，开始实时监控
-					if (latestBuildNumber && latestBuildNumber > (currentBuildNumber || 0)) {
-						clearInterval(findNewBuildInterval);
-						setBuildNumber(latestBuildNumber);
-						toast.success(`发现新构建 #${latestBuildNumber}，开始实时监控`);
-
-						// 开始实时监控
-						await startRealTimeMonitoring(job_name, latestBuildNumber);
-						return;
-					}
+				if (queued.status === "success" && queued.data?.status === "started" && buildNumberFound) {
+					setBuildNumber(buildNumberFound);
+					toast.success(`发现新构建 #${buildNumberFound}，开始实时监控`);
 
-					// 超过最大尝试次数，停止查找
-					if (attempts >= maxAttempts) {
-						clearInterval(findNewBuildInterval);
-						toast.warning("未能找到新的构建号，可能构建还在队列中等待");
-						console.log("查找新构建号超时");
-					}
-				}, 3000); // 每3秒检查一次
+					// 3. 开始实时监控
+					await startRealTimeMonitoring(job_name, buildNumberFound);
+				} else if (queued.data?.status === "cancelled") {
+					toast.warning("构建已在队列中被取消");
+				} else {
+					toast.warning("未能找到新的构建号，可能构建还在队列中等待");
+					console.log("等待构建开始超时:", queued.data);
+				}
 
 			} else {
 				handleError(response, response.message || "触发实时构建失败");
@@ -918,7 +906,7 @@ ${alert.buildNumber ? `**构建号**: #${alert.buildNumber}` : ''}
 		} finally {
 			setLoadingState("realTimeBuild", false);
 		}
-	}, [selectedJob, buildParams, setLoadingState, handleError, findLatestBuildNumber, startRealTimeMonitoring]);
+	}, [selectedJob, buildParams, setLoadingState, handleError, startRealTimeMonitoring]);
 
 	// 停止实时监控
 	const stopRealTimeMonitoring = useCallback(() => {
@@ -927,30 +915,21 @@ ${alert.buildNumber ? `**构建号**: #${alert.buildNumber}` : ''}
 		toast.info("已停止实时监控");
 	}, []);
 
-	// 过滤任务
-	const filteredJobs = jobs.filter(job => {
-		const matchesSearch = job.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
-							 job.fullname.toLowerCase().includes(searchQuery.toLowerCase());
-		
-		if (statusFilter === "all") return matchesSearch;
-		
-		const statusMap: Record<string, string[]> = {
-			"success": ["blue", "green"],
-			"failed": ["red"],
-			"running": ["blue_anime", "red_anime", "yellow_anime"],
-			"unstable": ["yellow"]
-		};
-		
-		return matchesSearch && statusMap[statusFilter]?.includes(job.color);
-	});
+	// 任务已由后端按搜索词和状态过滤
+	const filteredJobs = jobs;
 
 	// 初始化数据
 	useEffect(() => {
 		fetchServerInfo();
-		fetchJobs();
 		fetchBuildQueue();
 		fetchBuildHistory();
-	}, [fetchServerInfo, fetchJobs, fetchBuildQueue, fetchBuildHistory]);
+	}, [fetchServerInfo, fetchBuildQueue, fetchBuildHistory]);
+
+	// 首次加载以及搜索词、状态筛选变化后重新查询任务（输入时防抖）
+	useEffect(() => {
+		const timer = setTimeout(() => fetchJobs(), searchQuery ? 300 : 0);
+		return () => clearTimeout(timer);
+	}, [fetchJobs, searchQuery]);
 
 	// 定期刷新数据
 	useEffect(() => {
@@ -969,6 +948,8 @@ ${alert.buildNumber ? `**构建号**: #${alert.buildNumber}` : ''}
 		jobs,
 		jobsRaw,
 		filteredJobs,
+		jobsTotal,
+		hasMoreJobs: jobsCursor !== null,
 		selectedJob,
 		buildParams,
 		buildNumber,
@@ -1009,6 +990,7 @@ ${alert.buildNumber ? `**构建号**: #${alert.buildNumber}` : ''}
 		// 操作函数
 		fetchServerInfo,
 		fetchJobs,
+		loadMoreJobs,
 		fetchJobInfo,
 		triggerBuild,
 		fetchBuildInfo,
@@ -43,6 +43,9 @@ export default function JenkinsPro() {
 	const {
 		systemStats,
 		filteredJobs,
+		jobsTotal,
+		hasMoreJobs,
+		loadMoreJobs,
 		buildQueue,
 		buildHistory,
 		loading,
@@ -177,6 +180,9 @@ export default function JenkinsPro() {
 					<TabsContent value="jobs" className="space-y-6">
 						<JobsView
 							jobs={filteredJobs}
+							total={jobsTotal}
+							hasMore={hasMoreJobs}
+							onLoadMore={loadMoreJobs}
 							searchQuery={searchQuery}
 							statusFilter={statusFilter}
 							onSearchChange={setSearchQuery}
@@ -298,6 +304,9 @@ function DashboardView({ systemStats }: { systemStats: any }) {
 // Jobs View Component
 function JobsView({
 	jobs,
+	total,
+	hasMore,
+	onLoadMore,
 	searchQuery,
 	statusFilter,
 	onSearchChange,
@@ -307,6 +316,9 @@ function JobsView({
 	loading
 }: {
 	jobs: any[];
+	total: number;
+	hasMore: boolean;
+	onLoadMore: () => void;
 	searchQuery: string;
 	statusFilter: string;
 	onSearchChange: (query: string) => void;
@@ -342,6 +354,7 @@ function JobsView({
 							<SelectItem value="unstable">不稳定</SelectItem>
 						</SelectContent>
 					</Select>
+					<span className="text-sm text-muted-foreground">共 {total} 个任务</span>
 				</div>
 				<Button>
 					<Play className="w-4 h-4 mr-2" />
@@ -377,6 +390,16 @@ function JobsView({
 					))}
 				</div>
 			)}
+
+			{/* 加载更多 */}
+			{!loading.jobs && hasMore && (
+				<div className="flex justify-center">
+					<Button variant="outline" onClick={onLoadMore} disabled={loading.moreJobs}>
+						{loading.moreJobs && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+						加载更多（已显示 {jobs.length} / {total}）
+					</Button>
+				</div>
+			)}
 		</div>
 	);
 }